@@ -6,10 +6,13 @@ Adaptado a la estructura del pipeline CityMind (usa countyname, stateabbr, count
 Compatible tanto dentro de Django como en entornos CI sin settings.
 """
 
-import pandas as pd
+import base64
+import numpy as np
 import plotly.express as px
 from pathlib import Path
 
+from scripts.common.dataset_io import read_dataset
+
 # =========================================================
 # 🧩 Configuración segura de la ruta del dataset
 # =========================================================
@@ -20,13 +23,32 @@ except Exception:
     # Modo standalone (por ejemplo, en GitHub Actions)
     DATA_PATH = Path("data/processed/final_places.csv")
 
+# Geometría de condados simplificada y cuantizada que se sirve como estático
+# (generada con scripts/common/build_county_geometry.py, no requiere red)
+GEOJSON_STATIC = "geo/us_counties_simplified.json"
+GEOJSON_PATH = Path(__file__).resolve().parent.parent / "core" / "static" / GEOJSON_STATIC
+
 
 # =========================================================
 # 🧩 Carga y preprocesamiento
 # =========================================================
+# Columnas que usa el dashboard (el resto no se lee del disco)
+HEATMAP_COLUMNS = [
+    "mhlth_crudeprev",
+    "depression_crudeprev",
+    "obesity_crudeprev",
+    "sleep_crudeprev",
+    "access2_crudeprev",
+    "ghlth_crudeprev",
+    "lpa_crudeprev",
+    "phlth_crudeprev",
+]
+INSIGHT_COLUMNS = ["countyfips", "countyname", "stateabbr"] + HEATMAP_COLUMNS
+
+
 def load_data():
-    """Carga el dataset limpio del pipeline."""
-    df = pd.read_csv(DATA_PATH)
+    """Carga el dataset limpio del pipeline (solo las columnas del dashboard)."""
+    df = read_dataset(DATA_PATH, columns=INSIGHT_COLUMNS)
     df.columns = df.columns.str.lower()
     return df
 
@@ -55,40 +77,41 @@ def top_bottom_counties(df, col, n=5):
 # =========================================================
 # 🗺️ Visualizaciones interactivas
 # =========================================================
-def choropleth_map(df, col):
-    """Mapa coroplético de EE.UU. a nivel de condado."""
+def encode_typed_array(values):
+    """Codifica una serie numérica como array tipado de Plotly (float32 little-endian en base64)."""
+    data = np.asarray(values, dtype="<f4")
+    return {"dtype": "f4", "bdata": base64.b64encode(data.tobytes()).decode("ascii")}
+
+
+def choropleth_payload(df, cols):
+    """
+    Datos compactos para los mapas coropléticos de EE.UU. a nivel de condado.
+    La geometría (estático local) y los ids/nombres de condado se comparten entre
+    todos los mapas; cada métrica solo aporta su array tipado de valores.
+    """
     if "countyfips" not in df.columns:
         raise ValueError("El dataset no contiene 'countyfips', necesario para el mapa.")
 
-    fig = px.choropleth(
-        df,
-        geojson="https://raw.githubusercontent.com/plotly/datasets/master/geojson-counties-fips.json",
-        locations="countyfips",
-        color=col,
-        color_continuous_scale="YlGnBu",
-        scope="usa",
-        labels={col: col.replace("_", " ").title()},
-        hover_data=["countyname", "stateabbr"],
-        title=f"{col.replace('_', ' ').title()} — U.S. Counties",
-    )
-    fig.update_layout(height=500, margin={"r": 0, "t": 50, "l": 0, "b": 0})
-    return fig.to_html(full_html=False)
+    fips = df["countyfips"].astype(str).str.zfill(5)
+    names = df["countyname"].astype(str) + ", " + df["stateabbr"].astype(str)
+    return {
+        "geojson": GEOJSON_STATIC,
+        "locations": fips.tolist(),
+        "names": names.tolist(),
+        "maps": {
+            key: {
+                "label": col.replace("_", " ").title(),
+                "title": f"{col.replace('_', ' ').title()} — U.S. Counties",
+                "z": encode_typed_array(df[col]),
+            }
+            for key, col in cols.items()
+        },
+    }
 
 
 def correlation_heatmap(df):
     """Heatmap de correlaciones de factores clave."""
-    selected = df[
-        [
-            "mhlth_crudeprev",
-            "depression_crudeprev",
-            "obesity_crudeprev",
-            "sleep_crudeprev",
-            "access2_crudeprev",
-            "ghlth_crudeprev",
-            "lpa_crudeprev",
-            "phlth_crudeprev",
-        ]
-    ]
+    selected = df[HEATMAP_COLUMNS]
     corr = selected.corr().round(2)
 
     fig = px.imshow(
@@ -98,7 +121,8 @@ def correlation_heatmap(df):
         title="Correlación entre factores socio-saludables",
     )
     fig.update_layout(height=600)
-    return fig.to_html(full_html=False)
+    # plotly.js se carga una sola vez en la plantilla del dashboard
+    return fig.to_html(full_html=False, include_plotlyjs=False)
 
 
 # =========================================================
@@ -109,7 +133,7 @@ def generate_all_insights():
     Ejecuta el análisis completo y devuelve resultados listos para el dashboard.
     Retorna un diccionario con:
       - summary: métricas resumen
-      - map_mhlth / map_dep: mapas Plotly
+      - choropleth: datos compactos de los mapas (mhlth / dep)
       - heatmap: correlación de factores
       - top/bottom: listas de condados extremos
     """
@@ -121,14 +145,12 @@ def generate_all_insights():
     top_dep, bottom_dep = top_bottom_counties(df, "depression_crudeprev")
 
     # Mapas y heatmap
-    map_mhlth = choropleth_map(df, "mhlth_crudeprev")
-    map_dep = choropleth_map(df, "depression_crudeprev")
+    choropleth = choropleth_payload(df, {"mhlth": "mhlth_crudeprev", "dep": "depression_crudeprev"})
     heatmap = correlation_heatmap(df)
 
     return {
         "summary": summary,
-        "map_mhlth": map_mhlth,
-        "map_dep": map_dep,
+        "choropleth": choropleth,
         "heatmap": heatmap,
         "top_mhlth": top_mhlth.to_dict(orient="records"),
         "bottom_mhlth": bottom_mhlth.to_dict(orient="records"),
@@ -0,0 +1,158 @@
+"""
+CityMind — Insights Cache
+-------------------------
+Caché de los resultados de generate_all_insights() para el dashboard.
+
+- Clave: huella del dataset (mtime/tamaño + SHA-256 del contenido).
+- Niveles: memoria del proceso (O(1) por petición) + fichero JSON en disco
+  compartido entre workers y precalentado por la regla `data_insights`.
+- Si el dataset cambia, se sigue sirviendo la versión anterior mientras un
+  hilo en segundo plano regenera los insights.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from analytics import data_insights
+from scripts.common.dataset_io import source_file
+
+# =========================================================
+# 🧩 Configuración
+# =========================================================
+CACHE_PATH = Path(data_insights.DATA_PATH).parent.parent / "cache" / "insights.json"
+
+# Cada cuántos segundos se vuelve a mirar el dataset en disco
+CHECK_INTERVAL = 5.0
+
+
+def file_fingerprint(path, with_hash=True):
+    """Huella de un fichero: (mtime_ns, tamaño) y, opcionalmente, SHA-256."""
+    stat = Path(path).stat()
+    fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+
+def _same_stat(a, b):
+    return a is not None and a["mtime_ns"] == b["mtime_ns"] and a["size"] == b["size"]
+
+
+# =========================================================
+# 🧠 Caché
+# =========================================================
+class InsightsCache:
+    """Sirve insights precalculados y los regenera cuando cambia el dataset."""
+
+    def __init__(self, data_path=None, cache_path=CACHE_PATH, check_interval=CHECK_INTERVAL):
+        self.data_path = Path(data_path or data_insights.DATA_PATH)
+        self.cache_path = Path(cache_path)
+        self.check_interval = check_interval
+        self._entry = None          # {"fingerprint": ..., "generated_at": ..., "insights": ...}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    # -----------------------------------------------------
+    #  API pública
+    # -----------------------------------------------------
+    def get(self):
+        """Devuelve los insights (posiblemente de la versión anterior si se están regenerando)."""
+        entry = self._entry
+        if entry is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return entry["insights"]
+
+        current = file_fingerprint(self.dataset_file(), with_hash=False)
+        self._checked_at = time.monotonic()
+        if entry is not None and (self._refreshing or _same_stat(entry["fingerprint"], current)):
+            return entry["insights"]
+
+        with self._lock:
+            # ¿Otro worker (o el pipeline) ya dejó una versión válida en disco?
+            current = file_fingerprint(self.dataset_file())
+            disk_entry = self._read_disk()
+            if disk_entry is not None and disk_entry["fingerprint"].get("sha256") == current["sha256"]:
+                disk_entry["fingerprint"] = current
+                self._entry = disk_entry
+                return disk_entry["insights"]
+
+            if self._entry is not None and self._entry["fingerprint"].get("sha256") == current["sha256"]:
+                self._entry["fingerprint"] = current
+                return self._entry["insights"]
+
+            stale = self._entry or disk_entry
+            if stale is None:
+                # Sin nada que servir: generar en la propia petición
+                return self._regenerate(current)["insights"]
+
+            self._entry = stale
+            self._refresh_in_background(current)
+            return stale["insights"]
+
+    def warm(self):
+        """Regenera y guarda los insights (usado por la regla `data_insights` del pipeline)."""
+        with self._lock:
+            return self._regenerate(file_fingerprint(self.dataset_file()))
+
+    def dataset_file(self):
+        """Fichero real del dataset (Parquet o CSV; sigue las vistas, ver dataset_io)."""
+        return source_file(self.data_path)
+
+    # -----------------------------------------------------
+    #  Internos
+    # -----------------------------------------------------
+    def _regenerate(self, fingerprint):
+        entry = {
+            "fingerprint": fingerprint,
+            "generated_at": time.time(),
+            "insights": data_insights.generate_all_insights(),
+        }
+        self._write_disk(entry)
+        self._entry = entry
+        return entry
+
+    def _refresh_in_background(self, fingerprint):
+        if self._refreshing:
+            return
+        self._refreshing = True
+
+        def run():
+            try:
+                self._regenerate(fingerprint)
+            except Exception as e:
+                print("❌ ERROR REGENERATING INSIGHTS:", e)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="insights-refresh", daemon=True).start()
+
+    def _read_disk(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, entry):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, default=float)
+        os.replace(tmp_path, self.cache_path)  # escritura atómica
+
+
+# Instancia compartida por el proceso
+insights_cache = InsightsCache()
+
+
+def get_insights():
+    """Atajo para las vistas: insights del dataset actual."""
+    return insights_cache.get()
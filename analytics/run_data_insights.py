@@ -2,18 +2,25 @@
 CityMind - Automated Data Insights Generator
 --------------------------------------------
 Genera análisis exploratorios (EDA) y gráficos HTML para los reportes automáticos del pipeline.
+También precalienta la caché de insights que sirve el dashboard.
 """
 
-import pandas as pd
+import sys
 import plotly.express as px
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from analytics.insights_cache import insights_cache
+from scripts.common.dataset_io import dataset_columns, read_dataset
+
 DATA_PATH = Path("data/processed/final_places.csv")
 REPORT_PATH = Path("reports/data_insights.html")
+REPORT_COLUMNS = ["mhlth_crudeprev", "depression_crudeprev", "stateabbr"]
 
 
 def generate_html_report():
-    df = pd.read_csv(DATA_PATH)
+    columns = [c for c in REPORT_COLUMNS if c in dataset_columns(DATA_PATH)]
+    df = read_dataset(DATA_PATH, columns=columns)
     print(f"✅ Loaded dataset with {len(df)} rows and {len(df.columns)} columns")
 
     # --- Distribución de salud mental
@@ -44,5 +51,12 @@ def generate_html_report():
     print(f"✅ Report generated at {REPORT_PATH.resolve()}")
 
 
+def warm_dashboard_cache():
+    entry = insights_cache.warm()
+    print(f"✅ Dashboard insights cached at {insights_cache.cache_path.resolve()} "
+          f"(sha256 {entry['fingerprint']['sha256'][:12]})")
+
+
 if __name__ == "__main__":
     generate_html_report()
+    warm_dashboard_cache()
@@ -0,0 +1,254 @@
+"""
+CityMind - Model Registry
+-------------------------
+Mantiene en memoria los modelos XGBoost servidos por la API, cargándolos
+una sola vez por proceso (worker) en lugar de hacer joblib.load en cada POST.
+
+- Claves: (target, use_social) → xgboost_{no_social,full_social}_{mhlth,depression}
+- Recarga en caliente: si cambia el mtime/tamaño del fichero se recalcula su
+  hash y, solo si el contenido es distinto, se vuelve a cargar el modelo.
+- Formato de inferencia: si junto al .joblib hay un .trees.npz exportado de
+  ese mismo fichero (scripts/common/tree_arrays.py) las peticiones de pocas
+  filas se sirven con TreeEnsemble, sin importar xgboost ni el wrapper de
+  sklearn; si no, joblib.load. Los lotes grandes (get(..., batch=True)) usan
+  siempre el booster del .joblib, más rápido por fila; se carga la primera
+  vez que se pide un lote.
+- Columnas: al cargar un modelo se comprueba que espera las mismas columnas,
+  en el mismo orden, que el plan de expansión de la API (feature_names_in_ del
+  modelo o del .trees.npz); la API pasa arrays sin nombres a predict.
+- Métricas: número de cargas, recargas, aciertos y tiempo de carga acumulado,
+  actualizadas bajo un lock propio (los aciertos del camino rápido no toman
+  el lock de carga).
+- joblib (y con él xgboost/sklearn) solo se importa si hay que cargar un .joblib.
+"""
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+
+from scripts.common.feature_expansion import get_expansion_plan
+from scripts.common.tree_arrays import TreeEnsemble, trees_path
+
+# ======================================================
+#  CONFIGURACIÓN
+# ======================================================
+MODELS_DIR = Path(__file__).resolve().parent.parent / "models"
+VALID_TARGETS = ("mhlth_crudeprev", "depression_crudeprev")
+
+# Cada cuántos segundos se comprueba el fichero en disco (0 = en cada petición)
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+def model_filename(target, use_social):
+    """Nombre del artefacto joblib para un (target, use_social)."""
+    prefix = "xgboost_full_social" if use_social else "xgboost_no_social"
+    # Separa correctamente el nombre del target (mhlth o depression)
+    model_suffix = target.split("_")[0]
+    return f"{prefix}_{model_suffix}.joblib"
+
+
+def file_signature(path):
+    """(mtime, tamaño) del .joblib y de su .trees.npz (None si no existe)."""
+    stat = path.stat()  # FileNotFoundError si no existe
+    try:
+        trees = trees_path(path).stat()
+        trees_signature = (trees.st_mtime_ns, trees.st_size)
+    except FileNotFoundError:
+        trees_signature = None
+    return stat.st_mtime_ns, stat.st_size, trees_signature
+
+
+class FeatureMismatchError(ValueError):
+    """El modelo en disco no espera las columnas (o el orden) que genera la API."""
+
+
+def check_feature_names(model, expected, path=None):
+    """
+    Lanza FeatureMismatchError si las columnas del modelo no coinciden, en
+    nombre y orden, con `expected`. Sin nombres guardados (modelo entrenado
+    con arrays) solo se puede comprobar el número de columnas.
+    """
+    expected = list(expected)
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        names = [str(name) for name in names]
+        if names != expected:
+            mismatch = next(i for i in range(max(len(names), len(expected)))
+                            if i >= min(len(names), len(expected)) or names[i] != expected[i])
+            raise FeatureMismatchError(
+                f"{path}: columnas del modelo distintas de las de la API desde la posición {mismatch} "
+                f"(modelo: {names[mismatch:mismatch + 1]}, API: {expected[mismatch:mismatch + 1]})"
+            )
+        return
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is not None and n_features != len(expected):
+        raise FeatureMismatchError(f"{path}: el modelo espera {n_features} columnas y la API genera {len(expected)}")
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash SHA-256 del contenido de un fichero (lectura por bloques)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ======================================================
+#  REGISTRO DE MODELOS
+# ======================================================
+class ModelRegistry:
+    """Caché de modelos por proceso con detección de cambios en disco."""
+
+    def __init__(self, models_dir=MODELS_DIR, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.models_dir = Path(models_dir)
+        self.check_interval = check_interval
+        self._entries = {}
+        self._lock = threading.Lock()           # cargas y cambios en _entries
+        self._counters_lock = threading.Lock()  # contadores (también desde el camino rápido)
+        self._counters = {
+            "hits": 0,
+            "loads": 0,
+            "reloads": 0,
+            "load_seconds_total": 0.0,
+        }
+
+    # --------------------------------------------------
+    #  API pública
+    # --------------------------------------------------
+    def path_for(self, target, use_social):
+        return self.models_dir / model_filename(target, use_social)
+
+    def get(self, target, use_social, batch=False):
+        """
+        Devuelve el modelo para (target, use_social), cargándolo si es necesario.
+        Con batch=True devuelve el modelo del .joblib (más rápido en lotes
+        grandes que TreeEnsemble). Lanza FileNotFoundError si el artefacto no
+        existe y FeatureMismatchError si sus columnas no son las del plan de
+        expansión.
+        """
+        key = (target, bool(use_social))
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        slot = "batch_model" if batch else "model"
+
+        # Camino rápido: modelo cargado y comprobación reciente
+        if (entry is not None and now - entry["checked_at"] < self.check_interval
+                and entry[slot] is not None):
+            self._hit(entry)
+            return entry[slot]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            path = self.path_for(*key)
+            signature = file_signature(path)
+
+            if entry is not None:
+                entry["checked_at"] = now
+                if entry["signature"] == signature:
+                    self._hit(entry)
+                    return self._serve(entry, batch)
+
+                # El fichero se ha tocado: recargar solo si cambia el contenido
+                # (o si aparece, cambia o desaparece su .trees.npz)
+                sha256 = file_sha256(path)
+                if sha256 == entry["sha256"] and signature[2] == entry["signature"][2]:
+                    entry["signature"] = signature
+                    self._hit(entry)
+                    return self._serve(entry, batch)
+            else:
+                sha256 = file_sha256(path)
+
+            entry = self._load(key, path, signature, sha256, reload=entry is not None)
+            return self._serve(entry, batch)
+
+    def clear(self):
+        """Vacía la caché (los contadores se conservan)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores globales y estado de cada modelo cargado."""
+        with self._lock:
+            entries = list(self._entries.items())
+        with self._counters_lock:
+            counters = dict(self._counters)
+            hits = {key: entry["hits"] for key, entry in entries}
+
+        models = {}
+        for (target, use_social), entry in entries:
+            models[f"{target}|{'full_social' if use_social else 'no_social'}"] = {
+                "path": str(entry["path"]),
+                "sha256": entry["sha256"],
+                "backend": entry["backend"],
+                "batch_backend": "joblib" if entry["batch_model"] is not None else None,
+                "load_seconds": round(entry["load_seconds"], 4),
+                "loaded_at": entry["loaded_at"],
+                "hits": hits[(target, use_social)],
+            }
+        counters["load_seconds_total"] = round(counters["load_seconds_total"], 4)
+        return {**counters, "models": models}
+
+    # --------------------------------------------------
+    #  Internos
+    # --------------------------------------------------
+    def _load(self, key, path, signature, sha256, reload=False):
+        start = time.perf_counter()
+        model, backend = self._read(path, sha256)
+        check_feature_names(model, get_expansion_plan(*key).feature_names, path)
+        elapsed = time.perf_counter() - start
+
+        self._entries[key] = entry = {
+            "model": model,
+            "batch_model": model if backend == "joblib" else None,
+            "backend": backend,
+            "path": path,
+            "signature": signature,
+            "sha256": sha256,
+            "load_seconds": elapsed,
+            "loaded_at": time.time(),
+            "checked_at": time.monotonic(),
+            "hits": 0,
+        }
+        with self._counters_lock:
+            self._counters["loads"] += 1
+            self._counters["load_seconds_total"] += elapsed
+            if reload:
+                self._counters["reloads"] += 1
+        return entry
+
+    def _hit(self, entry):
+        with self._counters_lock:
+            self._counters["hits"] += 1
+            entry["hits"] += 1
+
+    @staticmethod
+    def _serve(entry, batch):
+        """Modelo de la entrada; el del .joblib para lotes (cargado bajo el lock)."""
+        if not batch:
+            return entry["model"]
+        if entry["batch_model"] is None:
+            import joblib
+
+            entry["batch_model"] = joblib.load(entry["path"])
+        return entry["batch_model"]
+
+    @staticmethod
+    def _read(path, sha256):
+        """TreeEnsemble si el .trees.npz corresponde a este .joblib; si no, el joblib."""
+        trees = trees_path(path)
+        if trees.exists():
+            try:
+                ensemble = TreeEnsemble.load(trees)
+                if ensemble.source_sha256 == sha256:
+                    return ensemble, "tree_arrays"
+            except (OSError, ValueError, KeyError):
+                pass  # .npz incompleto o de otra versión: se sirve el joblib
+        import joblib
+
+        return joblib.load(path), "joblib"
+
+
+# Instancia compartida por todas las vistas del proceso
+registry = ModelRegistry()
@@ -0,0 +1,270 @@
+"""
+CityMind - Prediction Write Buffer
+----------------------------------
+Modo "write-behind" opcional para las predicciones de la API:
+PredictView encola la instancia de Prediction sin guardarla y un hilo en
+segundo plano la persiste con bulk_create cuando se alcanza un tamaño o un
+tiempo máximo. La cola está acotada (si se llena, la vista guarda de forma
+síncrona) y se vacía al cerrar el proceso.
+
+Si un bloque falla se reintenta (WRITE_RETRIES) y, si sigue fallando, se
+guarda fila a fila; las filas que aun así fallan se añaden a un fichero de
+rechazos JSON Lines (REJECTS_PATH) para poder recuperarlas.
+
+La respuesta de la API en este modo es 202 sin `id` ni `prediction_date`
+(la fila aún no existe en la base de datos).
+
+Se activa con PREDICTION_WRITE_BEHIND=1 (ver settings.PREDICTION_BUFFER).
+"""
+
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import Prediction
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionWriteBuffer:
+    """Cola acotada + hilo escritor que agrupa inserciones de Prediction."""
+
+    def __init__(self, max_size=10000, flush_size=500, flush_interval=1.0, bulk_batch_size=1000,
+                 write_retries=2, retry_delay=0.5, rejects_path="logs/prediction_rejects.jsonl"):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.bulk_batch_size = bulk_batch_size
+        self.write_retries = write_retries
+        self.retry_delay = retry_delay
+        self.rejects_path = Path(rejects_path)
+        self._queue = queue.Queue(maxsize=max_size)
+        self._flush_lock = threading.Lock()
+        self._counters_lock = threading.Lock()  # vistas (submit) y hilo escritor
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._counters = {
+            "enqueued": 0,
+            "rejected_full": 0,
+            "written": 0,
+            "retries": 0,
+            "saved_row_by_row": 0,
+            "failed": 0,          # filas enviadas al fichero de rechazos
+            "flushes": 0,
+            "last_flush_seconds": 0.0,
+            "last_flush_rows": 0,
+        }
+
+    # --------------------------------------------------
+    #  Productor (vistas)
+    # --------------------------------------------------
+    def submit(self, prediction):
+        """
+        Encola una Prediction sin guardar. Devuelve False si la cola está llena
+        (el llamador debe guardarla de forma síncrona).
+        """
+        try:
+            self._queue.put_nowait(prediction)
+        except queue.Full:
+            self._count(rejected_full=1)
+            return False
+        self._count(enqueued=1)
+        return True
+
+    # --------------------------------------------------
+    #  Consumidor (hilo escritor)
+    # --------------------------------------------------
+    def start(self):
+        """Arranca el hilo escritor (idempotente) y registra el vaciado al salir."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout=10.0):
+        """Detiene el hilo y escribe todo lo pendiente."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self):
+        """Vacía la cola de forma síncrona. Devuelve el número de filas escritas."""
+        written = 0
+        while True:
+            batch = self._drain(self.flush_size)
+            if not batch:
+                return written
+            written += self._write(batch)
+
+    def _run(self):
+        try:
+            while not self._stop_event.is_set():
+                batch = self._collect()
+                if batch:
+                    self._write(batch)
+        finally:
+            # Cada hilo tiene su propia conexión: cerrarla al terminar
+            connection.close()
+
+    def _collect(self):
+        """Espera hasta flush_size elementos o flush_interval segundos desde el primero."""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size and not self._stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """bulk_create con reintentos; si no, fila a fila; las que fallan, al fichero de rechazos."""
+        with self._flush_lock:
+            start = time.perf_counter()
+            for attempt in range(self.write_retries + 1):
+                if attempt:
+                    self._count(retries=1)
+                    time.sleep(self.retry_delay * attempt)
+                    _reset_broken_connection()
+                try:
+                    Prediction.objects.bulk_create(_unsaved(batch), batch_size=self.bulk_batch_size)
+                    written = len(batch)
+                    break
+                except Exception as e:
+                    logger.error(f"Error guardando {len(batch)} predicciones en bloque (intento {attempt + 1}): {e}")
+            else:
+                written = self._write_rows(batch)
+
+            self._count(written=written, flushes=1)
+            with self._counters_lock:
+                self._counters["last_flush_rows"] = written
+                self._counters["last_flush_seconds"] = time.perf_counter() - start
+            return written
+
+    def _write_rows(self, batch):
+        """Último recurso: cada fila en su propia transacción; devuelve las guardadas."""
+        written, rejects = 0, []
+        for prediction in _unsaved(batch):
+            try:
+                with transaction.atomic():
+                    prediction.save()
+                written += 1
+            except Exception as e:
+                rejects.append((prediction, e))
+        self._count(saved_row_by_row=written, failed=len(rejects))
+        if rejects:
+            self._save_rejects(rejects)
+        return written
+
+    def _save_rejects(self, rejects):
+        """Añade las filas no guardadas al fichero de rechazos (una línea JSON por fila)."""
+        now = timezone.now().isoformat()
+        self.rejects_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.rejects_path, "a", encoding="utf-8") as f:
+            for prediction, error in rejects:
+                f.write(json.dumps({
+                    "place_id": prediction.place_id,
+                    "model_used": prediction.model_used,
+                    "target": prediction.target,
+                    "predicted_value": prediction.predicted_value,
+                    "input_vector": prediction.input_vector,
+                    "rejected_at": now,
+                    "error": str(error),
+                }, default=str) + "\n")
+        logger.error(f"{len(rejects)} predicciones no guardadas añadidas a {self.rejects_path}")
+
+    def _count(self, **increments):
+        with self._counters_lock:
+            for name, value in increments.items():
+                self._counters[name] += value
+
+    # --------------------------------------------------
+    #  Métricas
+    # --------------------------------------------------
+    def stats(self):
+        with self._counters_lock:
+            counters = dict(self._counters)
+        counters["last_flush_seconds"] = round(counters["last_flush_seconds"], 4)
+        return {
+            **counters,
+            "pending": self._queue.qsize(),
+            "max_size": self._queue.maxsize,
+            "flush_size": self.flush_size,
+            "flush_interval": self.flush_interval,
+            "writer_alive": self._thread is not None and self._thread.is_alive(),
+        }
+
+
+def _reset_broken_connection():
+    """Cierra la conexión del hilo si está caída (Django abre otra en la siguiente consulta)."""
+    if connection.connection is not None and not connection.in_atomic_block and not connection.is_usable():
+        connection.close()
+
+
+def _unsaved(batch):
+    """
+    Deja las instancias como nuevas: tras un bulk_create fallido pueden
+    conservar un pk de una transacción ya deshecha.
+    """
+    for prediction in batch:
+        prediction.pk = None
+        prediction._state.adding = True
+    return batch
+
+
+# ======================================================
+#  INSTANCIA DEL PROCESO
+# ======================================================
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def write_behind_enabled():
+    return getattr(settings, "PREDICTION_WRITE_BEHIND", False)
+
+
+def get_buffer():
+    """Devuelve el buffer del proceso (creándolo y arrancándolo la primera vez)."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = getattr(settings, "PREDICTION_BUFFER", {})
+                buffer = PredictionWriteBuffer(
+                    max_size=config.get("MAX_SIZE", 10000),
+                    flush_size=config.get("FLUSH_SIZE", 500),
+                    flush_interval=config.get("FLUSH_INTERVAL", 1.0),
+                    write_retries=config.get("WRITE_RETRIES", 2),
+                    rejects_path=config.get("REJECTS_PATH", "logs/prediction_rejects.jsonl"),
+                )
+                buffer.start()
+                _buffer = buffer
+    return _buffer
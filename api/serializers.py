@@ -17,7 +17,10 @@ class PlaceRecordSerializer(serializers.ModelSerializer):
 class ModelMetricsSerializer(serializers.ModelSerializer):
     class Meta:
         model = ModelMetrics
-        fields = ["id", "model_name", "target", "r2_score", "mae", "rmse", "timestamp"]
+        fields = [
+            "id", "model_name", "target", "r2_score", "mae", "rmse",
+            "fit_seconds", "best_iteration", "predict_us_per_row", "timestamp",
+        ]
 
 
 # ======================================================
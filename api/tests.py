@@ -1,3 +1,261 @@
-from django.test import TestCase
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from api.model_registry import FeatureMismatchError
+from api.prediction_buffer import PredictionWriteBuffer
+from core.models import Prediction
+from scripts.common.feature_expansion import get_expansion_plan
+from scripts.common.tree_arrays import SMALL_BATCH_ROWS
+
+
+# ======================================================
+#  BUFFER DE ESCRITURA DIFERIDA
+# ======================================================
+def make_prediction(value):
+    return Prediction(
+        model_used="models/xgboost_full_social_mhlth.joblib",
+        target="mhlth_crudeprev",
+        predicted_value=value,
+        input_vector={"health_index": 0.3},
+    )
+
+
+class PredictionWriteBufferTests(TestCase):
+
+    def test_flush_writes_pending_predictions(self):
+        """flush() persiste todo lo encolado con bulk_create"""
+        buffer = PredictionWriteBuffer(max_size=100, flush_size=10)
+        for i in range(25):
+            self.assertTrue(buffer.submit(make_prediction(i)))
+
+        self.assertEqual(Prediction.objects.count(), 0)
+        self.assertEqual(buffer.flush(), 25)
+        self.assertEqual(Prediction.objects.count(), 25)
+
+        stats = buffer.stats()
+        self.assertEqual(stats["written"], 25)
+        self.assertEqual(stats["flushes"], 3)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_bounded_queue_rejects_when_full(self):
+        """Con la cola llena submit() devuelve False (el llamador guarda en síncrono)"""
+        buffer = PredictionWriteBuffer(max_size=2)
+        self.assertTrue(buffer.submit(make_prediction(1)))
+        self.assertTrue(buffer.submit(make_prediction(2)))
+        self.assertFalse(buffer.submit(make_prediction(3)))
+        self.assertEqual(buffer.stats()["rejected_full"], 1)
+
+
+    def test_failed_bulk_write_falls_back_to_rows_and_rejects_file(self):
+        """Si bulk_create falla siempre: se guarda fila a fila y lo que falla va a rechazos"""
+        with tempfile.TemporaryDirectory() as tmp:
+            rejects_path = Path(tmp) / "rejects.jsonl"
+            buffer = PredictionWriteBuffer(write_retries=1, retry_delay=0, rejects_path=rejects_path)
+            for i in range(3):
+                buffer.submit(make_prediction(i))
+            broken = make_prediction(99)
+            broken.target = None  # NOT NULL → falla también al guardarla sola
+            buffer.submit(broken)
+
+            with mock.patch.object(Prediction.objects, "bulk_create", side_effect=RuntimeError("db caída")), \
+                    self.assertLogs("api.prediction_buffer", "ERROR"):
+                self.assertEqual(buffer.flush(), 3)
+
+            self.assertEqual(sorted(Prediction.objects.values_list("predicted_value", flat=True)), [0, 1, 2])
+            rejects = [json.loads(line) for line in rejects_path.read_text().splitlines()]
+            self.assertEqual([r["predicted_value"] for r in rejects], [99])
+
+        stats = buffer.stats()
+        self.assertEqual((stats["retries"], stats["saved_row_by_row"], stats["failed"]), (1, 3, 1))
+
+    def test_retry_succeeds_after_transient_error(self):
+        """Un fallo puntual se resuelve con el reintento, en bloque y sin duplicados"""
+        buffer = PredictionWriteBuffer(write_retries=2, retry_delay=0)
+        for i in range(5):
+            buffer.submit(make_prediction(i))
+
+        real_bulk_create = Prediction.objects.bulk_create
+        calls = {"n": 0}
+
+        def flaky(objs, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise RuntimeError("timeout")
+            return real_bulk_create(objs, **kwargs)
+
+        with mock.patch.object(Prediction.objects, "bulk_create", side_effect=flaky), \
+                self.assertLogs("api.prediction_buffer", "ERROR"):
+            self.assertEqual(buffer.flush(), 5)
+        self.assertEqual(Prediction.objects.count(), 5)
+        self.assertEqual(buffer.stats()["saved_row_by_row"], 0)
+
+
+class PredictionWriterThreadTests(TransactionTestCase):
+    """El hilo escritor persiste lo encolado sin llamar a flush() (otra conexión: TransactionTestCase)."""
+
+    def test_writer_thread_flushes_by_interval(self):
+        buffer = PredictionWriteBuffer(flush_size=100, flush_interval=0.05)
+        buffer.start()
+        try:
+            for i in range(3):
+                buffer.submit(make_prediction(i))
+            deadline = time.monotonic() + 5
+            while buffer.stats()["written"] < 3 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            self.assertTrue(buffer.stats()["writer_alive"])
+        finally:
+            buffer.stop()
+        self.assertEqual(Prediction.objects.count(), 3)
+        self.assertEqual(buffer.stats()["pending"], 0)
+
+
+# ======================================================
+#  RESPUESTA 202 EN MODO WRITE-BEHIND
+# ======================================================
+class _ConstantModel:
+    def predict(self, X):
+        return np.full(len(X), 12.5)
+
+
+@override_settings(PREDICTION_WRITE_BEHIND=True)
+class WriteBehindPredictViewTests(TestCase):
+    """/api/predict/ encola la predicción y responde 202 sin id (aún no existe la fila)."""
+
+    @mock.patch("api.views.registry.get", return_value=_ConstantModel())
+    def test_predict_returns_202_without_id(self, _):
+        buffer = PredictionWriteBuffer()
+        with mock.patch("api.views.get_buffer", return_value=buffer):
+            response = APIClient(SERVER_NAME="localhost").post(
+                "/api/predict/", {"health_index": 0.3}, format="json"
+            )
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertIsNone(data["id"])
+        self.assertIsNone(data["prediction_date"])
+        self.assertEqual(data["predicted_value"], 12.5)
+
+        self.assertEqual(Prediction.objects.count(), 0)
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(Prediction.objects.get().predicted_value, 12.5)
+
+# ======================================================
+#  MODELO INCOMPATIBLE CON LA EXPANSIÓN DE FEATURES
+# ======================================================
+class FeatureMismatchTests(TestCase):
+    """Si el registro rechaza el modelo por sus columnas, la API no predice."""
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME="localhost")
+
+    @mock.patch("api.views.registry.get", side_effect=FeatureMismatchError("columnas distintas"))
+    def test_predict_endpoints_return_error(self, _):
+        for url, payload in [("/api/predict/", {"health_index": 0.3}),
+                             ("/api/predict/batch/", [{"health_index": 0.3}])]:
+            with self.subTest(url=url):
+                response = self.client.post(url, payload, format="json")
+                self.assertEqual(response.status_code, 500)
+                self.assertIn("columnas distintas", response.json()["error"])
+        self.assertEqual(Prediction.objects.count(), 0)
+
+
+# ======================================================
+#  PREDICCIÓN POR LOTES (/api/predict/batch/)
+# ======================================================
+class _KeyedModel:
+    """Modelo falso: devuelve un valor fijo por (target, use_social) y registra cada llamada."""
+
+    def __init__(self, value, n_features):
+        self.value, self.n_features, self.calls = value, n_features, []
+
+    def predict(self, X):
+        assert X.shape[1] == self.n_features
+        self.calls.append(len(X))
+        return np.full(len(X), self.value)
+
+
+class BatchPredictViewTests(TestCase):
+    URL = "/api/predict/batch/"
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME="localhost")
+        self.models = {
+            (target, use_social): _KeyedModel(value, len(get_expansion_plan(target, use_social).feature_names))
+            for value, (target, use_social) in enumerate(
+                [("mhlth_crudeprev", True), ("mhlth_crudeprev", False),
+                 ("depression_crudeprev", True), ("depression_crudeprev", False)], start=1)
+        }
+        patcher = mock.patch("api.views.registry.get",
+                             side_effect=lambda t, s, batch=False: self.models[(t, bool(s))])
+        self.registry_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def items(self):
+        return [
+            {"target": "mhlth_crudeprev", "use_social": True, "health_index": 0.1},
+            {"target": "depression_crudeprev", "use_social": False, "health_index": 0.2},
+            {"target": "mhlth_crudeprev", "use_social": False},
+            {"target": "depression_crudeprev", "use_social": False, "health_index": 0.4},
+            {"health_index": 0.5},  # por defecto: mhlth_crudeprev, full_social
+        ]
+
+    def test_mixed_batch_grouped_by_model(self):
+        """Una llamada a predict por modelo y resultados en el orden de entrada"""
+        response = self.client.post(self.URL, self.items(), format="json")
+        self.assertEqual(response.status_code, 201)
+        results = response.json()["results"]
+        self.assertEqual([r["predicted_value"] for r in results], [1, 4, 2, 4, 1])
+        self.assertEqual(results[1]["model_used"], "models/xgboost_no_social_depression.joblib")
+        self.assertEqual(self.models[("mhlth_crudeprev", True)].calls, [2])
+        self.assertEqual(self.models[("depression_crudeprev", False)].calls, [2])
+        self.assertEqual(self.models[("depression_crudeprev", True)].calls, [])
+
+    def test_large_groups_use_batch_model(self):
+        """Grupos de más de SMALL_BATCH_ROWS filas piden el booster (batch=True); los pequeños, no"""
+        items = self.items() + [{"target": "depression_crudeprev", "use_social": True}] * (SMALL_BATCH_ROWS + 1)
+        self.client.post(self.URL, {"items": items, "persist": False}, format="json")
+        batch = {call.args[:2]: call.kwargs["batch"] for call in self.registry_get.call_args_list}
+        self.assertTrue(batch[("depression_crudeprev", True)])
+        self.assertFalse(batch[("mhlth_crudeprev", True)])
+
+    def test_persisted_rows_have_ids(self):
+        """bulk_create devuelve los ids (PostgreSQL y SQLite ≥ 3.35) y coinciden con las filas"""
+        results = self.client.post(self.URL, {"items": self.items()}, format="json").json()["results"]
+        ids = [r["id"] for r in results]
+        self.assertTrue(all(isinstance(pk, int) for pk in ids))
+        saved = Prediction.objects.in_bulk(ids)
+        self.assertEqual(len(saved), len(ids))
+        for result in results:
+            self.assertEqual(saved[result["id"]].predicted_value, result["predicted_value"])
+            self.assertEqual(saved[result["id"]].target, result["target"])
+
+    def test_persist_false_writes_nothing(self):
+        response = self.client.post(self.URL, {"items": self.items(), "persist": False}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["persisted"])
+        self.assertTrue(all(r["id"] is None for r in response.json()["results"]))
+        self.assertEqual(Prediction.objects.count(), 0)
+
+    def test_invalid_payloads_rejected(self):
+        """Elementos no válidos o demasiados elementos → 400 sin guardar nada"""
+        invalid = {
+            "lista vacía": [],
+            "sin lista": {"items": "x"},
+            "elemento no objeto": [{"health_index": 0.1}, 3],
+            "target no válido": [{"target": "obesity_crudeprev"}],
+        }
+        for label, payload in invalid.items():
+            with self.subTest(label):
+                self.assertEqual(self.client.post(self.URL, payload, format="json").status_code, 400)
+
+        with mock.patch("api.views.BatchPredictView.MAX_ITEMS", 3):
+            response = self.client.post(self.URL, self.items(), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Máximo 3", response.json()["error"])
+        self.assertEqual(Prediction.objects.count(), 0)
@@ -6,7 +6,7 @@ from core.views import (
     ComparisonSummaryViewSet,
     PredictionViewSet,
 )
-from .views import PredictView
+from .views import PredictView, BatchPredictView, ModelRegistryView, PredictionBufferView
 
 # 1️⃣ Router DRF (para CRUDs y endpoints "latest")
 router = DefaultRouter()
@@ -18,6 +18,9 @@ router.register(r'predictions', PredictionViewSet)
 # 2️⃣ Endpoint personalizado de predicción
 urlpatterns = [
     path("predict/", PredictView.as_view(), name="predict"),
+    path("predict/batch/", BatchPredictView.as_view(), name="predict-batch"),
+    path("predict/buffer/", PredictionBufferView.as_view(), name="predict-buffer"),
+    path("models/registry/", ModelRegistryView.as_view(), name="model-registry"),
 ]
 
 # 3️⃣ Combinar ambos grupos de rutas
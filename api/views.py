@@ -1,12 +1,18 @@
-import joblib
-import pandas as pd
+import numpy as np
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
 from core.models import Prediction
 from api.serializers import PredictionSerializer
-from scripts.common.feature_expansion import expand_features  # traductor de features resumidas
+from api.model_registry import FeatureMismatchError, registry, model_filename, VALID_TARGETS
+from api.prediction_buffer import get_buffer, write_behind_enabled
+from scripts.common.feature_expansion import (  # traductor de features resumidas
+    expand_features_array,
+    expand_features_batch,
+    proxies_to_matrix,
+)
+from scripts.common.tree_arrays import SMALL_BATCH_ROWS
 
 
 class PredictView(APIView):
@@ -15,6 +21,10 @@ class PredictView(APIView):
     -----------------------
     Genera una predicción a partir de 8–9 features simplificadas de la interfaz.
     Internamente expande esas features a las ~45 columnas que el modelo espera.
+
+    Responde 201 con la predicción guardada. Con PREDICTION_WRITE_BEHIND=1
+    responde 202: la predicción queda encolada y la respuesta lleva
+    `id` y `prediction_date` a null (se asignan al escribirse el bloque).
     """
 
     def post(self, request):
@@ -31,56 +41,61 @@ class PredictView(APIView):
                 )
 
             # ======================================================
-            # 2️⃣ Expandir las features a las columnas originales
-            # ======================================================
-            expanded_row = expand_features(proxy_data)
-            X = pd.DataFrame([expanded_row])
-
-            # ======================================================
-            # 3️⃣ Seleccionar modelo según 'target' y 'use_social'
+            # 2️⃣ Seleccionar modelo según 'target' y 'use_social'
             # ======================================================
             target = proxy_data.get("target", "mhlth_crudeprev")
             use_social = bool(proxy_data.get("use_social", True))
 
-            if target not in ["mhlth_crudeprev", "depression_crudeprev"]:
+            if target not in VALID_TARGETS:
                 return Response(
                     {"error": "Target no válido. Usa 'mhlth_crudeprev' o 'depression_crudeprev'."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            prefix = "xgboost_full_social" if use_social else "xgboost_no_social"
-            # Separa correctamente el nombre del target (mhlth o depression)
-            model_suffix = target.split("_")[0]
-            model_path = f"models/{prefix}_{model_suffix}.joblib"
+            # ======================================================
+            # 3️⃣ Expandir las features a las columnas originales (1 × n_features)
+            # ======================================================
+            X = expand_features_array(proxy_data).reshape(1, -1)
+
+            model_path = f"models/{model_filename(target, use_social)}"
 
             # ======================================================
-            # 4️⃣ Cargar modelo y generar predicción
+            # 4️⃣ Obtener modelo (caché por proceso) y generar predicción
             # ======================================================
             try:
-                model = joblib.load(model_path)
+                model = registry.get(target, use_social)
             except FileNotFoundError:
                 return Response(
                     {"error": f"No se encontró el modelo en: {model_path}"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+            except FeatureMismatchError as e:
+                # Modelo incompatible con la expansión: no se predice con columnas cruzadas
+                return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             y_pred = float(model.predict(X)[0])  # Valor escalar
 
             # ======================================================
             # 5️⃣ Guardar predicción en la base de datos
+            #    (o encolarla si el modo write-behind está activo)
             # ======================================================
-            prediction = Prediction.objects.create(
+            prediction = Prediction(
                 model_used=model_path,
                 target=target,
                 predicted_value=y_pred,
                 input_vector=proxy_data,
             )
+            if write_behind_enabled() and get_buffer().submit(prediction):
+                response_status = status.HTTP_202_ACCEPTED
+            else:
+                prediction.save()
+                response_status = status.HTTP_201_CREATED
 
             # ======================================================
             # 6️⃣ Devolver respuesta al cliente
             # ======================================================
             serializer = PredictionSerializer(prediction)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            return Response(serializer.data, status=response_status)
 
         except Exception as e:
             # Captura general de errores inesperados
@@ -88,3 +103,157 @@ class PredictView(APIView):
                 {"error": f"Error interno en la predicción: {str(e)}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+
+class BatchPredictView(APIView):
+    """
+    CityMind - BatchPredictView
+    ---------------------------
+    Genera predicciones para muchos vectores simplificados en una sola llamada.
+    Acepta una lista de vectores (o {"items": [...], "persist": bool}) con
+    targets y 'use_social' mezclados: agrupa por modelo, construye una matriz
+    NumPy por grupo, llama a model.predict una vez por grupo y guarda los
+    resultados con bulk_create. Los grupos de más de SMALL_BATCH_ROWS filas
+    se predicen con el booster del .joblib (más rápido en lotes que los
+    arrays de árboles que sirven /api/predict/).
+    """
+
+    MAX_ITEMS = 50000
+    BULK_BATCH_SIZE = 1000
+
+    def post(self, request):
+        try:
+            # ======================================================
+            # 1️⃣ Recibir la lista de vectores simplificados
+            # ======================================================
+            payload = request.data
+            if isinstance(payload, list):
+                items, persist = payload, True
+            else:
+                items = payload.get("items") if payload else None
+                persist = bool(payload.get("persist", True)) if payload else True
+
+            if not items or not isinstance(items, list):
+                return Response(
+                    {"error": "Se esperaba una lista no vacía de vectores de entrada."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if len(items) > self.MAX_ITEMS:
+                return Response(
+                    {"error": f"Máximo {self.MAX_ITEMS} vectores por llamada (recibidos {len(items)})."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # ======================================================
+            # 2️⃣ Agrupar índices por modelo (target, use_social)
+            # ======================================================
+            groups = {}
+            for i, proxy_data in enumerate(items):
+                if not isinstance(proxy_data, dict):
+                    return Response(
+                        {"error": f"El elemento {i} no es un objeto JSON."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                target = proxy_data.get("target", "mhlth_crudeprev")
+                if target not in VALID_TARGETS:
+                    return Response(
+                        {"error": f"Target no válido en el elemento {i}. Usa 'mhlth_crudeprev' o 'depression_crudeprev'."},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                use_social = bool(proxy_data.get("use_social", True))
+                groups.setdefault((target, use_social), []).append(i)
+
+            # ======================================================
+            # 3️⃣ Una matriz y una llamada a predict por grupo
+            # ======================================================
+            y_pred = np.empty(len(items), dtype=float)
+            model_paths = [None] * len(items)
+
+            for (target, use_social), indices in groups.items():
+                model_path = f"models/{model_filename(target, use_social)}"
+                try:
+                    model = registry.get(target, use_social, batch=len(indices) > SMALL_BATCH_ROWS)
+                except FileNotFoundError:
+                    return Response(
+                        {"error": f"No se encontró el modelo en: {model_path}"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                except FeatureMismatchError as e:
+                    # Modelo incompatible con la expansión: no se predice con columnas cruzadas
+                    return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+                X = expand_features_batch(
+                    proxies_to_matrix([items[i] for i in indices]), target, use_social
+                )
+                y_pred[indices] = model.predict(X)
+                for i in indices:
+                    model_paths[i] = model_path
+
+            # ======================================================
+            # 4️⃣ Guardar predicciones en bloque
+            # ======================================================
+            ids = [None] * len(items)
+            if persist:
+                created = Prediction.objects.bulk_create(
+                    [
+                        Prediction(
+                            model_used=model_paths[i],
+                            target=items[i].get("target", "mhlth_crudeprev"),
+                            predicted_value=float(y_pred[i]),
+                            input_vector=items[i],
+                        )
+                        for i in range(len(items))
+                    ],
+                    batch_size=self.BULK_BATCH_SIZE,
+                )
+                ids = [p.pk for p in created]
+
+            # ======================================================
+            # 5️⃣ Devolver resultados en el orden de entrada
+            # ======================================================
+            results = [
+                {
+                    "id": ids[i],
+                    "target": items[i].get("target", "mhlth_crudeprev"),
+                    "model_used": model_paths[i],
+                    "predicted_value": float(y_pred[i]),
+                }
+                for i in range(len(items))
+            ]
+            return Response(
+                {"count": len(results), "persisted": persist, "results": results},
+                status=status.HTTP_201_CREATED if persist else status.HTTP_200_OK,
+            )
+
+        except Exception as e:
+            # Captura general de errores inesperados
+            return Response(
+                {"error": f"Error interno en la predicción por lotes: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+
+class ModelRegistryView(APIView):
+    """
+    CityMind - ModelRegistryView
+    ----------------------------
+    Expone los contadores del registro de modelos del proceso actual
+    (cargas, recargas, aciertos y tiempos de carga).
+    """
+
+    def get(self, request):
+        return Response(registry.stats(), status=status.HTTP_200_OK)
+
+
+class PredictionBufferView(APIView):
+    """
+    CityMind - PredictionBufferView
+    -------------------------------
+    Métricas del buffer de escritura diferida de predicciones
+    (encoladas, escritas, pendientes, rechazadas por cola llena...).
+    """
+
+    def get(self, request):
+        if not write_behind_enabled():
+            return Response({"enabled": False}, status=status.HTTP_200_OK)
+        return Response({"enabled": True, **get_buffer().stats()}, status=status.HTTP_200_OK)
@@ -105,6 +105,10 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 # 🔑 Clave primaria por defecto
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# INCLUDE (r2_score) de metrics_family_lookup_idx solo existe en PostgreSQL;
+# en SQLite (desarrollo, CI) se crea el índice sin esa columna
+SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
 # ⚙️ Configuración Django REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
@@ -118,4 +122,34 @@ REST_FRAMEWORK = {
         "rest_framework.authentication.TokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # Listados paginados por cursor (keyset): ?cursor=... y ?page_size=n
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.CursorPagination",
+    "PAGE_SIZE": 100,
+}
+
+# 🗄️ Caché (portada del dashboard). Por defecto en disco: compartida entre los
+# workers y el proceso de ingesta, que la invalida al cargar datos nuevos.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / "data" / "cache" / "django")),
+    }
+}
+HOME_CACHE_TTL = int(os.getenv("HOME_CACHE_TTL", "60"))  # segundos
+
+# 🔢 Totales de la portada: estimación de pg_class (O(1)) salvo en tablas
+# pequeñas, que se cuentan con COUNT(*) (ver core/counts.py)
+EXACT_COUNT_BELOW = int(os.getenv("EXACT_COUNT_BELOW", "10000"))
+
+# ⚡ Persistencia diferida de predicciones (write-behind, opcional)
+# Con PREDICTION_WRITE_BEHIND=1, /api/predict/ encola la predicción y un hilo
+# en segundo plano la guarda con bulk_create (ver api/prediction_buffer.py).
+PREDICTION_WRITE_BEHIND = os.getenv("PREDICTION_WRITE_BEHIND", "0") == "1"
+PREDICTION_BUFFER = {
+    "MAX_SIZE": int(os.getenv("PREDICTION_BUFFER_MAX_SIZE", "10000")),      # filas en memoria como máximo
+    "FLUSH_SIZE": int(os.getenv("PREDICTION_BUFFER_FLUSH_SIZE", "500")),    # escribe al llegar a N filas...
+    "FLUSH_INTERVAL": float(os.getenv("PREDICTION_BUFFER_FLUSH_INTERVAL", "1.0")),  # ...o cada N segundos
+    "WRITE_RETRIES": int(os.getenv("PREDICTION_BUFFER_WRITE_RETRIES", "2")),   # reintentos del bloque
+    # filas que no se pudieron guardar ni una a una (JSON Lines, recuperables)
+    "REJECTS_PATH": os.getenv("PREDICTION_BUFFER_REJECTS_PATH", str(BASE_DIR / "logs" / "prediction_rejects.jsonl")),
 }
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import PlaceRecord, ModelMetrics, ComparisonSummary, Prediction
+from .models import PlaceRecord, ModelMetrics, ComparisonSummary, Prediction, IngestionLedger
 
 
 # ======================================================
@@ -23,10 +23,14 @@ class ModelMetricsAdmin(admin.ModelAdmin):
         "r2_score",
         "mae",
         "rmse",
+        "fit_seconds",
+        "best_iteration",
+        "predict_us_per_row",
         "timestamp",
     )
     search_fields = ("model_name", "target")
-    list_filter = ("target", "dataset_type")  # 👈 permite filtrar por tipo de dataset
+    list_filter = ("model_family", "target", "dataset_type")  # 👈 permite filtrar por tipo de dataset
+    readonly_fields = ("model_family",)  # se calcula desde model_name al guardar
     ordering = ("-timestamp",)
 
 
@@ -51,3 +55,11 @@ class PredictionAdmin(admin.ModelAdmin):
     search_fields = ("place__name", "model_used", "target")
     list_filter = ("model_used", "target")
     ordering = ("-prediction_date",)
+
+
+@admin.register(IngestionLedger)
+class IngestionLedgerAdmin(admin.ModelAdmin):
+    list_display = ("source", "table", "row_count", "rejected_rows", "file_sha256", "ingested_at")
+    list_filter = ("table",)
+    exclude = ("row_hashes",)  # 👈 puede contener miles de entradas
+    ordering = ("-ingested_at",)
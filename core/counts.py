@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db import connection
+
+
+# ======================================================
+#  RECUENTOS ESTIMADOS (sin COUNT(*))
+# ======================================================
+# Misma estimación que usa el planificador de PostgreSQL: densidad de filas
+# del último ANALYZE/VACUUM (reltuples / relpages) × páginas actuales de la
+# tabla. Coste O(1) (catálogo + tamaño del fichero) y sigue el crecimiento
+# de la tabla entre un ANALYZE y el siguiente.
+ESTIMATE_SQL = """
+    SELECT c.relname,
+           CASE WHEN c.reltuples < 0 OR c.relpages = 0 THEN NULL
+                ELSE c.reltuples / c.relpages
+                     * (pg_relation_size(c.oid) / current_setting('block_size')::int)
+           END
+    FROM pg_class c
+    WHERE c.oid = ANY(%s::regclass[])
+"""
+
+
+def table_estimates(*models):
+    """
+    {modelo: filas estimadas} de las tablas que no conviene contar: en
+    PostgreSQL, las que tienen estadísticas y al menos
+    settings.EXACT_COUNT_BELOW filas (por debajo COUNT(*) es barato y la
+    estimación pierde precisión). En otros motores, vacío.
+    """
+    estimates = {}
+    if connection.vendor == "postgresql":
+        tables = {model._meta.db_table: model for model in models}
+        with connection.cursor() as cursor:
+            cursor.execute(ESTIMATE_SQL, [list(tables)])
+            for table, rows in cursor.fetchall():
+                if rows is not None and rows >= settings.EXACT_COUNT_BELOW:
+                    estimates[tables[table]] = int(rows)
+    return estimates
+
+
+def estimated_counts(*models):
+    """{modelo: número de filas}: estimación (table_estimates) o, si no la hay, COUNT(*)."""
+    estimates = table_estimates(*models)
+    return {model: estimates[model] if model in estimates else model.objects.count() for model in models}
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_prediction_place'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('source', models.CharField(max_length=255)),
+                ('table', models.CharField(max_length=50)),
+                ('file_sha256', models.CharField(max_length=64)),
+                ('row_count', models.IntegerField(default=0)),
+                ('row_hashes', models.JSONField(blank=True, default=dict)),
+                ('ingested_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Ingestion Ledger',
+                'verbose_name_plural': 'Ingestion Ledger',
+                'db_table': 'ingestion_ledger',
+                'constraints': [models.UniqueConstraint(fields=('source', 'table'), name='unique_ledger_source_table')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_ingestionledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modelmetrics',
+            name='best_iteration',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='modelmetrics',
+            name='fit_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='modelmetrics',
+            name='predict_us_per_row',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_modelmetrics_cost_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comparisonsummary',
+            index=models.Index(fields=['-comparison_date', '-id'], name='comparison_date_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='modelmetrics',
+            index=models.Index(fields=['-timestamp', '-id'], name='metrics_ts_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placerecord',
+            index=models.Index(fields=['name', 'id'], name='place_name_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['-prediction_date', '-id'], name='prediction_date_cursor_idx'),
+        ),
+    ]
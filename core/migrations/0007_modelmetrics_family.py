@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:50
+
+from django.db import migrations, models
+
+
+def fill_model_family(apps, schema_editor):
+    """
+    Rellena model_family en las métricas ya existentes. Copia de la regla de
+    core.models.model_family (las migraciones no importan código de la app);
+    ModelFamilyTests comprueba que ambas dan la misma familia.
+    """
+    ModelMetrics = apps.get_model('core', 'ModelMetrics')
+    families = (('xgboost', 'xgboost'), ('lasso', 'lasso'), ('randomforest', 'random_forest'))
+    for metric in ModelMetrics.objects.only('id', 'model_name').iterator():
+        name = (metric.model_name or '').lower().replace(' ', '').replace('_', '')
+        family = next((f for token, f in families if token in name), None)
+        if family is None:
+            family = name[:30]
+        elif 'pca' in name:
+            family = f'pca_{family}'
+        ModelMetrics.objects.filter(pk=metric.pk).update(model_family=family)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='modelmetrics',
+            name='model_family',
+            field=models.CharField(blank=True, default='', max_length=30),
+        ),
+        migrations.RunPython(fill_model_family, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='modelmetrics',
+            index=models.Index(fields=['model_family', 'dataset_type', 'target', '-timestamp'], include=('r2_score',), name='metrics_family_lookup_idx'),
+        ),
+    ]
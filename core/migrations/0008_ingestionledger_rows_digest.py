@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_modelmetrics_family'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionledger',
+            name='rows_digest',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
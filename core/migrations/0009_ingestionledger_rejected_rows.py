@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_ingestionledger_rows_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionledger',
+            name='rejected_rows',
+            field=models.IntegerField(default=0),
+        ),
+    ]
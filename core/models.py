@@ -30,6 +30,9 @@ class PlaceRecord(BaseModel):
         db_table = "place_record"
         verbose_name = "Place Record"
         verbose_name_plural = "Place Records"
+        indexes = [
+            models.Index(fields=["name", "id"], name="place_name_cursor_idx"),  # paginación por cursor
+        ]
 
     def __str__(self):
         return f"{self.name}, {self.state}"
@@ -38,6 +41,22 @@ class PlaceRecord(BaseModel):
 # ======================================================
 #  MODEL METRICS
 # ======================================================
+def model_family(model_name):
+    """
+    Familia normalizada de un nombre de modelo ('XGBoost' → 'xgboost'). Las
+    variantes con PCA son una familia aparte ('PCA+XGBoost' → 'pca_xgboost')
+    para no mezclarse con el modelo base en la portada.
+
+    La migración 0007 (fill_model_family) copia esta regla: si cambia, hay
+    que cambiar las dos (ModelFamilyTests comprueba que coinciden).
+    """
+    name = (model_name or "").lower().replace(" ", "").replace("_", "")
+    for token, family in (("xgboost", "xgboost"), ("lasso", "lasso"), ("randomforest", "random_forest")):
+        if token in name:
+            return f"pca_{family}" if "pca" in name else family
+    return name[:30]
+
+
 class ModelMetrics(BaseModel):
     """Métricas de evaluación de cada modelo entrenado"""
     DATASET_CHOICES = [
@@ -46,17 +65,40 @@ class ModelMetrics(BaseModel):
     ]
 
     model_name = models.CharField(max_length=100)
+    model_family = models.CharField(max_length=30, blank=True, default="")  # 'xgboost', 'lasso'... (ver model_family())
     target = models.CharField(max_length=50)  # 'depression_crudeprev' o 'mhlth_crudeprev'
     dataset_type = models.CharField(max_length=20, choices=DATASET_CHOICES, default="no_social")  # 👈 nuevo campo
     r2_score = models.FloatField(null=True, blank=True)
     mae = models.FloatField(null=True, blank=True)
     rmse = models.FloatField(null=True, blank=True)
+    fit_seconds = models.FloatField(null=True, blank=True)          # tiempo de entrenamiento
+    best_iteration = models.IntegerField(null=True, blank=True)     # árboles tras la parada temprana (XGBoost)
+    predict_us_per_row = models.FloatField(null=True, blank=True)   # coste de predicción por fila (µs)
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "model_metrics"
         verbose_name = "Model Metrics"
         verbose_name_plural = "Model Metrics"
+        indexes = [
+            models.Index(fields=["-timestamp", "-id"], name="metrics_ts_cursor_idx"),
+            # home(): última métrica por (familia, dataset, target) y medias de R² por
+            # (familia, dataset); r2_score incluido para no leer la tabla (PostgreSQL)
+            models.Index(
+                fields=["model_family", "dataset_type", "target", "-timestamp"],
+                include=["r2_score"],
+                name="metrics_family_lookup_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Siempre desde model_name: renombrar el modelo cambia su familia.
+        # bulk_create y QuerySet.update no pasan por aquí: quien los use debe rellenarla
+        self.model_family = model_family(self.model_name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "model_name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "model_family"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.model_name} ({self.target}, {self.dataset_type})"
@@ -84,6 +126,9 @@ class ComparisonSummary(BaseModel):
         db_table = "comparison_summary"
         verbose_name = "Comparison Summary"
         verbose_name_plural = "Comparison Summaries"
+        indexes = [
+            models.Index(fields=["-comparison_date", "-id"], name="comparison_date_cursor_idx"),
+        ]
 
     def __str__(self):
         return f"Best: {self.best_model} ({self.target}, {self.dataset_type})"
@@ -111,9 +156,39 @@ class Prediction(BaseModel):
         db_table = "prediction"
         verbose_name = "Prediction"
         verbose_name_plural = "Predictions"
+        indexes = [
+            models.Index(fields=["-prediction_date", "-id"], name="prediction_date_cursor_idx"),
+        ]
 
     def __str__(self):
         if self.place:
             return f"{self.place.name} - {self.model_used} ({self.target})"
         return f"Predicción sin lugar - {self.model_used} ({self.target})"
 
+
+# ======================================================
+#  INGESTION LEDGER
+# ======================================================
+class IngestionLedger(BaseModel):
+    """Huella del último fichero ingerido por (fuente, tabla) y de cada una de sus filas"""
+    source = models.CharField(max_length=255)   # ruta del CSV de origen
+    table = models.CharField(max_length=50)     # tabla destino (db_table)
+    file_sha256 = models.CharField(max_length=64)
+    row_count = models.IntegerField(default=0)
+    row_hashes = models.JSONField(default=dict, blank=True)  # hash de fila → id del registro creado
+    # Ficheros de solo-añadir (predicciones): huella de las primeras row_count filas ya confirmadas
+    rows_digest = models.CharField(max_length=64, blank=True, default="")
+    # Filas de esas row_count ya escritas en el fichero de rechazos
+    rejected_rows = models.IntegerField(default=0)
+    ingested_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "ingestion_ledger"
+        verbose_name = "Ingestion Ledger"
+        verbose_name_plural = "Ingestion Ledger"
+        constraints = [
+            models.UniqueConstraint(fields=["source", "table"], name="unique_ledger_source_table"),
+        ]
+
+    def __str__(self):
+        return f"{self.source} → {self.table} ({self.file_sha256[:12]})"
@@ -0,0 +1,25 @@
+from rest_framework import pagination
+
+
+# ======================================================
+#  PAGINACIÓN POR CURSOR (keyset)
+# ======================================================
+class CursorPagination(pagination.CursorPagination):
+    """
+    Paginación por cursor para los viewsets de core.
+
+    Cada página es un WHERE <columna> < / > <posición> ORDER BY ... LIMIT n
+    sobre una columna indexada, así que el coste no crece con el tamaño de la
+    tabla (a diferencia de OFFSET). Cada viewset declara su orden en
+    `cursor_ordering`; el id final desempata filas con el mismo valor.
+
+    Parámetros: ?cursor=<opaco> y ?page_size=<n> (hasta max_page_size).
+    """
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "-id"
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, "cursor_ordering", None) or super().get_ordering(request, queryset, view)
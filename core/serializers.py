@@ -2,29 +2,57 @@ from rest_framework import serializers
 from core.models import PlaceRecord, ModelMetrics, ComparisonSummary, Prediction
 
 
+# ======================================================
+#  PROYECCIÓN DE CAMPOS (?fields=)
+# ======================================================
+def requested_fields(request):
+    """Campos pedidos en ?fields=a,b,c en un GET (None si no se limita la respuesta)."""
+    if request is None or request.method != "GET":
+        return None
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Con ?fields=a,b,c solo se serializan esos campos (los desconocidos se
+    ignoran). Solo afecta al serializer raíz: los anidados se devuelven completos.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get("request"))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
 # ======================================================
 #  SERIALIZERS
 # ======================================================
 
-class PlaceRecordSerializer(serializers.ModelSerializer):
+class PlaceRecordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PlaceRecord
         fields = '__all__'
 
 
-class ModelMetricsSerializer(serializers.ModelSerializer):
+class ModelMetricsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ModelMetrics
         fields = '__all__'
+        read_only_fields = ['model_family']  # se calcula desde model_name al guardar
 
 
-class ComparisonSummarySerializer(serializers.ModelSerializer):
+class ComparisonSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ComparisonSummary
         fields = '__all__'
 
 
-class PredictionSerializer(serializers.ModelSerializer):
+class PredictionSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     place = PlaceRecordSerializer(read_only=True)
 
     class Meta:
@@ -1,3 +1,404 @@
-from django.test import TestCase
+import importlib
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from django.apps import apps
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.counts import estimated_counts
+from core.models import ComparisonSummary, IngestionLedger, ModelMetrics, PlaceRecord, Prediction, model_family
+
+ingest = importlib.import_module("scripts.db_ingest.06_ingest_to_postgres")
+
+
+# ======================================================
+#  PAGINACIÓN POR CURSOR Y ?fields=
+# ======================================================
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        place = PlaceRecord.objects.create(fips="01001", name="Autauga", state="AL")
+        Prediction.objects.bulk_create([
+            Prediction(
+                place=place if i % 2 else None,
+                model_used="models/xgboost_full_social_mhlth.joblib",
+                target="mhlth_crudeprev",
+                predicted_value=float(i),
+                input_vector={"health_index": 0.3},
+            )
+            for i in range(25)
+        ])
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME="localhost")
+
+    def test_cursor_pages_cover_table_once(self):
+        """Recorrer las páginas devuelve cada predicción una vez, de la más reciente a la más antigua"""
+        url, seen = "/api/predictions/?page_size=10", []
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page["results"]), 10)
+            seen += [row["id"] for row in page["results"]]
+            url = page["next"]
+
+        expected = list(Prediction.objects.order_by("-prediction_date", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_page_size_is_capped(self):
+        """page_size por encima de max_page_size se recorta"""
+        response = self.client.get("/api/predictions/?page_size=100000")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 25)
+        self.assertNotIn("count", response.json())  # sin COUNT(*) sobre la tabla
+
+    def test_sparse_fields(self):
+        """?fields= limita las claves de cada fila; sin él se devuelven todas"""
+        row = self.client.get("/api/predictions/?fields=id,predicted_value").json()["results"][0]
+        self.assertEqual(set(row), {"id", "predicted_value"})
+
+        row = self.client.get("/api/predictions/").json()["results"][0]
+        self.assertIn("input_vector", row)
+        self.assertIn("place", row)
+
+
+# ======================================================
+#  PRESUPUESTO DE CONSULTAS (sin N+1)
+# ======================================================
+class QueryBudgetTests(TestCase):
+    """Cada listado cuesta un número fijo de consultas, sin importar cuántas filas devuelva."""
+
+    # endpoint → consultas máximas (la página y, si aplica, su JOIN en la misma)
+    BUDGETS = {
+        "/api/places/": 1,
+        "/api/metrics/": 1,
+        "/api/metrics/latest/": 1,
+        "/api/comparisons/": 1,
+        "/api/comparisons/latest/": 1,
+        "/api/predictions/": 1,
+        "/api/predictions/latest/": 1,
+        "/api/predictions/?fields=id,place": 1,
+        "/api/predictions/?fields=id,predicted_value": 1,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        places = PlaceRecord.objects.bulk_create([
+            PlaceRecord(fips=f"{i:05d}", name=f"County {i}", state="AL") for i in range(20)
+        ])
+        ModelMetrics.objects.bulk_create([
+            ModelMetrics(model_name="XGBoost", target="mhlth_crudeprev", r2_score=0.8) for _ in range(20)
+        ])
+        ComparisonSummary.objects.bulk_create([
+            ComparisonSummary(target="mhlth_crudeprev", best_model="XGBoost", best_r2=0.8) for _ in range(20)
+        ])
+        Prediction.objects.bulk_create([
+            Prediction(
+                place=places[i],
+                model_used="models/xgboost_full_social_mhlth.joblib",
+                target="mhlth_crudeprev",
+                predicted_value=float(i),
+                input_vector={"health_index": 0.3},
+            )
+            for i in range(20)
+        ])
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME="localhost")
+
+    def test_list_endpoints_query_budget(self):
+        for url, budget in self.BUDGETS.items():
+            with self.subTest(url=url), self.assertNumQueries(budget):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_prediction_detail_joins_place(self):
+        """El detalle también trae el lugar en la misma consulta"""
+        prediction = Prediction.objects.first()
+        with self.assertNumQueries(1):
+            data = self.client.get(f"/api/predictions/{prediction.pk}/").json()
+        self.assertEqual(data["place"]["fips"], prediction.place.fips)
+
+
+# ======================================================
+#  FAMILIA DE MODELO (índice metrics_family_lookup_idx)
+# ======================================================
+class ModelFamilyTests(TestCase):
+    """home() filtra por model_family (igualdad indexada) en lugar de icontains."""
+
+    def test_family_from_model_name(self):
+        self.assertEqual(model_family("XGBoost"), "xgboost")
+        self.assertEqual(model_family("PCA+XGBoost"), "pca_xgboost")
+        self.assertEqual(model_family("PCA+LassoCV"), "pca_lasso")
+        self.assertEqual(model_family("LassoCV"), "lasso")
+        self.assertEqual(model_family("RandomForest"), "random_forest")
+
+    def test_save_fills_family(self):
+        metric = ModelMetrics.objects.create(model_name="XGBoost", target="mhlth_crudeprev", r2_score=0.8)
+        self.assertEqual(metric.model_family, "xgboost")
+        self.assertTrue(
+            ModelMetrics.objects.filter(model_family="xgboost", target="mhlth_crudeprev").exists()
+        )
+
+    def test_rename_updates_family(self):
+        """Renombrar (save completo o con update_fields) recalcula la familia"""
+        metric = ModelMetrics.objects.create(model_name="XGBoost", target="mhlth_crudeprev", r2_score=0.8)
+        metric.model_name = "PCA+XGBoost"
+        metric.save()
+        self.assertEqual(ModelMetrics.objects.get(pk=metric.pk).model_family, "pca_xgboost")
+
+        metric.model_name = "LassoCV"
+        metric.save(update_fields=["model_name"])
+        self.assertEqual(ModelMetrics.objects.get(pk=metric.pk).model_family, "lasso")
+
+    def test_migration_backfill_matches_model_family(self):
+        """fill_model_family (migración 0007) y core.models.model_family dan la misma familia"""
+        names = ["XGBoost", "PCA+XGBoost", "PCA + LassoCV", "Lasso_CV", "RandomForest", "Random Forest",
+                 "pca_random_forest", "SVR", "", "Some Custom Gradient Boosting Regressor v2"]
+        ModelMetrics.objects.bulk_create([ModelMetrics(model_name=name, target="t") for name in names])
+        migration = importlib.import_module("core.migrations.0007_modelmetrics_family")
+        migration.fill_model_family(apps, None)
+
+        self.assertEqual(
+            {name: family for name, family in ModelMetrics.objects.values_list("model_name", "model_family")},
+            {name: model_family(name) for name in names},
+        )
+
+
+# ======================================================
+#  RECUENTOS ESTIMADOS (core/counts.py)
+# ======================================================
+class EstimatedCountTests(TestCase):
+    """Las tablas pequeñas (o fuera de PostgreSQL) se cuentan de forma exacta."""
+
+    @override_settings(EXACT_COUNT_BELOW=10000)
+    def test_small_tables_are_exact(self):
+        PlaceRecord.objects.bulk_create([PlaceRecord(fips=f"{i:05d}", name=f"County {i}") for i in range(5)])
+        counts = estimated_counts(PlaceRecord, Prediction)
+        self.assertEqual(counts, {PlaceRecord: 5, Prediction: 0})
+
+
+# ======================================================
+#  INGESTA (scripts/db_ingest/06_ingest_to_postgres.py)
+# ======================================================
+def prediction_row(fips, value):
+    return {"fips": fips, "model_used": "models/xgboost_full_social_mhlth.joblib",
+            "target": "mhlth_crudeprev", "predicted_value": value, "input_vector": "{}"}
+
+
+class IngestTestCase(TestCase):
+    """Ficheros de entrada en un directorio temporal por test."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def write_csv(self, name, rows):
+        path = self.tmp / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(rows).to_csv(path, index=False)
+        return str(path)
+
+
+class PlaceIngestTests(TestCase):
+    """Carga masiva de PlaceRecord: mismo resultado que la versión fila a fila."""
+
+    def test_clean_number_series_matches_clean_number(self):
+        values = ["1,234", "", "n/a", "007", " 42 ", "12.7", "1e3", "-3", None, float("nan"), 1234.0, 12.9, 7]
+        self.assertEqual(
+            ingest.clean_number_series(pd.Series(values, dtype=object)).tolist(),
+            [ingest.clean_number(value) for value in values],
+        )
+        numeric = pd.Series([1.0, float("nan"), 2.7])
+        self.assertEqual(ingest.clean_number_series(numeric).tolist(), [ingest.clean_number(v) for v in numeric])
+
+    def places(self, rows):
+        return ingest.build_place_frame(pd.DataFrame(
+            rows, columns=["countyfips", "countyname", "statedesc", "totalpopulation"]))
+
+    def test_second_upsert_updates_rows(self):
+        """Volver a cargar actualiza por FIPS (mismo id), añade los nuevos y no duplica"""
+        ingest.upsert_places(self.places([("01001", "Autauga", "Alabama", "55,000"),
+                                          ("01003", "Baldwin", "Alabama", "n/a")]))
+        first_id = PlaceRecord.objects.get(fips="1001").id
+
+        ingest.upsert_places(self.places([("01001", "Autauga County", "Alabama", "56,000"),
+                                          ("01005", "Barbour", "Alabama", "25,000"),
+                                          ("01005", "Barbour County", "Alabama", "24,000")]))
+        self.assertEqual(PlaceRecord.objects.count(), 3)
+        autauga = PlaceRecord.objects.get(fips="1001")
+        self.assertEqual((autauga.id, autauga.name, autauga.population), (first_id, "Autauga County", 56000))
+        self.assertIsNone(PlaceRecord.objects.get(fips="1003").population)
+        self.assertEqual(PlaceRecord.objects.get(fips="1005").name, "Barbour County")  # gana la última fila
+
+
+def metric_row(model, target, r2):
+    return {"model": model, "target": target, "r2": r2, "mae": 1.0, "rmse": 1.5}
+
+
+class MetricsIngestTests(IngestTestCase):
+    """sync_rows: solo se aplican las diferencias entre el CSV y la última ingesta."""
+
+    def setUp(self):
+        super().setUp()
+        self.rows = [metric_row("XGBoost", "mhlth_crudeprev", 0.8),
+                     metric_row("LassoCV", "mhlth_crudeprev", 0.7),
+                     metric_row("XGBoost", "depression_crudeprev", 0.6)]
+        self.path = self.write_csv("no_social/model_metrics.csv", self.rows)
+        ingest.ingest_model_metrics([self.path])
+        self.ids = self.ids_by_r2()
+
+    def ids_by_r2(self):
+        return dict(ModelMetrics.objects.values_list("r2_score", "id"))
+
+    def test_first_ingest_records_ledger(self):
+        self.assertEqual(sorted(self.ids), [0.6, 0.7, 0.8])
+        ledger = IngestionLedger.objects.get(source=self.path, table="model_metrics")
+        self.assertEqual(ledger.file_sha256, ingest.file_sha256(self.path))
+        self.assertEqual(sorted(ledger.row_hashes.values()), sorted(self.ids.values()))
+        self.assertEqual(set(ModelMetrics.objects.values_list("dataset_type", flat=True)), {"no_social"})
+
+    def test_unchanged_rerun_makes_no_writes(self):
+        """Mismo fichero: solo la lectura del ledger, ninguna escritura"""
+        with self.assertNumQueries(1):
+            ingest.ingest_model_metrics([self.path])
+
+    def test_changed_row_replaces_only_that_row(self):
+        self.rows[1] = metric_row("LassoCV", "mhlth_crudeprev", 0.75)
+        self.write_csv("no_social/model_metrics.csv", self.rows)
+        ingest.ingest_model_metrics([self.path])
+
+        ids = self.ids_by_r2()
+        self.assertEqual(sorted(ids), [0.6, 0.75, 0.8])
+        self.assertEqual(ids[0.8], self.ids[0.8])
+        self.assertEqual(ids[0.6], self.ids[0.6])
+        self.assertEqual(len(IngestionLedger.objects.get(source=self.path).row_hashes), 3)
+
+    def test_removed_row_deleted(self):
+        self.write_csv("no_social/model_metrics.csv", self.rows[:2])
+        ingest.ingest_model_metrics([self.path])
+
+        self.assertEqual(self.ids_by_r2(), {0.8: self.ids[0.8], 0.7: self.ids[0.7]})
+        self.assertEqual(IngestionLedger.objects.get(source=self.path).row_count, 2)
+
+
+class PredictionIngestTests(IngestTestCase):
+    """Carga por bloques de predictions.csv: rechazos, reanudación y ledger."""
+
+    @classmethod
+    def setUpTestData(cls):
+        PlaceRecord.objects.bulk_create([PlaceRecord(fips="01001", name="Autauga"),
+                                         PlaceRecord(fips="01003", name="Baldwin")])
+
+    def setUp(self):
+        super().setUp()
+        self.rejects_path = str(self.tmp / "rejected.csv")
+
+    def ingest(self, path, chunksize=2):
+        ingest.ingest_predictions(path, self.rejects_path, chunksize=chunksize)
+
+    def rejects(self):
+        return pd.read_csv(self.rejects_path, dtype=str)
+
+    def test_unknown_fips_rejected_and_rerun_adds_nothing(self):
+        """FIPS conocidos → prediction; desconocidos → rechazos; repetir la carga no añade filas"""
+        path = self.write_csv("predictions.csv", [
+            prediction_row("1001", "1"), prediction_row("01003", "2"),
+            prediction_row("99999", "3"), prediction_row("1003", "4"), prediction_row("abc", "5"),
+        ])
+        with self.assertLogs(level="ERROR") as logs:
+            self.ingest(path)
+
+        self.assertIn("2 predicciones rechazadas", logs.output[-1])
+        self.assertEqual(
+            sorted(Prediction.objects.values_list("place__fips", "predicted_value")),
+            [("01001", 1.0), ("01003", 2.0), ("01003", 4.0)],
+        )
+        self.assertEqual(self.rejects()["fips"].tolist(), ["99999", "abc"])
+
+        with self.assertNumQueries(1):  # fichero sin cambios: solo la lectura del ledger
+            self.ingest(path)
+        self.assertEqual(Prediction.objects.count(), 3)
+        self.assertEqual(len(self.rejects()), 2)
+
+    def test_non_numeric_values_rejected(self):
+        """Un predicted_value no numérico va a rechazos; el resto del fichero se carga"""
+        path = self.write_csv("predictions.csv", [
+            prediction_row("1001", "12.5"), prediction_row("1003", "n.d."),
+            prediction_row("1001", "13,1"), prediction_row("1003", "14"),
+        ])
+        with self.assertLogs(level="ERROR") as logs:
+            self.ingest(path)
+
+        self.assertIn("predicted_value no numérico", logs.output[0])
+        self.assertEqual(sorted(Prediction.objects.values_list("predicted_value", flat=True)), [12.5, 14.0])
+        self.assertEqual(self.rejects()["predicted_value"].tolist(), ["n.d.", "13,1"])
+        self.assertEqual(IngestionLedger.objects.get(source=path).rejected_rows, 2)
+
+    def test_rejects_of_uncommitted_chunk_not_duplicated(self):
+        """Si falla la confirmación de un bloque, sus rechazos se escriben una sola vez al reanudar"""
+        path = self.write_csv("predictions.csv", [
+            prediction_row("1001", "1"), prediction_row("99999", "2"),
+            prediction_row("1003", "3"), prediction_row("99999", "4"),
+        ])
+        insert = ingest.insert_predictions
+        calls = []
+
+        def fail_second_chunk(rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("conexión perdida")
+            insert(rows)
+
+        with mock.patch.object(ingest, "insert_predictions", side_effect=fail_second_chunk), \
+                self.assertLogs(level="ERROR"), self.assertRaises(RuntimeError):
+            self.ingest(path)
+        self.assertEqual(len(self.rejects()), 2)  # el rechazo del bloque 2 ya está escrito
+        self.assertEqual(IngestionLedger.objects.get(source=path).rejected_rows, 1)
+
+        with self.assertLogs(level="ERROR"):
+            self.ingest(path)
+        self.assertEqual(self.rejects()["predicted_value"].tolist(), ["2", "4"])
+        self.assertEqual(sorted(Prediction.objects.values_list("predicted_value", flat=True)), [1.0, 3.0])
+
+    def test_rewritten_prefix_rejected(self):
+        """Filas ya cargadas que cambian: el fichero no es una ampliación → error sin insertar"""
+        rows = [prediction_row("1001", str(v)) for v in range(4)]
+        path = self.write_csv("predictions.csv", rows)
+        self.ingest(path)
+
+        rows[0] = prediction_row("1001", "99")
+        self.write_csv("predictions.csv", rows)
+        with self.assertRaisesRegex(ValueError, "no es una ampliación"):
+            self.ingest(path)
+        self.assertEqual(Prediction.objects.count(), 4)
+
+    def test_resume_after_partial_chunk(self):
+        """Tras fallar el bloque 2 se insertan solo sus filas; después, solo las añadidas"""
+        rows = [prediction_row("1001", str(v)) for v in range(5)]
+        path = self.write_csv("predictions.csv", rows)
+        insert = ingest.insert_predictions
+
+        def fail_second_chunk(chunk_rows):
+            if IngestionLedger.objects.filter(source=path).exists():
+                raise RuntimeError("conexión perdida")
+            insert(chunk_rows)
+
+        with mock.patch.object(ingest, "insert_predictions", side_effect=fail_second_chunk), \
+                self.assertLogs(level="ERROR"), self.assertRaises(RuntimeError):
+            self.ingest(path)
+        ledger = IngestionLedger.objects.get(source=path)
+        self.assertEqual((ledger.row_count, ledger.file_sha256), (2, ""))  # en curso
+
+        self.ingest(path)
+        values = sorted(Prediction.objects.values_list("predicted_value", flat=True))
+        self.assertEqual(values, [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(IngestionLedger.objects.get(source=path).file_sha256, ingest.file_sha256(path))
+
+        self.write_csv("predictions.csv", rows + [prediction_row("1003", "5")])
+        self.ingest(path)
+        self.assertEqual(Prediction.objects.count(), 6)
+        self.assertEqual(Prediction.objects.filter(place__fips="01003").count(), 1)
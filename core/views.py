@@ -2,26 +2,58 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from core.models import PlaceRecord, ModelMetrics, ComparisonSummary, Prediction
+from .pagination import CursorPagination
 from .serializers import (
     PlaceRecordSerializer,
     ModelMetricsSerializer,
     ComparisonSummarySerializer,
     PredictionSerializer,
+    requested_fields,
 )
 
 
+# ======================================================
+#  BASE: cursor + proyección de columnas
+# ======================================================
+class CursorViewSet(viewsets.ModelViewSet):
+    """
+    ModelViewSet paginado por cursor sobre `cursor_ordering` (columnas con
+    índice, ver core/models.py). Las relaciones de `related` se traen en el
+    mismo JOIN (sin una consulta por fila). Con ?fields= además solo se leen
+    de la base de datos las columnas pedidas (más las del orden, que usa el
+    cursor) y solo se unen las relaciones pedidas.
+    """
+
+    pagination_class = CursorPagination  # también por defecto en REST_FRAMEWORK
+    cursor_ordering = ("-id",)
+    related = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        related = self.related
+        fields = requested_fields(self.request)
+        if fields and self.action == "list":
+            concrete = {f.name for f in queryset.model._meta.concrete_fields}
+            ordering = {name.lstrip("-") for name in self.cursor_ordering}
+            related = [name for name in related if name in fields]
+            queryset = queryset.only(*(fields & concrete | ordering))
+        return queryset.select_related(*related) if related else queryset
+
+
 # ======================================================
 #  VIEWSETS PRINCIPALES
 # ======================================================
 
-class PlaceRecordViewSet(viewsets.ModelViewSet):
-    queryset = PlaceRecord.objects.all().order_by("name")
+class PlaceRecordViewSet(CursorViewSet):
+    queryset = PlaceRecord.objects.all()
     serializer_class = PlaceRecordSerializer
+    cursor_ordering = ("name", "id")
 
 
-class ModelMetricsViewSet(viewsets.ModelViewSet):
-    queryset = ModelMetrics.objects.all().order_by("-timestamp")
+class ModelMetricsViewSet(CursorViewSet):
+    queryset = ModelMetrics.objects.all()
     serializer_class = ModelMetricsSerializer
+    cursor_ordering = ("-timestamp", "-id")
 
     @action(detail=False, methods=["get"])
     def latest(self, request):
@@ -31,9 +63,10 @@ class ModelMetricsViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ComparisonSummaryViewSet(viewsets.ModelViewSet):
-    queryset = ComparisonSummary.objects.all().order_by("-comparison_date")
+class ComparisonSummaryViewSet(CursorViewSet):
+    queryset = ComparisonSummary.objects.all()
     serializer_class = ComparisonSummarySerializer
+    cursor_ordering = ("-comparison_date", "-id")
 
     @action(detail=False, methods=["get"])
     def latest(self, request):
@@ -43,13 +76,15 @@ class ComparisonSummaryViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class PredictionViewSet(viewsets.ModelViewSet):
-    queryset = Prediction.objects.all().order_by("-prediction_date")
+class PredictionViewSet(CursorViewSet):
+    queryset = Prediction.objects.all()
     serializer_class = PredictionSerializer
+    cursor_ordering = ("-prediction_date", "-id")
+    related = ("place",)
 
     @action(detail=False, methods=["get"])
     def latest(self, request):
         """Devuelve las últimas predicciones generadas"""
-        latest_preds = Prediction.objects.order_by("-prediction_date")[:10]
+        latest_preds = self.get_queryset().order_by("-prediction_date")[:10]
         serializer = self.get_serializer(latest_preds, many=True)
         return Response(serializer.data)
@@ -7,6 +7,8 @@ import os
 import pandas as pd
 from pathlib import Path
 
+from scripts.common.dataset_io import write_dataset
+
 # Detectar entorno CI
 if os.getenv("GITHUB_ACTIONS") == "true":
     print("🧪 Ejecutando en CI - creando datos de prueba mock...")
@@ -22,7 +24,7 @@ if os.getenv("GITHUB_ACTIONS") == "true":
         Path(d).mkdir(parents=True, exist_ok=True)
 
     # Mock de No Social con columnas reales esperadas
-    pd.DataFrame({
+    write_dataset(pd.DataFrame({
         "stateabbr": ["AL", "AL"],
         "statedesc": ["Alabama", "Alabama"],
         "countyname": ["Autauga", "Baldwin"],
@@ -30,10 +32,10 @@ if os.getenv("GITHUB_ACTIONS") == "true":
         "depression_crudeprev": [15.2, 17.8],
         "obesity_crudeprev": [30.5, 29.8],
         "smoking_crudeprev": [20.0, 21.3]
-    }).to_csv("data/processed/no_social/places_no_social_clean.csv", index=False)
+    }), "data/processed/no_social/places_no_social_clean.csv")
 
     # Mock de Full Social con columnas reales esperadas
-    pd.DataFrame({
+    write_dataset(pd.DataFrame({
         "county_fips": [1001, 1003],
         "depression_crudeprev": [14.8, 16.9],
         "mhlth_crudeprev": [11.7, 12.9],
@@ -42,7 +44,7 @@ if os.getenv("GITHUB_ACTIONS") == "true":
         "lpa_crudeprev": [22.0, 21.5],
         "income": [55000, 47000],
         "education": [85.3, 79.2]
-    }).to_csv("data/processed/full_social/places_imputed_full_clean.csv", index=False)
+    }), "data/processed/full_social/places_imputed_full_clean.csv")
 
     # Mock de métricas No Social
     pd.DataFrame({
@@ -0,0 +1,120 @@
+"""
+CityMind — Home Summary
+-----------------------
+Contexto de la portada (home) calculado con consultas agregadas y guardado en la
+caché de Django (settings.CACHES, compartida entre workers y la ingesta).
+
+- Métricas: la última de cada (target, dataset_type) de la familia XGBoost
+  y la media de R² por dataset (de todas sus filas, como antes), en una sola
+  consulta con funciones ventana.
+- Totales: condados y predicciones sin COUNT(*) en tablas grandes
+  (core/counts.py); la última predicción va en la misma consulta que el
+  COUNT(*) de predicciones cuando la tabla se cuenta exacta.
+- En total 3 consultas (4 en PostgreSQL, con la estimación de pg_class): las
+  métricas y los totales son tablas distintas y la estimación decide si hace
+  falta contar, así que juntarlas exigiría SQL a mano; la caché las absorbe.
+- TTL corto (HOME_CACHE_TTL) para las predicciones que llegan por la API;
+  la ingesta invalida la entrada al terminar (invalidate_home_summary).
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count, F, Max, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from core.counts import table_estimates
+from core.models import ModelMetrics, PlaceRecord, Prediction
+
+HOME_CACHE_KEY = "dashboard:home:v1"
+HOME_FAMILY = "xgboost"
+HOME_TARGETS = ["mhlth_crudeprev", "depression_crudeprev"]
+HOME_DATASETS = ["no_social", "full_social"]
+
+
+# =========================================================
+# 🧮 Consultas
+# =========================================================
+def latest_metrics_with_averages(family=HOME_FAMILY):
+    """
+    (últimas métricas de la portada, {dataset_type: media de R²}). Una
+    consulta: las ventanas se calculan sobre todas las filas de la familia y
+    después se filtra rank=1, así que la media incluye todos los targets,
+    no solo los de HOME_TARGETS.
+    """
+    rows = (
+        ModelMetrics.objects.filter(model_family=family)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=[F("target"), F("dataset_type")],
+                order_by=[F("timestamp").desc(), F("id").desc()],
+            ),
+            dataset_avg_r2=Window(Avg("r2_score"), partition_by=[F("dataset_type")]),
+        )
+        .filter(rank=1)
+    )
+    latest = {(m.target, m.dataset_type): m for m in rows}
+    # La media es la misma en todas las filas de un dataset: basta una cualquiera
+    dataset_r2 = {dataset: m.dataset_avg_r2 for (_, dataset), m in latest.items()}
+    # Mismo orden que la portada: por target y, dentro, no_social → full_social
+    home_rows = [latest[(t, d)] for t in HOME_TARGETS for d in HOME_DATASETS if (t, d) in latest]
+    return home_rows, dataset_r2
+
+
+def system_totals():
+    """
+    Condados y predicciones (estimados en tablas grandes, ver core/counts.py)
+    y fecha de la última predicción (MAX sobre prediction_date_cursor_idx).
+    """
+    estimates = table_estimates(Prediction, PlaceRecord)
+    aggregates = {"last": Max("prediction_date")}
+    if Prediction not in estimates:
+        aggregates["total"] = Count("id")  # mismo recorrido que MAX
+    predictions = Prediction.objects.aggregate(**aggregates)
+    return {
+        "total_predictions": estimates[Prediction] if Prediction in estimates else predictions["total"],
+        "total_places": estimates[PlaceRecord] if PlaceRecord in estimates else PlaceRecord.objects.count(),
+        "last_update": predictions["last"],
+    }
+
+
+def build_home_summary():
+    """Contexto de home() sin caché."""
+    latest_metrics, dataset_r2 = latest_metrics_with_averages()
+    totals = system_totals()
+
+    social_r2 = dataset_r2.get("full_social")
+    no_social_r2 = dataset_r2.get("no_social")
+    social_gain = (
+        ((social_r2 - no_social_r2) / no_social_r2 * 100)
+        if social_r2 and no_social_r2
+        else 0
+    )
+
+    return {
+        "total_places": totals["total_places"],
+        "latest_metrics": latest_metrics,
+        "total_predictions": totals["total_predictions"],
+        "last_update": totals["last_update"] or timezone.now(),
+        "social_gain": social_gain,
+        # 👇 Valor absoluto para evitar filtro |abs en template
+        "social_gain_abs": abs(social_gain),
+    }
+
+
+# =========================================================
+# ⚡ Caché
+# =========================================================
+def get_home_summary():
+    """Contexto de home(): una lectura de caché; se recalcula al expirar o invalidarse."""
+    summary = cache.get(HOME_CACHE_KEY)
+    if summary is None:
+        summary = build_home_summary()
+        cache.set(HOME_CACHE_KEY, summary, settings.HOME_CACHE_TTL)
+    return summary
+
+
+def invalidate_home_summary():
+    """Borra el contexto cacheado (la ingesta lo llama al terminar cada tabla)."""
+    cache.delete(HOME_CACHE_KEY)
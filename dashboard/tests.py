@@ -1,3 +1,87 @@
-from django.test import TestCase
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from core.models import ModelMetrics, PlaceRecord, Prediction
+from dashboard.summary import invalidate_home_summary
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+# ======================================================
+#  PORTADA (home) — consultas agregadas + caché
+# ======================================================
+@override_settings(CACHES=LOCMEM_CACHE)
+class HomeSummaryTests(TestCase):
+    """home() calcula su contexto con consultas agregadas y después lo sirve desde la caché."""
+
+    @classmethod
+    def setUpTestData(cls):
+        PlaceRecord.objects.bulk_create([PlaceRecord(fips=f"{i:05d}", name=f"County {i}") for i in range(3)])
+        for target in ["mhlth_crudeprev", "depression_crudeprev"]:
+            for dataset, r2 in [("no_social", 0.5), ("full_social", 0.6)]:
+                ModelMetrics.objects.create(model_name="XGBoost", target=target, dataset_type=dataset, r2_score=r2 - 0.1)
+                ModelMetrics.objects.create(model_name="XGBoost", target=target, dataset_type=dataset, r2_score=r2 + 0.1)
+        ModelMetrics.objects.create(model_name="LassoCV", target="mhlth_crudeprev", dataset_type="full_social", r2_score=0.9)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_context_matches_latest_metrics(self):
+        context = self.client.get("/", SERVER_NAME="localhost").context
+        latest = context["latest_metrics"]
+        self.assertEqual(
+            [(m.target, m.dataset_type) for m in latest],
+            [("mhlth_crudeprev", "no_social"), ("mhlth_crudeprev", "full_social"),
+             ("depression_crudeprev", "no_social"), ("depression_crudeprev", "full_social")],
+        )
+        self.assertTrue(all(m.model_name == "XGBoost" for m in latest))
+        self.assertAlmostEqual(latest[0].r2_score, 0.6)  # la más reciente, no la primera
+        self.assertEqual(context["total_places"], 3)
+        self.assertEqual(context["total_predictions"], 0)
+        # Medias por dataset: 0.5 (no_social) y 0.6 (full_social) → +20 %
+        self.assertAlmostEqual(context["social_gain"], 20.0)
+
+    def test_pca_variant_not_mixed_with_xgboost(self):
+        """Una fila PCA+XGBoost posterior no sustituye al XGBoost ni entra en sus medias"""
+        ModelMetrics.objects.create(model_name="PCA+XGBoost", target="mhlth_crudeprev",
+                                    dataset_type="no_social", r2_score=0.1)
+        context = self.client.get("/", SERVER_NAME="localhost").context
+        self.assertEqual(context["latest_metrics"][0].model_name, "XGBoost")
+        self.assertAlmostEqual(context["social_gain"], 20.0)
+
+    def test_gain_uses_every_target(self):
+        """La media por dataset no depende de que haya una última fila de HOME_TARGETS"""
+        ModelMetrics.objects.filter(dataset_type="no_social").update(target="obesity_crudeprev")
+        context = self.client.get("/", SERVER_NAME="localhost").context
+        self.assertEqual({m.dataset_type for m in context["latest_metrics"]}, {"full_social"})
+        self.assertAlmostEqual(context["social_gain"], 20.0)
+
+    def test_cached_until_invalidated(self):
+        # métricas (ventanas) + COUNT(*) y MAX de predicciones + COUNT(*) de condados
+        # (tablas pequeñas) y, en PostgreSQL, la lectura de la estimación en pg_class
+        with self.assertNumQueries(4 if connection.vendor == "postgresql" else 3):
+            self.client.get("/", SERVER_NAME="localhost")
+        with self.assertNumQueries(0):
+            self.client.get("/", SERVER_NAME="localhost")
+
+        Prediction.objects.create(target="mhlth_crudeprev", model_used="bench", predicted_value=1.0, input_vector={})
+        self.assertEqual(self.client.get("/", SERVER_NAME="localhost").context["total_predictions"], 0)
+
+        invalidate_home_summary()  # lo que hace la ingesta al confirmar cada tabla
+        self.assertEqual(self.client.get("/", SERVER_NAME="localhost").context["total_predictions"], 1)
+
+
+# ======================================================
+#  DASHBOARD — plotly.js local (sin CDN)
+# ======================================================
+class DashboardAssetsTests(TestCase):
+    """El dashboard funciona sin red: plotly.js se sirve desde core/static."""
+
+    def test_plotly_served_as_static(self):
+        self.assertIsNotNone(finders.find("js/plotly.min.js"))
+        html = render_to_string("dashboard/dashboard.html", {"insights": {}, "no_data": True})
+        self.assertIn("/static/js/plotly.min.js", html)
+        self.assertNotIn("cdn.plot.ly", html)
@@ -1,86 +1,28 @@
 from django.shortcuts import render
-from django.db.models import Avg
-from core.models import PlaceRecord, ModelMetrics, Prediction
-from django.utils import timezone
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.offline import plot
-from pathlib import Path
+
+from dashboard.summary import get_home_summary
+
+# pandas/plotly (analytics) se importan dentro de dashboard_view: el resto de
+# vistas y el arranque de cada worker no cargan la pila científica.
 
 
 # ======================================================
 #  HOME VIEW — resumen general del sistema CityMind
 # ======================================================
 def home(request):
-    # Total de condados analizados
-    total_places = PlaceRecord.objects.count()
-
-    # Cuatro modelos XGBoost (por target y dataset)
-    latest_metrics = []
-    targets = ["mhlth_crudeprev", "depression_crudeprev"]
-    datasets = ["no_social", "full_social"]
-
-    for target in targets:
-        for dataset in datasets:
-            metric = (
-                ModelMetrics.objects.filter(
-                    model_name__icontains="xgboost",
-                    target=target,
-                    dataset_type=dataset,
-                )
-                .order_by("-timestamp")
-                .first()
-            )
-            if metric:
-                latest_metrics.append(metric)
-
-    # Última predicción o actualización del sistema
-    last_pred = Prediction.objects.order_by("-prediction_date").first()
-    last_update = last_pred.prediction_date if last_pred else timezone.now()
-
-    # Total de predicciones almacenadas
-    total_predictions = Prediction.objects.count()
-
-    # Diferencia de rendimiento promedio (social vs no social)
-    social_r2 = ModelMetrics.objects.filter(
-        dataset_type="full_social", model_name__icontains="xgboost"
-    ).aggregate(avg=Avg("r2_score"))["avg"]
-
-    no_social_r2 = ModelMetrics.objects.filter(
-        dataset_type="no_social", model_name__icontains="xgboost"
-    ).aggregate(avg=Avg("r2_score"))["avg"]
-
-    social_gain = (
-        ((social_r2 - no_social_r2) / no_social_r2 * 100)
-        if social_r2 and no_social_r2
-        else 0
-    )
-
-    # 👇 Valor absoluto para evitar filtro |abs en template
-    social_gain_abs = abs(social_gain)
-
-    context = {
-        "total_places": total_places,
-        "latest_metrics": latest_metrics,
-        "total_predictions": total_predictions,
-        "last_update": last_update,
-        "social_gain": social_gain,
-        "social_gain_abs": social_gain_abs,
-    }
-
-    return render(request, "dashboard/home.html", context)
+    # Condados, últimas métricas XGBoost, predicciones y ganancia social:
+    # una lectura de caché (ver dashboard/summary.py)
+    return render(request, "dashboard/home.html", get_home_summary())
 
 
 # ======================================================
 #  DASHBOARD VIEW — análisis y visualizaciones con Plotly
 # ======================================================
-from analytics.data_insights import generate_all_insights
-
-
 def dashboard_view(request):
+    from analytics.insights_cache import get_insights  # import diferido (pandas + plotly)
+
     try:
-        insights = generate_all_insights()
+        insights = get_insights()  # caché por huella del dataset (ver analytics/insights_cache.py)
         print("✅ INSIGHTS LOADED:", insights["summary"])  # ← Log de control
         no_data = False
     except Exception as e:
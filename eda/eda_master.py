@@ -11,6 +11,7 @@ Genera:
   ✅ Informe Markdown con fecha: reports/eda_report_YYYY-MM-DD.md
 """
 
+import sys
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -27,6 +28,9 @@ FIG_DIR.mkdir(parents=True, exist_ok=True)
 REPORT_DIR = BASE_DIR / "reports"
 REPORT_DIR.mkdir(parents=True, exist_ok=True)
 
+sys.path.append(str(BASE_DIR))
+from scripts.common.dataset_io import read_dataset
+
 # Fecha para nombrar el reporte
 date_str = datetime.now().strftime("%Y-%m-%d")
 REPORT_PATH = REPORT_DIR / f"eda_report_{date_str}.md"
@@ -35,8 +39,8 @@ REPORT_PATH = REPORT_DIR / f"eda_report_{date_str}.md"
 no_social_path = BASE_DIR / "data" / "processed" / "no_social" / "places_no_social_clean.csv"
 full_social_path = BASE_DIR / "data" / "processed" / "full_social" / "places_imputed_full_clean.csv"
 
-df_no_social = pd.read_csv(no_social_path)
-df_full_social = pd.read_csv(full_social_path)
+df_no_social = read_dataset(no_social_path)
+df_full_social = read_dataset(full_social_path)
 
 print(f"✅ Datasets cargados correctamente:")
 print(f"No Social → {df_no_social.shape}")
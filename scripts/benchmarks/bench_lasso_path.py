@@ -0,0 +1,58 @@
+# ======================================================
+#  CityMind - Benchmark Lasso Path
+#  Compara LassoCV(cv=5) de scikit-learn con LassoPathCV
+#  (scripts/common/lasso_path.py: Gram por bloques de fold + warm start)
+#  en la selección de variables (features sin escalar) y en el
+#  entrenamiento (features escaladas).
+#
+#  Uso:
+#    python scripts/benchmarks/bench_lasso_path.py [--rows 3144 30000 100000] [--features 40]
+# ======================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LassoCV
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.benchmarks.bench_pca_variant import make_model_data
+from scripts.common.lasso_path import LassoPathCV
+
+PARAMS = {"cv": 5, "random_state": 42, "max_iter": 10000}
+
+
+def timed(estimator, X, y):
+    start = time.perf_counter()
+    model = estimator(**PARAMS).fit(X, y)
+    return model, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del camino Lasso compartido")
+    parser.add_argument("--rows", type=int, nargs="+", default=[3144, 30000, 100000])
+    parser.add_argument("--features", type=int, default=40)
+    args = parser.parse_args()
+
+    rows = []
+    for n in args.rows:
+        X, y = make_model_data(n, args.features, factors=6)
+        # Selección: prevalencias en su escala (%); entrenamiento: escaladas
+        for stage, data in [("selección", X * 10 + 30), ("entrenamiento", StandardScaler().fit_transform(X))]:
+            sk, t_sk = timed(LassoCV, data, y)
+            ours, t_ours = timed(LassoPathCV, data, y)
+            rows.append({
+                "filas": n,
+                "etapa": stage,
+                "LassoCV_s": round(t_sk, 3),
+                "LassoPathCV_s": round(t_ours, 3),
+                "speedup": round(t_sk / t_ours, 1),
+                "mismo_alpha": bool(np.isclose(sk.alpha_, ours.alpha_)),
+                "mismas_features": bool(((sk.coef_ != 0) == (ours.coef_ != 0)).all()),
+            })
+
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,92 @@
+# ======================================================
+#  CityMind - Benchmark PCA Variant
+#  Compara los modelos sobre features crudas (LassoCV, XGBoost) con sus
+#  variantes opt-in PCA → LassoCV / XGBoost de scripts/common/training.py:
+#  R², tiempo de ajuste y latencia de predicción por fila.
+#
+#  Dataset sintético con la estructura de CDC PLACES: las prevalencias están
+#  muy correlacionadas (pocos factores latentes de salud y nivel social).
+#
+#  Uso:
+#    python scripts/benchmarks/bench_pca_variant.py [--rows 3144] [--features 40] [--factors 6]
+# ======================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.common.training import (
+    MODEL_SPECS,
+    RANDOM_STATE,
+    TEST_SIZE,
+    build_model,
+    explained_components,
+    fit_early_stopping,
+)
+
+MODELS = ["LassoCV", "PCA+LassoCV", "XGBoost", "PCA+XGBoost"]
+
+
+# ======================================================
+# 1️⃣ Dataset sintético
+# ======================================================
+def make_model_data(rows, features, factors, seed=42):
+    """Features = factores latentes × cargas + ruido; target lineal en los factores."""
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, factors))
+    X = latent @ rng.normal(size=(factors, features)) + rng.normal(0, 0.3, (rows, features))
+    y = 15 + latent @ rng.normal(size=factors) + rng.normal(0, 0.5, rows)
+    return pd.DataFrame(X, columns=[f"m{i}_crudeprev" for i in range(features)]), pd.Series(y)
+
+
+# ======================================================
+# 2️⃣ Medición
+# ======================================================
+def run(model_name, X_train, X_test, y_train, y_test):
+    spec = MODEL_SPECS[model_name]
+    if spec["scaled"]:
+        scaler = StandardScaler().fit(X_train)
+        X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+
+    model = build_model(model_name, threads=1)
+    start = time.perf_counter()
+    if spec.get("early_stopping"):
+        fit_early_stopping(model, X_train, y_train)
+    else:
+        model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_us = (time.perf_counter() - start) / len(X_test) * 1e6
+
+    return {
+        "model": model_name,
+        "r2": round(r2_score(y_test, y_pred), 4),
+        "fit_seconds": round(fit_seconds, 3),
+        "predict_us_per_row": round(predict_us, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la variante PCA")
+    parser.add_argument("--rows", type=int, default=3144)
+    parser.add_argument("--features", type=int, default=40)
+    parser.add_argument("--factors", type=int, default=6)
+    args = parser.parse_args()
+
+    X, y = make_model_data(args.rows, args.features, args.factors)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    n_components = explained_components(StandardScaler().fit_transform(X_train))
+    print(f"📊 {X.shape[0]} filas × {X.shape[1]} features → {n_components} componentes (95% varianza)")
+
+    results = pd.DataFrame([run(m, X_train, X_test, y_train, y_test) for m in MODELS])
+    print(results.to_string(index=False))
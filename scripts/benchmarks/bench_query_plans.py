@@ -0,0 +1,135 @@
+# ======================================================
+#  CityMind - Benchmark Query Plans
+#  Llena ModelMetrics, Prediction y ComparisonSummary con filas sintéticas
+#  (dentro de una transacción que se deshace al final) y muestra el plan y
+#  el tiempo de las consultas del dashboard y de la API:
+#    - home(): model_name__icontains="xgboost" (antes) vs model_family (ahora)
+#    - listados por cursor de predicciones y comparaciones
+#
+#  Uso (PostgreSQL recomendado; en SQLite se muestra EXPLAIN QUERY PLAN):
+#    python scripts/benchmarks/bench_query_plans.py [--metrics 200000] [--predictions 200000]
+# ======================================================
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "citymind.settings")
+django.setup()
+
+from django.db import connection, transaction
+from django.db.models import Avg
+
+from core.models import ComparisonSummary, ModelMetrics, Prediction, model_family
+
+MODEL_NAMES = ["LassoCV", "RandomForest", "XGBoost", "PCA+LassoCV", "PCA+XGBoost"]
+TARGETS = ["mhlth_crudeprev", "depression_crudeprev"]
+DATASETS = ["no_social", "full_social"]
+BATCH = 5000
+
+
+# ======================================================
+# 1️⃣ Datos sintéticos
+# ======================================================
+def fill_postgres(n_metrics, n_predictions):
+    """generate_series: fechas distintas por fila, como en producción."""
+    families = [model_family(name) for name in MODEL_NAMES]
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO model_metrics (created_at, updated_at, model_name, model_family, target,
+                                       dataset_type, r2_score, timestamp)
+            SELECT now(), now(), (%s::text[])[g %% 5 + 1], (%s::text[])[g %% 5 + 1],
+                   (%s::text[])[g %% 2 + 1], (%s::text[])[(g / 2) %% 2 + 1], 0.5,
+                   now() - g * interval '1 second'
+            FROM generate_series(1, %s) g""", [MODEL_NAMES, families, TARGETS, DATASETS, n_metrics])
+        cursor.execute("""
+            INSERT INTO comparison_summary (created_at, updated_at, target, dataset_type, best_model,
+                                            best_r2, comparison_date)
+            SELECT now(), now(), 'mhlth_crudeprev', 'no_social', 'XGBoost', 0.5, now() - g * interval '1 second'
+            FROM generate_series(1, %s) g""", [n_metrics // 10])
+        cursor.execute("""
+            INSERT INTO prediction (created_at, updated_at, model_used, target, predicted_value,
+                                    input_vector, prediction_date)
+            SELECT now(), now(), 'bench', 'mhlth_crudeprev', g, '{}'::jsonb, now() - g * interval '1 second'
+            FROM generate_series(1, %s) g""", [n_predictions])
+        cursor.execute("ANALYZE model_metrics, prediction, comparison_summary")
+
+
+def fill_orm(n_metrics, n_predictions):
+    """Cualquier otra base de datos (auto_now_add: todas las filas con la misma fecha)."""
+    for start in range(0, n_metrics, BATCH):
+        ModelMetrics.objects.bulk_create([
+            ModelMetrics(
+                model_name=MODEL_NAMES[i % 5], model_family=model_family(MODEL_NAMES[i % 5]),
+                target=TARGETS[i % 2], dataset_type=DATASETS[(i // 2) % 2], r2_score=0.5,
+            )
+            for i in range(start, min(start + BATCH, n_metrics))
+        ])
+    ComparisonSummary.objects.bulk_create([
+        ComparisonSummary(target="mhlth_crudeprev", best_model="XGBoost", best_r2=0.5)
+        for _ in range(n_metrics // 10)
+    ], batch_size=BATCH)
+    for start in range(0, n_predictions, BATCH):
+        Prediction.objects.bulk_create([
+            Prediction(model_used="bench", target="mhlth_crudeprev", predicted_value=float(i), input_vector={})
+            for i in range(start, min(start + BATCH, n_predictions))
+        ])
+
+
+# ======================================================
+# 2️⃣ Planes
+# ======================================================
+QUERIES = {
+    "home: última métrica (icontains, antes)": lambda: ModelMetrics.objects.filter(
+        model_name__icontains="xgboost", target="mhlth_crudeprev", dataset_type="full_social",
+    ).order_by("-timestamp")[:1],
+    "home: última métrica (model_family)": lambda: ModelMetrics.objects.filter(
+        model_family="xgboost", target="mhlth_crudeprev", dataset_type="full_social",
+    ).order_by("-timestamp")[:1],
+    "home: media R² (icontains, antes)": lambda: ModelMetrics.objects.filter(
+        dataset_type="full_social", model_name__icontains="xgboost",
+    ).values("dataset_type").annotate(avg=Avg("r2_score")),
+    "home: media R² (model_family)": lambda: ModelMetrics.objects.filter(
+        dataset_type="full_social", model_family="xgboost",
+    ).values("dataset_type").annotate(avg=Avg("r2_score")),
+    "API: página de predicciones": lambda: Prediction.objects.order_by("-prediction_date", "-id")[:101],
+    "API: página de comparaciones": lambda: ComparisonSummary.objects.order_by("-comparison_date", "-id")[:101],
+}
+
+
+def explain(queryset):
+    if connection.vendor == "postgresql":
+        return queryset.explain(analyze=True)
+    return queryset.explain()
+
+
+def timed(queryset, repeat=20):
+    list(queryset)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        list(queryset.all())
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Planes de consulta sobre tablas sintéticas grandes")
+    parser.add_argument("--metrics", type=int, default=200000)
+    parser.add_argument("--predictions", type=int, default=200000)
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        start = time.perf_counter()
+        (fill_postgres if connection.vendor == "postgresql" else fill_orm)(args.metrics, args.predictions)
+        print(f"📊 {args.metrics} métricas, {args.predictions} predicciones ({connection.vendor}, "
+              f"{time.perf_counter() - start:.1f}s de carga)")
+
+        for label, build in QUERIES.items():
+            print(f"\n▶ {label}: {timed(build()):.2f} ms")
+            print(explain(build()))
+
+        transaction.set_rollback(True)  # la base de datos queda como estaba
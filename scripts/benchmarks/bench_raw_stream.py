@@ -0,0 +1,95 @@
+# ======================================================
+#  CityMind - Benchmark Raw Stream
+#  Memoria pico y tiempo del wrangling en memoria (read_csv completo) frente
+#  al modo streaming (usecols + float32/categorías + bloques, dos pasadas)
+#  sobre un CSV crudo sintético con la anchura de CDC PLACES (medidas
+#  crude, age-adjusted e intervalos de confianza).
+#
+#  Uso:
+#    python scripts/benchmarks/bench_raw_stream.py [--scale 100] [--chunksize 200000]
+# ======================================================
+
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+from scripts.benchmarks.bench_wrangling import make_places
+from scripts.common.wrangling import COLS_META, STREAM_CHUNK_SIZE
+
+# ======================================================
+# 1️⃣ CSV crudo sintético
+# ======================================================
+def write_raw(path, scale):
+    """Formato crudo: mayúsculas, población con separador de miles y columnas que no se usan."""
+    df = make_places(scale)
+    rng = np.random.default_rng(0)
+    for col in [c for c in df.columns if c.endswith("crudeprev")]:
+        measure = col.replace("_crudeprev", "")
+        df[f"{measure}_adjprev"] = (df[col] * rng.uniform(0.9, 1.1, len(df))).round(1)
+        df[f"{measure}_crude95ci"] = "(" + (df[col] - 1).round(1).astype(str) + ", " + (df[col] + 1).round(1).astype(str) + ")"
+    for col in ("totalpopulation", "totalpop18plus"):
+        df[col] = df[col].map("{:,}".format)
+    df.columns = [c.upper() for c in df.columns]
+    df.to_csv(path, index=False)
+    return df.shape
+
+
+# ======================================================
+# 2️⃣ Ejecución aislada (un proceso por modo para medir su pico)
+# ======================================================
+CHILD = """
+import resource, sys, time
+sys.path.append({root!r})
+import pandas as pd
+from scripts.common.wrangling import normalize_columns, wrangle, wrangle_stream
+start = time.perf_counter()
+rows = 0
+if {stream!r}:
+    for datasets in wrangle_stream({path!r}, {chunksize!r}):
+        rows += len(datasets["imputed_full"])
+else:
+    df = pd.read_csv({path!r}, low_memory=False, thousands=",")
+    normalize_columns(df)
+    rows = len(wrangle(df)["imputed_full"])
+elapsed = time.perf_counter() - start
+# VmHWM es del propio proceso (ru_maxrss hereda el pico del padre tras fork+exec)
+try:
+    with open("/proc/self/status") as f:
+        peak_mb = next(int(l.split()[1]) for l in f if l.startswith("VmHWM")) / 1024
+except OSError:
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(f"{{rows}} {{elapsed:.2f}} {{peak_mb:.0f}}")
+"""
+
+
+def run(path, stream, chunksize):
+    code = CHILD.format(root=str(ROOT), path=str(path), stream=stream, chunksize=chunksize)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    rows, elapsed, peak = out.stdout.split()
+    return int(rows), float(elapsed), float(peak)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del modo streaming del wrangling")
+    parser.add_argument("--scale", type=int, default=100, help="Múltiplo del nº de condados de PLACES")
+    parser.add_argument("--chunksize", type=int, default=STREAM_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = Path(tmp) / "places_raw.csv"
+        shape = write_raw(raw, args.scale)
+        print(f"📂 CSV crudo sintético: {shape} ({raw.stat().st_size / 1e6:.0f} MB, "
+              f"{len(COLS_META)} meta + crude usados)")
+
+        rows_mem, t_mem, peak_mem = run(raw, False, args.chunksize)
+        rows_stream, t_stream, peak_stream = run(raw, True, args.chunksize)
+
+    assert rows_mem == rows_stream, "El número de filas no coincide"
+    print(f"⏱️  En memoria: {t_mem:.2f} s, pico {peak_mem:.0f} MB")
+    print(f"⏱️  Streaming:  {t_stream:.2f} s, pico {peak_stream:.0f} MB (bloques de {args.chunksize})")
@@ -0,0 +1,117 @@
+# ======================================================
+#  CityMind - Benchmark Tree Inference
+#  Compara la ruta actual de la API (XGBRegressor cargado con joblib) con
+#  los arrays exportados (scripts/common/tree_arrays.py, TreeEnsemble) y con
+#  lo que sirve el registro de la API (TreeEnsemble hasta SMALL_BATCH_ROWS
+#  filas, booster del .joblib por encima): carga, latencia por fila (una
+#  fila por llamada, como /api/predict/), por fila en lotes pequeños y por
+#  fila en lote (como /api/predict/batch/).
+#
+#  Comprueba que el registro no es más lento que joblib (la ruta anterior)
+#  ni en lote ni en una fila. Una fila con TreeEnsemble queda en ~20-25 µs
+#  (10-15× menos que XGBRegressor): no llega a "pocos µs", porque cada nivel
+#  del árbol son ~4 operaciones NumPy de ~1 µs sobre todos los árboles; bajar
+#  de ahí exigiría código compilado.
+#
+#  Uso:
+#    python scripts/benchmarks/bench_tree_inference.py [--rows 3144] [--batch 10000]
+# ======================================================
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from api.model_registry import ModelRegistry, model_filename
+from scripts.benchmarks.bench_pca_variant import make_model_data
+from scripts.common.feature_expansion import get_expansion_plan
+from scripts.common.training import XGB_PARAMS, fit_early_stopping
+from scripts.common.tree_arrays import SMALL_BATCH_ROWS, TreeEnsemble, export_model, trees_path
+
+TARGET, USE_SOCIAL = "mhlth_crudeprev", True
+TOLERANCE = 1.10  # margen de ruido en las comprobaciones
+
+
+def per_call_us(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(label, load, predict, X_rows, X_batch):
+    start = time.perf_counter()
+    model = load()
+    load_ms = (time.perf_counter() - start) * 1e3
+    X_small = X_rows[:SMALL_BATCH_ROWS]
+    return model, {
+        "backend": label,
+        "load_ms": round(load_ms, 2),
+        "single_row_us": round(per_call_us(lambda: predict(model, X_rows[:1]), 2000), 1),
+        "small_batch_us_per_row": round(per_call_us(lambda: predict(model, X_small), 500) / len(X_small), 2),
+        "batch_us_per_row": round(per_call_us(lambda: predict(model, X_batch), 5) / len(X_batch), 3),
+    }
+
+
+def direct(model, X):
+    return model.predict(X)
+
+
+def warm_registry(models_dir):
+    """Registro con los dos formatos cargados (el .joblib solo se carga al pedir un lote)."""
+    registry = ModelRegistry(models_dir, check_interval=60)
+    registry.get(TARGET, USE_SOCIAL)
+    registry.get(TARGET, USE_SOCIAL, batch=True)
+    return registry
+
+
+def served(registry, X):
+    """Como BatchPredictView: booster del .joblib por encima de SMALL_BATCH_ROWS filas."""
+    return registry.get(TARGET, USE_SOCIAL, batch=len(X) > SMALL_BATCH_ROWS).predict(X)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del formato de inferencia de árboles")
+    parser.add_argument("--rows", type=int, default=3144)
+    parser.add_argument("--batch", type=int, default=10000)
+    args = parser.parse_args()
+
+    # Columnas de la API para (TARGET, USE_SOCIAL): el registro las comprueba al cargar
+    features = list(get_expansion_plan(TARGET, USE_SOCIAL).feature_names)
+    X, y = make_model_data(args.rows, len(features), factors=6)
+    X.columns = features
+    model = XGBRegressor(**XGB_PARAMS, n_jobs=1)
+    fit_early_stopping(model, X, y)
+
+    X_rows = X.to_numpy()
+    X_batch = np.resize(X_rows, (args.batch, X_rows.shape[1]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / model_filename(TARGET, USE_SOCIAL)
+        joblib.dump(model, path)
+        export_model(model, path)
+
+        booster, joblib_row = run("joblib (XGBRegressor)", lambda: joblib.load(path), direct, X_rows, X_batch)
+        ensemble, arrays_row = run("tree_arrays (TreeEnsemble)", lambda: TreeEnsemble.load(trees_path(path)),
+                                   direct, X_rows, X_batch)
+        registry, registry_row = run("registro API", lambda: warm_registry(tmp),
+                                     served, X_rows, X_batch)
+        max_diff = np.abs(booster.predict(X_batch) - ensemble.predict(X_batch)).max()
+
+    print(f"🌲 {ensemble.n_trees} árboles (best_iteration={model.best_iteration}), profundidad {ensemble.depth}")
+    print(pd.DataFrame([joblib_row, arrays_row, registry_row]).to_string(index=False))
+    print(f"Máxima diferencia de predicción: {max_diff:.2e}")
+
+    assert registry_row["batch_us_per_row"] <= joblib_row["batch_us_per_row"] * TOLERANCE, \
+        "el registro es más lento que joblib en lote"
+    assert registry_row["single_row_us"] <= joblib_row["single_row_us"], \
+        "el registro es más lento que joblib en una fila"
+    print("✅ Registro: no más lento que joblib, ni en lote ni en una fila")
@@ -0,0 +1,122 @@
+# ======================================================
+#  CityMind - Benchmark Wrangling
+#  Compara la limpieza original (groupby + lambda por estado y columna,
+#  copias completas del dataset) con scripts/common/wrangling.py sobre un
+#  dataset sintético con la forma de CDC PLACES escalado N veces
+#  (por defecto 100× condados ≈ tamaño de PLACES a nivel de tract).
+#
+#  Uso:
+#    python scripts/benchmarks/bench_wrangling.py [--scale 100] [--repeat 3]
+# ======================================================
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.common.wrangling import COLS_MED, COLS_META, COLS_SOCIAL, wrangle
+
+# ======================================================
+# 1️⃣ Dataset sintético
+# ======================================================
+N_COUNTIES = 3144
+N_STATES = 51
+OTHER_MEASURES = [
+    "access2", "arthritis", "binge", "cancer", "casthma", "chd", "checkup",
+    "colon_screen", "copd", "csmoking", "dental", "depression", "diabetes",
+    "ghlth", "lpa", "mammouse", "mhlth", "obesity", "phlth", "sleep", "stroke",
+    "teethlost", "hearing", "vision", "cognition", "mobility", "selfcare",
+    "indeplive", "disability",
+]
+
+
+def make_places(scale=100, seed=42):
+    """Dataset con columnas y patrón de nulos similares a PLACES (ya normalizado)."""
+    rng = np.random.default_rng(seed)
+    n = N_COUNTIES * scale
+    states = np.array([f"S{i:02d}" for i in range(N_STATES)])
+    state = states[rng.integers(0, N_STATES, n)]
+
+    data = {
+        "stateabbr": state,
+        "statedesc": np.char.add("State ", state),
+        "countyname": np.char.add("County ", np.arange(n).astype(str)),
+        "countyfips": np.char.zfill(np.arange(1, n + 1).astype(str), 5),
+        "totalpopulation": rng.integers(500, 1_000_000, n),
+        "totalpop18plus": rng.integers(400, 800_000, n),
+    }
+    crude = [f"{m}_crudeprev" for m in OTHER_MEASURES] + COLS_MED + COLS_SOCIAL
+    for col in crude:
+        values = rng.uniform(1, 60, n).round(1)
+        values[rng.random(n) < 0.02] = np.nan
+        data[col] = values
+
+    df = pd.DataFrame(data)
+    # Los indicadores sociales solo se publican en parte de los estados
+    no_social_states = states[rng.random(N_STATES) < 0.3]
+    mask = df["stateabbr"].isin(no_social_states).to_numpy()
+    df.loc[mask, COLS_SOCIAL] = np.nan
+    return df
+
+
+# ======================================================
+# 2️⃣ Implementación original (referencia)
+# ======================================================
+def legacy_wrangle(df):
+    cols_crude = [c for c in df.columns if c.endswith("crudeprev")]
+    df_clean = df[COLS_META + cols_crude]
+
+    df_imputed = df_clean.copy()
+    for col in COLS_SOCIAL:
+        if col in df_imputed.columns:
+            df_imputed[col] = df_imputed.groupby("stateabbr")[col].transform(lambda x: x.fillna(x.median()))
+
+    df_no_social = df_clean.drop(columns=COLS_SOCIAL, errors="ignore")
+    df_no_social_clean = df_no_social.dropna(subset=COLS_MED)
+    df_imputed_clean = df_imputed.dropna(subset=COLS_MED)
+
+    df_imputed_full = df_imputed_clean.copy()
+    for col in cols_crude:
+        if col not in COLS_META and df_imputed_full[col].isna().sum() > 0:
+            df_imputed_full[col] = df_imputed_full[col].fillna(df_imputed_full[col].mean())
+
+    return {
+        "no_social_clean": df_no_social_clean,
+        "imputed_clean": df_imputed_clean,
+        "imputed_full": df_imputed_full,
+    }
+
+
+# ======================================================
+# 3️⃣ Medición
+# ======================================================
+def best_of(fn, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del paso de wrangling")
+    parser.add_argument("--scale", type=int, default=100, help="Múltiplo del nº de condados de PLACES")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_places(args.scale)
+    print(f"📊 Dataset sintético: {df.shape} ({df.memory_usage(deep=True).sum() / 1e6:.0f} MB)")
+
+    t_legacy, expected = best_of(legacy_wrangle, df, args.repeat)
+    t_new, result = best_of(wrangle, df, args.repeat)
+
+    for name in expected:
+        pd.testing.assert_frame_equal(result[name], expected[name], check_exact=True)
+    print("✅ Resultados idénticos a la implementación original")
+    print(f"⏱️  Original:   {t_legacy:.3f} s")
+    print(f"⏱️  Vectorizado: {t_new:.3f} s  (x{t_legacy / t_new:.1f})")
@@ -1,11 +1,33 @@
 # ======================================================
 #  CityMind - 01 Wrangling Final (Wide format, estructurado)
 # Limpieza, imputación y generación de datasets base desde CDC PLACES 2024
+#
+#  Uso:
+#    python scripts/common/01_wrangling_final.py [--raw data/raw/...csv] [--stream] [--chunksize N]
+#  (--stream se activa solo si el fichero crudo supera STREAM_THRESHOLD_BYTES)
 # ======================================================
 
+import argparse
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.common.dataset_io import (
+    DatasetWriter,
+    dataset_columns,
+    dataset_path,
+    view_path,
+    write_dataset,
+    write_view,
+)
+from scripts.common.wrangling import (
+    STREAM_CHUNK_SIZE,
+    normalize_columns,
+    wrangle,
+    wrangle_stream,
+)
+
 # ======================================================
 # 1️⃣ Configuración general
 # ======================================================
@@ -14,6 +36,16 @@ BASE_DIR = Path("data/processed")
 OUT_NO_SOCIAL = BASE_DIR / "no_social"
 OUT_FULL_SOCIAL = BASE_DIR / "full_social"
 
+# Ficheros crudos mayores (place / tract) se procesan por bloques
+STREAM_THRESHOLD_BYTES = 512 * 1024 ** 2
+
+parser = argparse.ArgumentParser(description="Wrangling de CDC PLACES")
+parser.add_argument("--raw", type=Path, default=RAW_PATH, help="CSV crudo de PLACES")
+parser.add_argument("--stream", action="store_true", help="Procesar por bloques (memoria acotada)")
+parser.add_argument("--chunksize", type=int, default=STREAM_CHUNK_SIZE)
+args = parser.parse_args()
+RAW_PATH = args.raw
+
 for folder in [BASE_DIR, OUT_NO_SOCIAL, OUT_FULL_SOCIAL]:
     folder.mkdir(parents=True, exist_ok=True)
 
@@ -22,107 +54,98 @@ if not RAW_PATH.exists():
 else:
     print(f"📂 Cargando datos desde: {RAW_PATH.resolve()}")
 
-# ======================================================
-# 2️⃣ Cargar dataset crudo
-# ======================================================
-df = pd.read_csv(RAW_PATH, low_memory=False)
-print("📊 Datos cargados:", df.shape)
-
-# Normalizamos nombres de columnas (mejor práctica)
-df.columns = (
-    df.columns.str.strip()
-    .str.lower()
-    .str.replace(" ", "_")
-    .str.replace("-", "_")
-)
-
-if "countyfips" in df.columns:
-    df["countyfips"] = df["countyfips"].astype(str).str.zfill(5)
-
-# ======================================================
-# 3️⃣ Seleccionar columnas relevantes (solo crude prevalence)
-# ======================================================
-cols_meta = [
-    "stateabbr", "statedesc", "countyname", "countyfips",
-    "totalpopulation", "totalpop18plus"
-]
-cols_crude = [c for c in df.columns if c.endswith("crudeprev")]
-df_clean = df[cols_meta + cols_crude]
-print(f"✅ Seleccionadas columnas: {len(df_clean.columns)}")
-
-# ======================================================
-# 4️⃣ Imputación social (mediana estatal)
-# ======================================================
-cols_social = [
-    "foodinsecu_crudeprev", "foodstamp_crudeprev", "housinsecu_crudeprev",
-    "emotionspt_crudeprev", "isolation_crudeprev",
-    "lacktrpt_crudeprev", "shututility_crudeprev"
-]
-
-df_imputed = df_clean.copy()
-for col in cols_social:
-    if col in df_imputed.columns:
-        df_imputed[col] = df_imputed.groupby("stateabbr")[col].transform(lambda x: x.fillna(x.median()))
-
-# ======================================================
-# 5️⃣ Eliminar sociales
-# ======================================================
-df_no_social = df_clean.drop(columns=cols_social, errors="ignore")
-
-# ======================================================
-# 6️⃣ Eliminar nulos médicos críticos
-# ======================================================
-cols_med = ["highchol_crudeprev", "cholscreen_crudeprev", "bphigh_crudeprev", "bpmed_crudeprev"]
-df_no_social_clean = df_no_social.dropna(subset=cols_med)
-df_imputed_clean = df_imputed.dropna(subset=cols_med)
-
-# ======================================================
-# 7️⃣ Imputación completa (media nacional)
-# ======================================================
-df_imputed_full = df_imputed_clean.copy()
-for col in cols_crude:
-    if col not in cols_meta and df_imputed_full[col].isna().sum() > 0:
-        df_imputed_full[col] = df_imputed_full[col].fillna(df_imputed_full[col].mean())
+STREAM = args.stream or RAW_PATH.stat().st_size > STREAM_THRESHOLD_BYTES
+TARGETS = ["depression_crudeprev", "mhlth_crudeprev"]
 
-# ======================================================
-# 8️⃣ Guardar datasets generales
-# ======================================================
 outputs = {
-    OUT_NO_SOCIAL / "places_no_social_clean.csv": df_no_social_clean,
-    OUT_FULL_SOCIAL / "places_imputed_clean.csv": df_imputed_clean,
-    OUT_FULL_SOCIAL / "places_imputed_full_clean.csv": df_imputed_full
+    "no_social_clean": OUT_NO_SOCIAL / "places_no_social_clean.csv",
+    "imputed_clean": OUT_FULL_SOCIAL / "places_imputed_clean.csv",
+    "imputed_full": OUT_FULL_SOCIAL / "places_imputed_full_clean.csv",
 }
+FINAL_PATH = BASE_DIR / "final_places.csv"
 
-for path, data in outputs.items():
-    data.to_csv(path, index=False)
-    print(f"💾 Guardado: {path.name} ({data.shape})")
-
-# ======================================================
-# 9️⃣ Generar datasets específicos para cada target
-# ======================================================
-TARGETS = ["depression_crudeprev", "mhlth_crudeprev"]
-
-for target in TARGETS:
-    if target not in df_no_social_clean.columns:
-        print(f"⚠️ Target {target} no encontrado, se omite.")
-        continue
-
-    df_no_social_clean[[target] + [c for c in df_no_social_clean.columns if c != target]].to_csv(
-        OUT_NO_SOCIAL / f"model_data_{target}.csv", index=False
-    )
-
-    df_imputed_full[[target] + [c for c in df_imputed_full.columns if c != target]].to_csv(
-        OUT_FULL_SOCIAL / f"model_data_{target}.csv", index=False
-    )
 
-print("📁 Archivos por target creados correctamente.")
+def write_views():
+    """
+    final_places y los model_data por target no se materializan: son vistas
+    (manifiesto con columnas y target) del dataset canónico de cada escenario.
+    """
+    write_view(FINAL_PATH, outputs["imputed_full"])
+    columns = dataset_columns(outputs["no_social_clean"])
+    for target in TARGETS:
+        if target not in columns:
+            continue
+        write_view(OUT_NO_SOCIAL / f"model_data_{target}.csv", outputs["no_social_clean"], target=target)
+        write_view(OUT_FULL_SOCIAL / f"model_data_{target}.csv", outputs["imputed_full"], target=target)
+
+
+if not STREAM:
+    # ======================================================
+    # 2️⃣ Cargar dataset crudo
+    # ======================================================
+    # thousands=",": totalpopulation viene como "4,902" → se guarda ya como número
+    df = pd.read_csv(RAW_PATH, low_memory=False, thousands=",")
+    print("📊 Datos cargados:", df.shape)
+
+    # Normalizamos nombres de columnas (mejor práctica) y FIPS a 5 dígitos
+    normalize_columns(df)
+
+    # ======================================================
+    # 3️⃣ Limpieza e imputación (scripts/common/wrangling.py)
+    #    - columnas crude prevalence
+    #    - sociales: mediana estatal (una agregación agrupada)
+    #    - sin nulos médicos críticos
+    #    - resto: media nacional
+    # ======================================================
+    datasets = wrangle(df)
+    print(f"✅ Seleccionadas columnas: {datasets['imputed_clean'].shape[1]}")
+
+    # ======================================================
+    # 4️⃣ Guardar datasets canónicos
+    # ======================================================
+    for key, path in outputs.items():
+        written = write_dataset(datasets[key], path)
+        print(f"💾 Guardado: {written.name} ({datasets[key].shape})")
+
+    stats = {
+        key: {"rows": d.shape[0], "cols": d.shape[1], "nulls": d.isna().sum().sum()}
+        for key, d in datasets.items()
+    }
 
-# ======================================================
-# 🔟 Guardar resumen
+else:
+    # ======================================================
+    # 2️⃣ + 3️⃣ Modo streaming: dos pasadas por bloques
+    #    - solo columnas meta + crudeprev (usecols), float32 y categorías
+    #    - medianas estatales con histograma mergeable (1ª pasada)
+    #    - imputación y escritura bloque a bloque (2ª pasada)
+    # ======================================================
+    print(f"🌊 Modo streaming (bloques de {args.chunksize} filas)")
+    writers = {key: DatasetWriter(path) for key, path in outputs.items()}
+    stats = {key: {"rows": 0, "cols": 0, "nulls": 0} for key in outputs}
+
+    try:
+        for datasets in wrangle_stream(RAW_PATH, args.chunksize):
+            for key in outputs:
+                writers[key].write(datasets[key])
+                stats[key]["rows"] += datasets[key].shape[0]
+                stats[key]["cols"] = datasets[key].shape[1]
+                stats[key]["nulls"] += datasets[key].isna().sum().sum()
+    finally:
+        for w in writers.values():
+            w.close()
+
+    for key, path in outputs.items():
+        print(f"💾 Guardado: {dataset_path(path).name} ({stats[key]['rows']}, {stats[key]['cols']})")
+
+write_views()
+print("📁 Vistas por target y final_places creadas correctamente.")
+
+# ======================================================
+# 5️⃣ Guardar resumen
 # ======================================================
 summary = pd.DataFrame([
-    {"dataset": path.name, "rows": d.shape[0], "cols": d.shape[1], "nulls": d.isna().sum().sum()}
-    for path, d in outputs.items()
+    {"dataset": dataset_path(path).name, **stats[key]}
+    for key, path in outputs.items()
 ])
 summary_path = BASE_DIR / "wrangling_summary.csv"
 summary.to_csv(summary_path, index=False)
@@ -132,7 +155,6 @@ print(summary)
 # ======================================================
 # 🚀 Export final para ingesta
 # ======================================================
-FINAL_PATH = BASE_DIR / "final_places.csv"
-df_imputed_full.to_csv(FINAL_PATH, index=False)
-print(f"\n🚀 Dataset final exportado para ingesta → {FINAL_PATH.name} ({df_imputed_full.shape})")
+print(f"\n🚀 Dataset final exportado para ingesta → {view_path(FINAL_PATH).name} "
+      f"({stats['imputed_full']['rows']}, {stats['imputed_full']['cols']})")
 print("\n🎯 Wrangling completado con éxito.")
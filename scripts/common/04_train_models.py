@@ -0,0 +1,84 @@
+# ======================================================
+#  CityMind - 04 Train Models (rejilla completa)
+#  Entrena LassoCV, RandomForest y XGBoost para depresión y distress
+#  en los escenarios No Social y Full Social en un pool de procesos
+#  (--pca añade las variantes PCA → LassoCV / XGBoost)
+#
+#  Uso:
+#    python scripts/common/04_train_models.py [--scenarios no_social full_social] [--cores N] [--no-cache] [--pca]
+# ======================================================
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.common.training import SCENARIOS, train_grid
+from scripts.common.training_cache import TrainingCache
+
+# ======================================================
+# 0. Integración con Monitoring (módulo 10) y MLflow (módulo 11)
+#    Dentro de funciones: los workers (spawn) reimportan este script y no
+#    deben abrir otra carpeta de logs.
+# ======================================================
+def load_monitoring():
+    spec = importlib.util.spec_from_file_location(
+        "monitoring",
+        Path("scripts/common/10_monitoring_logging.py")
+    )
+    monitoring = importlib.util.module_from_spec(spec)
+    sys.modules["monitoring"] = monitoring
+    spec.loader.exec_module(monitoring)
+    return monitoring
+
+
+def load_tracker(logger):
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "mlflow_tracker",
+            Path("scripts/common/11_mlflow_tracking.py")
+        )
+        mlflow_tracker = importlib.util.module_from_spec(spec)
+        sys.modules["mlflow_tracker"] = mlflow_tracker
+        spec.loader.exec_module(mlflow_tracker)
+        return mlflow_tracker.CityMindTracker()
+    except Exception as e:
+        logger.warning(f"No se pudo importar MLflow Tracker: {e}")
+        return None
+
+
+# ======================================================
+# 1. Entrenamiento de la rejilla (scripts/common/training.py)
+# ======================================================
+def main(scenarios, cores=None, use_cache=True, pca=False):
+    monitoring = load_monitoring()
+    labels = " + ".join(SCENARIOS[s]["label"] for s in scenarios)
+    step = monitoring.PipelineStep(f"Train Models - {labels}")
+    try:
+        start = time.perf_counter()
+        cache = TrainingCache() if use_cache else None
+        metrics = train_grid(scenarios, cores=cores, tracker=load_tracker(monitoring.logger),
+                             cache=cache, pca=pca)
+        for scenario, df in metrics.items():
+            print(f"\n📊 Métricas {SCENARIOS[scenario]['label']}:")
+            print(df.to_string(index=False))
+        step.end(status="SUCCESS",
+                 message=f"Entrenamiento {labels} completado en {time.perf_counter() - start:.1f}s.")
+    except Exception as e:
+        step.end(status="FAILED", message=str(e))
+        raise
+
+
+# ======================================================
+# 2. Ejecución
+# ======================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrenamiento paralelo de la rejilla de modelos")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--cores", type=int, default=None, help="Núcleos disponibles (por defecto todos)")
+    parser.add_argument("--no-cache", action="store_true", help="Reentrenar todo sin usar la caché")
+    parser.add_argument("--pca", action="store_true", help="Añadir las variantes PCA → LassoCV / XGBoost")
+    args = parser.parse_args()
+    main(args.scenarios, args.cores, use_cache=not args.no_cache, pca=args.pca)
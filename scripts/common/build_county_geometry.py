@@ -0,0 +1,233 @@
+# ======================================================
+#  CityMind - Build County Geometry (asset offline del dashboard)
+#  Genera core/static/geo/us_counties_simplified.json a partir de las
+#  fronteras de condados del Census (shapefile cb_*_us_county_500k o GeoJSON):
+#   1. Cuantiza coordenadas a una rejilla fija (QUANTUM grados)
+#   2. Corta cada anillo en arcos entre puntos de unión (junctions)
+#   3. Simplifica cada arco una sola vez (Douglas-Peucker) y lo reutiliza en
+#      todos los condados que lo comparten → sin huecos ni solapes entre vecinos
+#
+#  Uso:
+#    python scripts/common/build_county_geometry.py <cb_2016_us_county_500k.shp | counties.geojson>
+#  (el shapefile viene incluido en el paquete plotly-geo; leerlo requiere pyshp)
+# ======================================================
+
+import argparse
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+
+# ======================================================
+# 1️⃣ Configuración general
+# ======================================================
+OUT_PATH = Path("core/static/geo/us_counties_simplified.json")
+QUANTUM = 0.001       # rejilla de cuantización (~100 m)
+TOLERANCE = 0.02      # tolerancia Douglas-Peucker en grados (< 1 px en el mapa nacional)
+DECIMALS = 3
+
+# Solo 50 estados + DC (sin territorios: el mapa usa scope="usa")
+MAX_STATE_FIPS = 56
+
+
+# ======================================================
+# 2️⃣ Lectura de la fuente
+# ======================================================
+def _signed_area(ring):
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:])) / 2.0
+
+
+def read_shapefile(path):
+    """Devuelve {fips: [polígono, ...]} con polígono = [anillo exterior, huecos...]."""
+    import shapefile  # pyshp (solo necesario para construir el asset)
+
+    counties = {}
+    with shapefile.Reader(str(path)) as reader:
+        for shape_record in reader.iterShapeRecords():
+            fips = shape_record.record["GEOID"]
+            points = shape_record.shape.points
+            parts = list(shape_record.shape.parts) + [len(points)]
+            polygons = []
+            for start, end in zip(parts, parts[1:]):
+                ring = [tuple(p) for p in points[start:end]]
+                # Shapefile: exteriores en sentido horario (área < 0), huecos antihorario
+                if _signed_area(ring) <= 0 or not polygons:
+                    polygons.append([ring])
+                else:
+                    polygons[-1].append(ring)
+            counties[fips] = polygons
+    return counties
+
+
+def read_geojson(path):
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    counties = {}
+    for feature in collection["features"]:
+        geometry = feature["geometry"]
+        polygons = geometry["coordinates"]
+        if geometry["type"] == "Polygon":
+            polygons = [polygons]
+        counties[str(feature["id"])] = [[[tuple(p) for p in ring] for ring in poly] for poly in polygons]
+    return counties
+
+
+# ======================================================
+# 3️⃣ Cuantización y detección de uniones
+# ======================================================
+def quantize_ring(ring):
+    """Ajusta a la rejilla (enteros) y elimina puntos consecutivos repetidos."""
+    out = []
+    for x, y in ring:
+        q = (round(x / QUANTUM), round(y / QUANTUM))
+        if not out or out[-1] != q:
+            out.append(q)
+    if out[0] != out[-1]:
+        out.append(out[0])
+    return out
+
+
+def find_junctions(rings):
+    """Puntos con más de dos vecinos distintos: ahí empiezan/terminan los arcos compartidos."""
+    neighbours = defaultdict(set)
+    for ring in rings:
+        for a, b in zip(ring, ring[1:]):
+            neighbours[a].add(b)
+            neighbours[b].add(a)
+    return {p for p, n in neighbours.items() if len(n) > 2}
+
+
+# ======================================================
+# 4️⃣ Simplificación por arcos
+# ======================================================
+def _point_segment_distance(p, a, b):
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def douglas_peucker(points, tolerance):
+    """Douglas-Peucker iterativo (mantiene siempre los extremos)."""
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            d = _point_segment_distance(points[i], points[first], points[last])
+            if d > max_dist:
+                max_dist, index = d, i
+        if index is not None and max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+
+class ArcSimplifier:
+    """Simplifica cada arco una única vez, con independencia de su sentido."""
+
+    def __init__(self, tolerance):
+        self.tolerance = tolerance / QUANTUM  # en unidades de la rejilla
+        self._cache = {}
+
+    def simplify(self, arc):
+        reversed_arc = arc[::-1]
+        canonical = min(tuple(arc), tuple(reversed_arc))
+        simplified = self._cache.get(canonical)
+        if simplified is None:
+            simplified = self._cache[canonical] = douglas_peucker(list(canonical), self.tolerance)
+        return simplified if canonical == tuple(arc) else simplified[::-1]
+
+
+def split_ring(ring, junctions):
+    """Corta un anillo cerrado en arcos que empiezan y terminan en uniones."""
+    body = ring[:-1]
+    cuts = [i for i, p in enumerate(body) if p in junctions]
+    if not cuts:
+        # Anillo aislado (isla, enclave): arranque canónico en el punto mínimo
+        start = body.index(min(body))
+        rotated = body[start:] + body[:start]
+        return [rotated + [rotated[0]]]
+
+    rotated = body[cuts[0]:] + body[:cuts[0]] + [body[cuts[0]]]
+    offsets = [c - cuts[0] for c in cuts] + [len(body)]
+    return [rotated[a:b + 1] for a, b in zip(offsets, offsets[1:])]
+
+
+def simplify_ring(ring, junctions, simplifier):
+    if len(ring) < 4:
+        return None
+    out = []
+    for arc in split_ring(ring, junctions):
+        simplified = simplifier.simplify(arc)
+        out.extend(simplified if not out else simplified[1:])
+    if len(out) < 4 or _signed_area(out) == 0:
+        return None  # anillo degenerado tras simplificar (islotes sub-píxel)
+    return out
+
+
+# ======================================================
+# 5️⃣ Construcción del GeoJSON
+# ======================================================
+def build(counties, tolerance=TOLERANCE):
+    counties = {
+        fips: [[quantize_ring(r) for r in poly] for poly in polygons]
+        for fips, polygons in counties.items()
+        if int(fips[:2]) <= MAX_STATE_FIPS
+    }
+    junctions = find_junctions(r for polygons in counties.values() for poly in polygons for r in poly)
+    simplifier = ArcSimplifier(tolerance)
+
+    features = []
+    for fips in sorted(counties):
+        polygons = []
+        for poly in counties[fips]:
+            rings = [simplify_ring(r, junctions, simplifier) for r in poly]
+            if rings[0] is None:
+                continue
+            polygons.append([
+                [[round(x * QUANTUM, DECIMALS), round(y * QUANTUM, DECIMALS)] for x, y in r]
+                for r in rings if r is not None
+            ])
+        if not polygons:
+            continue
+        geometry = (
+            {"type": "Polygon", "coordinates": polygons[0]}
+            if len(polygons) == 1
+            else {"type": "MultiPolygon", "coordinates": polygons}
+        )
+        features.append({"type": "Feature", "id": fips, "geometry": geometry})
+
+    return {"type": "FeatureCollection", "features": features}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera la geometría simplificada de condados de EE.UU.")
+    parser.add_argument("source", type=Path, help="Shapefile (.shp) o GeoJSON de condados")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--out", type=Path, default=OUT_PATH)
+    args = parser.parse_args()
+
+    print(f"📂 Leyendo fronteras desde: {args.source}")
+    reader = read_shapefile if args.source.suffix == ".shp" else read_geojson
+    geojson = build(reader(args.source), args.tolerance)
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(geojson, f, separators=(",", ":"))
+    n_points = sum(
+        len(r)
+        for feat in geojson["features"]
+        for poly in ([feat["geometry"]["coordinates"]] if feat["geometry"]["type"] == "Polygon"
+                     else feat["geometry"]["coordinates"])
+        for r in poly
+    )
+    print(f"💾 Guardado: {args.out} ({len(geojson['features'])} condados, {n_points} puntos, "
+          f"{args.out.stat().st_size / 1024:.0f} KB)")
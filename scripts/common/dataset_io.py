@@ -0,0 +1,198 @@
+"""
+CityMind - Dataset I/O
+----------------------
+Capa común de lectura/escritura de los datasets del pipeline (processed e
+interim) y del dashboard.
+
+- Formato principal: Parquet (pyarrow, compresión zstd). Conserva los tipos
+  (FIPS con ceros a la izquierda, enteros, floats) y permite leer solo las
+  columnas necesarias.
+- Las rutas son lógicas: "data/processed/final_places.csv" y
+  "data/processed/final_places.parquet" designan el mismo dataset. Al leer se
+  usa la versión Parquet si existe y, si no, la CSV (datasets antiguos o
+  entornos sin pyarrow).
+- Exportación CSV solo bajo demanda (csv_export=True) para consumidores que
+  necesitan texto plano.
+- Vistas: un manifiesto "<nombre>.view.json" (dataset origen + columnas +
+  target) sustituye a los datasets que solo reordenan o recortan columnas de
+  otro. read_dataset() las resuelve leyendo del origen únicamente las columnas
+  de la vista.
+"""
+
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# ======================================================
+#  CONFIGURACIÓN
+# ======================================================
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+DATASET_SUFFIX = ".parquet" if PARQUET_AVAILABLE else ".csv"
+PARQUET_COMPRESSION = "zstd"
+VIEW_SUFFIX = ".view.json"
+
+
+def dataset_path(path):
+    """Ruta con la que se escribe el dataset en el formato preferido."""
+    return Path(path).with_suffix(DATASET_SUFFIX)
+
+
+def view_path(path):
+    """Ruta del manifiesto de vista de un dataset lógico."""
+    path = Path(path)
+    name = path.name[: -len(VIEW_SUFFIX)] if path.name.endswith(VIEW_SUFFIX) else path.with_suffix("").name
+    return path.with_name(name + VIEW_SUFFIX)
+
+
+def resolve_dataset(path):
+    """
+    Fichero existente para un dataset lógico (Parquet, CSV o vista).
+    Si no existe ninguno devuelve la ruta en el formato preferido.
+    """
+    path = Path(path)
+    candidates = [path.with_suffix(".parquet"), path.with_suffix(".csv"), view_path(path)]
+    if not PARQUET_AVAILABLE:
+        candidates = candidates[1:]
+    if path.name.endswith(VIEW_SUFFIX):
+        candidates = candidates[-1:]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return dataset_path(path)
+
+
+# ======================================================
+#  LECTURA / ESCRITURA
+# ======================================================
+def read_dataset(path, columns=None):
+    """
+    Carga un dataset. `columns` limita la lectura a esas columnas (en Parquet
+    no se llegan a leer del disco). Lanza FileNotFoundError si no existe.
+    """
+    resolved = resolve_dataset(path)
+    if not resolved.exists():
+        raise FileNotFoundError(f"No se encontró el dataset: {Path(path).with_suffix('')}.(parquet|csv|view.json)")
+
+    if resolved.name.endswith(VIEW_SUFFIX):
+        view = read_view(resolved)
+        columns = columns or view["columns"]
+        df = read_dataset(view["source"], columns=columns)
+        # usecols de CSV no respeta el orden pedido (target primero)
+        return df if list(df.columns) == list(columns) else df[columns]
+    if resolved.suffix == ".parquet":
+        return pd.read_parquet(resolved, columns=columns)
+    # CSV: mismos tipos numéricos aunque vengan con separador de miles ("4,902")
+    return pd.read_csv(resolved, usecols=columns, thousands=",", low_memory=False)
+
+
+def dataset_columns(path):
+    """Nombres de columna de un dataset sin cargar sus datos."""
+    resolved = resolve_dataset(path)
+    if resolved.name.endswith(VIEW_SUFFIX):
+        return read_view(resolved)["columns"]
+    if resolved.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(resolved).names)
+    return list(pd.read_csv(resolved, nrows=0).columns)
+
+
+def write_dataset(df, path, csv_export=False):
+    """
+    Guarda un dataset en el formato preferido y devuelve la ruta escrita.
+    Con csv_export=True deja además una copia .csv junto al fichero principal.
+    """
+    out_path = dataset_path(path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    view_path(path).unlink(missing_ok=True)
+    if out_path.suffix == ".parquet":
+        df.to_parquet(out_path, index=False, compression=PARQUET_COMPRESSION)
+        if csv_export:
+            df.to_csv(out_path.with_suffix(".csv"), index=False)
+    else:
+        df.to_csv(out_path, index=False)
+    return out_path
+
+
+def source_file(path):
+    """Fichero físico que contiene los datos de un dataset (sigue las vistas)."""
+    resolved = resolve_dataset(path)
+    if resolved.name.endswith(VIEW_SUFFIX) and resolved.exists():
+        return source_file(read_view(resolved)["source"])
+    return resolved
+
+
+# ======================================================
+#  VISTAS
+# ======================================================
+def write_view(path, source, columns=None, target=None):
+    """
+    Registra un dataset como vista de `source` (por defecto todas sus columnas,
+    con `target` como primera columna) y devuelve la ruta del manifiesto.
+    Borra las copias materializadas anteriores del mismo dataset.
+    """
+    out_path = view_path(path)
+    columns = list(columns) if columns is not None else dataset_columns(source)
+    if target is not None:
+        columns = [target] + [c for c in columns if c != target]
+    source = Path(os.path.relpath(Path(source).with_suffix(""), out_path.parent))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in (Path(path).with_suffix(".parquet"), Path(path).with_suffix(".csv")):
+        stale.unlink(missing_ok=True)
+    out_path.write_text(json.dumps(
+        {"source": source.as_posix(), "columns": columns, "target": target}, indent=2
+    ))
+    return out_path
+
+
+def read_view(path):
+    """Manifiesto de una vista con `source` resuelto respecto a su carpeta."""
+    path = view_path(path)
+    view = json.loads(path.read_text())
+    view["source"] = path.parent / view["source"]
+    return view
+
+
+class DatasetWriter:
+    """
+    Escritura por bloques de un dataset que no cabe en memoria: cada write()
+    añade un row group al Parquet (o filas al CSV). Todos los bloques deben
+    tener las mismas columnas y tipos (fijar categorías antes de escribir).
+    """
+
+    def __init__(self, path):
+        self.path = dataset_path(path)
+        view_path(path).unlink(missing_ok=True)
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if self.rows == 0:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.suffix == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._writer is None:
+                self._schema = pa.Schema.from_pandas(df, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.path, self._schema, compression=PARQUET_COMPRESSION)
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
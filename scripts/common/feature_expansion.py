@@ -4,9 +4,12 @@ CityMind - Feature Expansion (versión final, ajustada a XGBoost)
 Genera vectores con las columnas exactas para cada tipo de modelo:
 - Depression / MHLTH
 - Full Social / No Social
+
+Cada (target, use_social) se compila una vez en un plan (índices de columna +
+vectores de coeficientes) que se aplica a una fila o a una matriz N × 7 de proxies.
+pandas solo se importa en expand_features() (la API no lo necesita).
 """
 
-import pandas as pd
 import numpy as np
 
 
@@ -58,69 +61,129 @@ FEATURE_NAMES_NO_SOCIAL_MHLTH = [
 
 
 # ============================================================
-# 🔹 Expansor principal
+# 🔹 Vector resumido de entrada (orden de las columnas de la matriz N × 7)
+# ============================================================
+PROXY_FIELDS = (
+    "health_index", "economy_index", "environment_index", "education_index",
+    "social_index", "population", "urbanization",
+)
+PROXY_DEFAULTS = (0.3, 0.5, 0.4, 0.4, 0.2, 100000, 0.7)
+_PROXY_INDEX = {name: i for i, name in enumerate(PROXY_FIELDS)}
+
+
+# ============================================================
+# 🔹 Reglas de expansión: columna = (proxy * a + b) * c + d
+#    (misma aritmética que la versión original, valor a valor)
 # ============================================================
+EXPANSION_RULES = [
+    # (columnas, proxy, a, b, c, d)
+    (["totalpopulation"], "population", 1.0, 0.0, 1.0, 0.0),
+    (["totalpop18plus"], "population", 1.0, 0.0, 0.8, 0.0),
+    (["mhlth_crudeprev", "phlth_crudeprev", "ghlth_crudeprev",
+      "sleep_crudeprev", "obesity_crudeprev", "diabetes_crudeprev"], "health_index", 1.0, 0.0, 10.0, 10.0),
+    (["checkup_crudeprev", "cholscreen_crudeprev", "colon_screen_crudeprev"], "education_index", 1.0, 0.0, 30.0, 50.0),
+    (["csmoking_crudeprev", "binge_crudeprev", "copd_crudeprev"], "environment_index", -1.0, 1.0, 20.0, 0.0),
+    (["isolation_crudeprev", "disability_crudeprev", "emotionspt_crudeprev"], "social_index", -1.0, 1.0, 30.0, 0.0),
+    (["foodinsecu_crudeprev", "housinsecu_crudeprev",
+      "lacktrpt_crudeprev", "shututility_crudeprev"], "economy_index", -1.0, 1.0, 20.0, 0.0),
+]
+
+
+class ExpansionPlan:
+    """
+    Plan compilado para un (target, use_social): nombres de columnas del modelo,
+    índice del proxy de origen de cada columna y vectores de coeficientes.
+    Las columnas sin regla quedan a 0.
+    """
+
+    __slots__ = ("feature_names", "source", "a", "b", "c", "d")
+
+    def __init__(self, feature_names):
+        self.feature_names = tuple(feature_names)
+        n = len(self.feature_names)
+        position = {col: i for i, col in enumerate(self.feature_names)}
+
+        source = np.zeros(n, dtype=np.intp)
+        a, b, c, d = (np.zeros(n) for _ in range(4))
+        for columns, proxy, *coefs in EXPANSION_RULES:
+            for col in columns:
+                if col in position:
+                    j = position[col]
+                    source[j] = _PROXY_INDEX[proxy]
+                    a[j], b[j], c[j], d[j] = coefs
+
+        self.source, self.a, self.b, self.c, self.d = source, a, b, c, d
+
+    def apply(self, proxies):
+        """Aplica el plan a un vector (7,) o a una matriz (N × 7) de proxies."""
+        return (proxies[..., self.source] * self.a + self.b) * self.c + self.d
+
+
+_PLANS = {}
+
+
+def get_expansion_plan(target="mhlth_crudeprev", use_social=True):
+    """Devuelve (y cachea) el plan de expansión para un (target, use_social)."""
+    key = (target, bool(use_social))
+    plan = _PLANS.get(key)
+    if plan is None:
+        # Seleccionar lista base de columnas según tipo
+        if use_social:
+            base_names = FEATURE_NAMES_FULL
+        elif target == "depression_crudeprev":
+            base_names = FEATURE_NAMES_NO_SOCIAL_DEPRESSION
+        else:
+            base_names = FEATURE_NAMES_NO_SOCIAL_MHLTH
+
+        # 🔹 Quitar el target de las features si aparece (para evitar el error)
+        plan = _PLANS[key] = ExpansionPlan(c for c in base_names if c != target)
+    return plan
+
+
+def proxy_values(proxy_vector):
+    """Extrae los 7 índices de un diccionario (con valores por defecto) en orden PROXY_FIELDS."""
+    return [proxy_vector.get(name, default) for name, default in zip(PROXY_FIELDS, PROXY_DEFAULTS)]
+
+
+def proxies_to_matrix(proxy_vectors):
+    """Convierte una lista de diccionarios en una matriz (N × 7) de float64."""
+    return np.array([proxy_values(p) for p in proxy_vectors], dtype=float).reshape(-1, len(PROXY_FIELDS))
+
+
+# ============================================================
+# 🔹 Expansores
+# ============================================================
+def expand_features_array(proxy_vector):
+    """
+    Camino rápido para una sola fila (sin pandas): devuelve un np.ndarray 1D
+    con las features en el orden que espera el modelo.
+    """
+    plan = get_expansion_plan(
+        proxy_vector.get("target", "mhlth_crudeprev"),
+        proxy_vector.get("use_social", True),
+    )
+    return plan.apply(np.array(proxy_values(proxy_vector), dtype=float))
+
+
+def expand_features_batch(proxies, target="mhlth_crudeprev", use_social=True):
+    """
+    Expansión vectorizada: matriz de proxies (N × 7, orden PROXY_FIELDS)
+    → matriz de features del modelo (N × n_features) en una sola operación.
+    """
+    proxies = np.asarray(proxies, dtype=float).reshape(-1, len(PROXY_FIELDS))
+    return get_expansion_plan(target, use_social).apply(proxies)
+
+
 def expand_features(proxy_vector):
     """
     Expande un vector resumido (8–9 índices) en las features esperadas
     por el modelo correspondiente (según target y tipo).
+    Devuelve una pd.Series indexada por nombre de columna.
     """
+    import pandas as pd
 
-    # 1️⃣ Detectar tipo de modelo y target
-    use_social = proxy_vector.get("use_social", True)
-    target = proxy_vector.get("target", "mhlth_crudeprev")
-
-    # Seleccionar lista base de columnas según tipo
-    if use_social:
-        feature_names = FEATURE_NAMES_FULL.copy()
-    else:
-        if target == "depression_crudeprev":
-            feature_names = FEATURE_NAMES_NO_SOCIAL_DEPRESSION.copy()
-        else:
-            feature_names = FEATURE_NAMES_NO_SOCIAL_MHLTH.copy()
-
-    # 🔹 Quitar el target de las features si aparece (para evitar el error)
-    if target in feature_names:
-        feature_names.remove(target)
-
-    # 2️⃣ Crear base inicial vacía
-    base = {col: 0.0 for col in feature_names}
-
-    # 3️⃣ Extraer índices de entrada
-    health = proxy_vector.get("health_index", 0.3)
-    economy = proxy_vector.get("economy_index", 0.5)
-    environment = proxy_vector.get("environment_index", 0.4)
-    education = proxy_vector.get("education_index", 0.4)
-    social = proxy_vector.get("social_index", 0.2)
-    population = proxy_vector.get("population", 100000)
-    urbanization = proxy_vector.get("urbanization", 0.7)
-
-    # 4️⃣ Asignaciones proporcionales
-    base["totalpopulation"] = population
-    if "totalpop18plus" in base:
-        base["totalpop18plus"] = population * 0.8
-
-    for col in ["mhlth_crudeprev", "phlth_crudeprev", "ghlth_crudeprev",
-                "sleep_crudeprev", "obesity_crudeprev", "diabetes_crudeprev"]:
-        if col in base:
-            base[col] = 10 + 10 * health
-
-    for col in ["checkup_crudeprev", "cholscreen_crudeprev", "colon_screen_crudeprev"]:
-        if col in base:
-            base[col] = 50 + education * 30
-
-    for col in ["csmoking_crudeprev", "binge_crudeprev", "copd_crudeprev"]:
-        if col in base:
-            base[col] = (1 - environment) * 20
-
-    for col in ["isolation_crudeprev", "disability_crudeprev", "emotionspt_crudeprev"]:
-        if col in base:
-            base[col] = (1 - social) * 30
-
-    for col in ["foodinsecu_crudeprev", "housinsecu_crudeprev",
-                "lacktrpt_crudeprev", "shututility_crudeprev"]:
-        if col in base:
-            base[col] = (1 - economy) * 20
-
-    # 5️⃣ Devolver Serie ordenada según las features reales del modelo
-    return pd.Series(base)[feature_names]
+    plan = get_expansion_plan(
+        proxy_vector.get("target", "mhlth_crudeprev"),
+        proxy_vector.get("use_social", True),
+    )
+    return pd.Series(expand_features_array(proxy_vector), index=list(plan.feature_names))
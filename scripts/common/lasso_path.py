@@ -0,0 +1,134 @@
+"""
+CityMind - Lasso Path
+---------------------
+Camino de regularización Lasso con validación cruzada compartido por la
+selección de variables (02_feature_selection*) y el entrenamiento
+(scripts/common/training.py).
+
+- Una sola pasada por los datos: por cada fold se acumulan X_kᵀX_k, X_kᵀy_k
+  y las sumas. La Gram centrada de cada fold de entrenamiento es el total
+  menos su bloque, así que no se vuelve a multiplicar el dataset por fold.
+- Los folds son los de LassoCV(cv=k) (KFold sin barajar) y la rejilla de
+  alphas la misma, calculada con la Gram completa.
+- Cada camino se recorre con warm start (lasso_path); el reajuste final con
+  el mejor alpha arranca de la media de los coeficientes de los folds.
+- LassoPathCV es un LassoCV (mismos parámetros, atributos y predict) que usa
+  este cálculo cuando cv es un entero; en otro caso delega en LassoCV.
+"""
+
+import numpy as np
+from sklearn.linear_model import LassoCV, lasso_path
+from sklearn.utils import check_X_y
+
+# ======================================================
+#  CAMINO CON FOLDS Y GRAM COMPARTIDOS
+# ======================================================
+def fold_indices(n_samples, cv):
+    """Folds contiguos de KFold(n_splits=cv) sin barajar."""
+    return np.array_split(np.arange(n_samples), cv)
+
+
+def _centered_system(S, sx, sxy, sy, n):
+    """Gram y Xy centrados a partir de sumas (XᵀX, ΣX, Xᵀy, Σy) de n filas."""
+    mean_x, mean_y = sx / n, sy / n
+    gram = S - n * np.outer(mean_x, mean_x)
+    xy = sxy - n * mean_x * mean_y
+    return np.ascontiguousarray(gram), xy, mean_x, mean_y
+
+
+def lasso_cv_path(X, y, cv=5, n_alphas=100, alphas=None, eps=1e-3, max_iter=1000, tol=1e-4):
+    """
+    Camino Lasso con CV por k folds. Devuelve alphas, mse_path (n_alphas × cv),
+    el mejor alpha y el ajuste final (coef, intercept, n_iter, dual_gap).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64).ravel()
+    n_samples = len(y)
+    folds = fold_indices(n_samples, cv)
+
+    # 1️⃣ Una pasada: bloques por fold y totales
+    blocks = [(X[idx].T @ X[idx], X[idx].sum(axis=0), X[idx].T @ y[idx], y[idx].sum()) for idx in folds]
+    S, sx, sxy, sy = (sum(parts) for parts in zip(*blocks))
+
+    # 2️⃣ Rejilla de alphas (la de LassoCV, sobre los datos completos centrados)
+    gram, xy, mean_x, mean_y = _centered_system(S, sx, sxy, sy, n_samples)
+    if alphas is None:
+        alpha_max = np.abs(xy).max() / n_samples
+        alphas = np.geomspace(alpha_max, alpha_max * eps, num=n_alphas)
+    alphas = np.sort(np.asarray(alphas, dtype=np.float64))[::-1]
+
+    # 3️⃣ Camino de cada fold con su Gram (total - bloque del fold)
+    mse_path = np.empty((len(alphas), cv))
+    fold_coefs = []
+    for k, idx in enumerate(folds):
+        train = np.ones(n_samples, dtype=bool)
+        train[idx] = False
+        n_train = n_samples - len(idx)
+        S_k, sx_k, sxy_k, sy_k = blocks[k]
+        gram_k, xy_k, mean_xk, mean_yk = _centered_system(S - S_k, sx - sx_k, sxy - sxy_k, sy - sy_k, n_train)
+
+        # X solo aporta la forma: el descenso por coordenadas usa la Gram
+        _, coefs, _ = lasso_path(
+            X[train], y[train] - mean_yk, alphas=alphas, precompute=gram_k, Xy=xy_k,
+            max_iter=max_iter, tol=tol, check_input=False,
+        )
+        residuals = (y[idx] - mean_yk)[:, None] - (X[idx] - mean_xk) @ coefs
+        mse_path[:, k] = (residuals ** 2).mean(axis=0)
+        fold_coefs.append(coefs)
+
+    best = int(np.argmin(mse_path.mean(axis=1)))
+
+    # 4️⃣ Reajuste con todos los datos, warm start desde la media de los folds
+    coef_init = np.mean([coefs[:, best] for coefs in fold_coefs], axis=0)
+    _, coefs, dual_gaps, n_iters = lasso_path(
+        X, y - mean_y, alphas=alphas[best:best + 1], precompute=gram, Xy=xy,
+        coef_init=np.asfortranarray(coef_init), max_iter=max_iter, tol=tol,
+        check_input=False, return_n_iter=True,
+    )
+    coef = coefs[:, 0]
+    return {
+        "alphas": alphas,
+        "mse_path": mse_path,
+        "alpha": alphas[best],
+        "coef": coef,
+        "intercept": mean_y - mean_x @ coef,
+        "n_iter": int(n_iters[0]),
+        "dual_gap": float(dual_gaps[0]),
+    }
+
+
+# ======================================================
+#  ESTIMADOR
+# ======================================================
+class LassoPathCV(LassoCV):
+    """LassoCV sobre lasso_cv_path() (mismos parámetros y atributos ajustados)."""
+
+    def fit(self, X, y, sample_weight=None, **params):
+        if (sample_weight is not None or params or not self.fit_intercept
+                or not isinstance(self.cv, (int, type(None))) or self.positive):
+            return super().fit(X, y, sample_weight=sample_weight, **params)
+
+        # alphas: entero (scikit-learn ≥ 1.7), array o None + n_alphas (versiones anteriores)
+        n_alphas, alphas = getattr(self, "n_alphas", None), self.alphas
+        if isinstance(alphas, (int, np.integer)):
+            n_alphas, alphas = int(alphas), None
+        elif alphas is None and not isinstance(n_alphas, (int, np.integer)):
+            n_alphas = 100
+
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        X, y = check_X_y(X, y, dtype=np.float64, y_numeric=True)
+        self.n_features_in_ = X.shape[1]
+
+        path = lasso_cv_path(
+            X, y, cv=self.cv or 5, n_alphas=n_alphas, alphas=alphas,
+            eps=self.eps, max_iter=self.max_iter, tol=self.tol,
+        )
+        self.alphas_ = path["alphas"]
+        self.mse_path_ = path["mse_path"]
+        self.alpha_ = path["alpha"]
+        self.coef_ = path["coef"]
+        self.intercept_ = path["intercept"]
+        self.n_iter_ = path["n_iter"]
+        self.dual_gap_ = path["dual_gap"]
+        return self
@@ -0,0 +1,434 @@
+"""
+CityMind - Training Engine
+--------------------------
+Entrenamiento de la rejilla completa (escenario × target × modelo) como
+funciones importables (usadas por scripts/common/04_train_models.py y por los
+scripts 04 de cada escenario).
+
+- Cada ajuste es una tarea independiente en un pool de procesos.
+- Presupuesto de núcleos: workers × hilos por ajuste ≤ núcleos disponibles.
+  Los n_jobs de RandomForest/XGBoost y los hilos BLAS/OpenMP de cada worker
+  se limitan a su parte, sin sobresuscripción.
+- Las tareas más pesadas (XGBoost, RandomForest) se lanzan primero.
+- LassoCV con el camino de regularización compartido con la selección de
+  variables (scripts/common/lasso_path.py).
+- Caché por contenido (scripts/common/training_cache.py): los ajustes cuyos
+  datos, estimador e hiperparámetros no han cambiado no se repiten.
+- XGBoost con tree_method="hist" y parada temprana sobre una partición de
+  validación interna (VALID_SIZE del train): el nº de árboles lo decide la
+  validación y el modelo servido es más corto.
+- Cada fila de métricas registra fit_seconds, best_iteration (XGBoost) y
+  predict_us_per_row, para elegir modelo por precisión y por coste.
+- PCA solo como variante opt-in (PCA → LassoCV / XGBoost). El nº de
+  componentes de model_metrics.csv se calcula una vez por dataset a partir
+  del espectro de la covarianza y se guarda en la caché.
+- Mismas salidas que los scripts anteriores: model_metrics.csv por escenario
+  y los modelos XGBoost en models/, cada uno con su .trees.npz (formato de
+  inferencia de la API, scripts/common/tree_arrays.py).
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+from xgboost import XGBRegressor
+
+from scripts.common.dataset_io import read_dataset, resolve_dataset
+from scripts.common.lasso_path import LassoPathCV
+from scripts.common.training_cache import fit_key, frame_digest
+from scripts.common.tree_arrays import export_model
+
+logger = logging.getLogger("citymind_monitor")
+
+# ======================================================
+#  CONFIGURACIÓN
+# ======================================================
+SCENARIOS = {
+    "no_social": {
+        "label": "No Social",
+        "data_dir": Path("data/processed/no_social"),
+        "out_dir": Path("data/interim/no_social"),
+    },
+    "full_social": {
+        "label": "Full Social",
+        "data_dir": Path("data/processed/full_social"),
+        "out_dir": Path("data/interim/full_social"),
+    },
+}
+
+TARGETS = ["depression_crudeprev", "mhlth_crudeprev"]
+MODELS_DIR = Path("models")
+
+# Columnas no numéricas que no entran en el modelo
+COLS_ID = ["stateabbr", "statedesc", "countyname", "countyfips"]
+METRIC_COLUMNS = [
+    "target", "model", "r2", "rmse", "mae", "pca_components",
+    "fit_seconds", "best_iteration", "predict_us_per_row",
+]
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+VALID_SIZE = 0.1  # fracción del train reservada para la parada temprana
+PCA_VARIANCE = 0.95
+
+# Subir si cambia la forma de ajustar o evaluar (invalida la caché de entrenamiento)
+CACHE_VERSION = 3
+
+LASSO_PARAMS = {"cv": 5, "random_state": RANDOM_STATE, "max_iter": 10000}
+# n_estimators es el techo; early_stopping_rounds corta cuando la validación no mejora
+XGB_PARAMS = {
+    "n_estimators": 1000,
+    "early_stopping_rounds": 50,
+    "tree_method": "hist",
+    "learning_rate": 0.05,
+    "max_depth": 5,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "random_state": RANDOM_STATE,
+}
+
+# Orden de las filas en model_metrics.csv; "cost" ordena el lanzamiento.
+# "pca": variante StandardScaler → PCA → estimador sobre las features crudas.
+# "early_stopping": el ajuste recibe eval_set con la partición de validación.
+MODEL_SPECS = {
+    "LassoCV": {
+        "estimator": LassoPathCV,
+        "params": LASSO_PARAMS,
+        "scaled": True,
+        "threaded": False,
+        "cost": 1,
+    },
+    "RandomForest": {
+        "estimator": RandomForestRegressor,
+        "params": {"n_estimators": 300, "random_state": RANDOM_STATE},
+        "scaled": False,
+        "threaded": True,
+        "cost": 3,
+    },
+    "XGBoost": {
+        "estimator": XGBRegressor,
+        "params": XGB_PARAMS,
+        "scaled": False,
+        "threaded": True,
+        "cost": 2,
+        "save": True,
+        "early_stopping": True,
+    },
+    "PCA+LassoCV": {
+        "estimator": LassoPathCV,
+        "params": LASSO_PARAMS,
+        "scaled": False,
+        "threaded": False,
+        "cost": 1,
+        "pca": True,
+    },
+    "PCA+XGBoost": {
+        "estimator": XGBRegressor,
+        "params": XGB_PARAMS,
+        "scaled": False,
+        "threaded": True,
+        "cost": 2,
+        "save": True,
+        "early_stopping": True,
+        "pca": True,
+    },
+}
+RAW_MODELS = [name for name, spec in MODEL_SPECS.items() if not spec.get("pca")]
+PCA_MODELS = [name for name, spec in MODEL_SPECS.items() if spec.get("pca")]
+
+
+def model_data_path(scenario, target):
+    return SCENARIOS[scenario]["data_dir"] / f"model_data_{target}.csv"
+
+
+def model_artifact_path(scenario, target, model_name="XGBoost"):
+    """models/xgboost[_pca]_{escenario}_{depression|mhlth}.joblib"""
+    short = target.replace("_crudeprev", "")
+    prefix = "xgboost_pca" if MODEL_SPECS[model_name].get("pca") else "xgboost"
+    return MODELS_DIR / f"{prefix}_{scenario}_{short}.joblib"
+
+
+# ======================================================
+#  PRESUPUESTO DE NÚCLEOS
+# ======================================================
+def plan_budget(n_tasks, cores=None):
+    """
+    Reparte los núcleos entre procesos y hilos: (workers, hilos por ajuste).
+    Con menos tareas que núcleos, cada ajuste recibe varios hilos.
+    """
+    cores = max(1, cores or os.cpu_count() or 1)
+    workers = max(1, min(n_tasks, cores))
+    return workers, max(1, cores // workers)
+
+
+def _limit_threads(threads):
+    """Inicializador de cada worker: BLAS/OpenMP limitados a su presupuesto."""
+    threadpool_limits(threads)
+
+
+# ======================================================
+#  AJUSTE DE UN MODELO
+# ======================================================
+def evaluate_model(name, y_true, y_pred):
+    return {
+        "model": name,
+        "r2": round(r2_score(y_true, y_pred), 4),
+        "rmse": round(float(np.sqrt(mean_squared_error(y_true, y_pred))), 4),
+        "mae": round(mean_absolute_error(y_true, y_pred), 4)
+    }
+
+
+def load_frame(scenario, target):
+    """Features (sin columnas identificadoras) y target del dataset de modelado."""
+    df = read_dataset(model_data_path(scenario, target))
+    X = df.drop(columns=[c for c in [target] + COLS_ID if c in df.columns])
+    return X, df[target]
+
+
+def load_split(scenario, target):
+    """Train/test del dataset de modelado, crudo y escalado."""
+    X, y = load_frame(scenario, target)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE
+    )
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    return {
+        "X_train": X_train, "X_test": X_test,
+        "X_train_scaled": X_train_scaled, "X_test_scaled": X_test_scaled,
+        "y_train": y_train, "y_test": y_test,
+    }
+
+
+def explained_components(X_scaled, variance=PCA_VARIANCE):
+    """
+    Nº de componentes que retendría PCA(n_components=variance), a partir de
+    los autovalores de la covarianza (p × p) sin ajustar ni transformar nada.
+    """
+    X_centered = X_scaled - X_scaled.mean(axis=0)
+    eigvals = np.linalg.eigvalsh(X_centered.T @ X_centered)[::-1].clip(min=0)
+    ratio = np.cumsum(eigvals) / eigvals.sum()
+    n_components = int(np.searchsorted(ratio, variance, side="right")) + 1
+    return min(n_components, *X_scaled.shape)
+
+
+def build_model(model_name, threads=1):
+    """Estimador sin ajustar de la rejilla (variantes PCA como pipeline completo)."""
+    spec = MODEL_SPECS[model_name]
+    params = dict(spec["params"])
+    if spec["threaded"]:
+        params["n_jobs"] = threads
+
+    model = spec["estimator"](**params)
+    if spec.get("pca"):
+        model = make_pipeline(
+            StandardScaler(), PCA(n_components=PCA_VARIANCE, random_state=RANDOM_STATE), model
+        )
+    return model
+
+
+def fit_early_stopping(model, X_train, y_train):
+    """
+    Ajuste con parada temprana: se reserva VALID_SIZE del train como eval_set.
+    En las variantes PCA el preprocesado se ajusta solo con la parte de
+    ajuste y la validación se transforma con él.
+    """
+    X_fit, X_valid, y_fit, y_valid = train_test_split(
+        X_train, y_train, test_size=VALID_SIZE, random_state=RANDOM_STATE
+    )
+    estimator = model
+    if isinstance(model, Pipeline):
+        preprocess, estimator = model[:-1].fit(X_fit), model[-1]
+        X_fit, X_valid = preprocess.transform(X_fit), preprocess.transform(X_valid)
+    estimator.fit(X_fit, y_fit, eval_set=[(X_valid, y_valid)], verbose=False)
+    return model
+
+
+def fit_task(scenario, target, model_name, threads=1):
+    """
+    Ajusta un modelo de la rejilla y devuelve (escenario, métricas, modelo).
+    El modelo solo se devuelve si hay que guardarlo (evita serializar los RF).
+    """
+    spec = MODEL_SPECS[model_name]
+    split = load_split(scenario, target)
+    model = build_model(model_name, threads)
+    suffix = "_scaled" if spec["scaled"] else ""
+
+    start = time.perf_counter()
+    if spec.get("early_stopping"):
+        fit_early_stopping(model, split["X_train" + suffix], split["y_train"])
+    else:
+        model.fit(split["X_train" + suffix], split["y_train"])
+    fit_seconds = time.perf_counter() - start
+
+    X_test = split["X_test" + suffix]
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    estimator = model[-1] if isinstance(model, Pipeline) else model
+    metrics = evaluate_model(model_name, split["y_test"], y_pred)
+    metrics["target"] = target
+    metrics["fit_seconds"] = round(fit_seconds, 3)
+    metrics["best_iteration"] = getattr(estimator, "best_iteration", None)
+    metrics["predict_us_per_row"] = round(predict_seconds / len(X_test) * 1e6, 2)
+    return scenario, metrics, model if spec.get("save") else None
+
+
+# ======================================================
+#  REJILLA COMPLETA
+# ======================================================
+def build_grid(scenarios, targets=TARGETS, models=RAW_MODELS):
+    """Tareas (escenario, target, modelo) con datos disponibles, las más caras primero."""
+    grid = []
+    for scenario in scenarios:
+        for target in targets:
+            path = model_data_path(scenario, target)
+            if not resolve_dataset(path).exists():
+                logger.warning(f"Dataset no encontrado: {path}")
+                continue
+            grid += [(scenario, target, name) for name in models]
+    return sorted(grid, key=lambda task: -MODEL_SPECS[task[2]]["cost"])
+
+
+def task_key(task, data_digest):
+    """Clave de caché de una tarea (n_jobs no cambia el resultado y no entra)."""
+    scenario, target, model_name = task
+    spec = MODEL_SPECS[model_name]
+    return fit_key(
+        data_digest, spec["estimator"], spec["params"],
+        target=target, scaled=spec["scaled"], pca=spec.get("pca", False) and PCA_VARIANCE,
+        test_size=TEST_SIZE, random_state=RANDOM_STATE, cache_version=CACHE_VERSION,
+    )
+
+
+def component_count(pair, cache=None, data_digest=None):
+    """
+    Nº de componentes PCA del dataset. Solo se pide con las variantes PCA
+    activas; se calcula una vez por dataset y se guarda en la caché.
+    """
+    key = None
+    if cache is not None:
+        key = fit_key(data_digest, PCA, {"n_components": PCA_VARIANCE},
+                      test_size=TEST_SIZE, random_state=RANDOM_STATE, cache_version=CACHE_VERSION)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit[0]["pca_components"]
+
+    n_components = explained_components(load_split(*pair)["X_train_scaled"])
+    if cache is not None:
+        cache.put(key, {"pca_components": n_components})
+    return n_components
+
+
+def save_served_model(model, scenario, target, model_name):
+    """Guarda el modelo en models/ (donde lo busca la API) y exporta sus árboles."""
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    path = model_artifact_path(scenario, target, model_name)
+    joblib.dump(model, path)
+    export_model(model, path)
+
+
+def publish_model(model_path, scenario, target, model_name):
+    """Copia el modelo de la caché a models/ y exporta sus árboles."""
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    path = model_artifact_path(scenario, target, model_name)
+    shutil.copyfile(model_path, path)
+    export_model(joblib.load(path), path)
+
+
+def train_grid(scenarios, cores=None, tracker=None, cache=None, pca=False):
+    """
+    Entrena la rejilla en un pool de procesos, guarda métricas y modelos y
+    devuelve {escenario: DataFrame de métricas}. Con `cache` (TrainingCache)
+    solo se ajustan las tareas cuya clave no está en caché; con `pca` se
+    añaden las variantes PCA → LassoCV / XGBoost.
+    """
+    grid = build_grid(scenarios, models=RAW_MODELS + (PCA_MODELS if pca else []))
+    results = {scenario: [] for scenario in scenarios}
+
+    pairs = list(dict.fromkeys(task[:2] for task in grid))
+    digests = {pair: frame_digest(*load_frame(*pair)) for pair in pairs} if cache is not None else {}
+    # pca_components solo con las variantes PCA: sin --pca no cuesta nada (columna vacía)
+    components = {pair: component_count(pair, cache, digests.get(pair)) for pair in pairs} if pca else {}
+
+    keys, pending = {}, []
+    if cache is not None:
+        for task in grid:
+            keys[task] = task_key(task, digests[task[:2]])
+            hit = cache.get(keys[task])
+            if hit is None or (MODEL_SPECS[task[2]].get("save") and hit[1] is None):
+                pending.append(task)
+                continue
+            metrics, model_path = hit
+            results[task[0]].append(metrics)
+            if model_path is not None:
+                publish_model(model_path, *task)
+        print(f"♻️  {len(grid) - len(pending)} ajustes desde caché, {len(pending)} por entrenar")
+    else:
+        pending = grid
+
+    if pending:
+        workers, threads = plan_budget(len(pending), cores)
+        print(f"⚙️  {len(pending)} ajustes en {workers} procesos × {threads} hilos")
+
+        # spawn: los workers no heredan el estado OpenMP del proceso padre
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context,
+                                 initializer=_limit_threads, initargs=(threads,)) as pool:
+            futures = {pool.submit(fit_task, *task, threads): task for task in pending}
+            for future in as_completed(futures):
+                task = futures[future]
+                scenario, target, model_name = task
+                scenario, metrics, model = future.result()
+                results[scenario].append(metrics)
+                print(f"✅ {SCENARIOS[scenario]['label']} | {target} | {model_name}: R²={metrics['r2']}")
+
+                if cache is not None:
+                    entry = cache.put(keys[task], metrics, model)
+                    if model is not None:
+                        publish_model(entry / "model.joblib", *task)
+                elif model is not None:
+                    save_served_model(model, *task)
+                if tracker is not None:
+                    tracker.log_metrics(model_name, scenario, metrics, params={"target": target})
+
+    if cache is not None:
+        evicted = cache.evict()
+        if evicted:
+            logger.info(f"Caché de entrenamiento: {len(evicted)} entradas expulsadas")
+
+    for scenario, rows in results.items():
+        for row in rows:
+            row["pca_components"] = components.get((scenario, row["target"]))
+    return {scenario: save_metrics(scenario, rows) for scenario, rows in results.items() if rows}
+
+
+def save_metrics(scenario, rows):
+    """model_metrics.csv del escenario, en el orden target → modelo de siempre."""
+    df = pd.DataFrame(rows).reindex(columns=METRIC_COLUMNS)
+    df["target"] = pd.Categorical(df["target"], TARGETS)
+    df["model"] = pd.Categorical(df["model"], list(MODEL_SPECS))
+    df = df.sort_values(["target", "model"]).astype({"target": str, "model": str, "best_iteration": "Int64"})
+
+    out_dir = SCENARIOS[scenario]["out_dir"]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / "model_metrics.csv"
+    df.to_csv(out_path, index=False)
+    logger.info(f"Métricas guardadas en {out_path}")
+    return df
@@ -0,0 +1,123 @@
+"""
+CityMind - Training Cache
+-------------------------
+Caché direccionada por contenido de los ajustes de la rejilla de
+entrenamiento (scripts/common/training.py).
+
+- Clave: SHA-256 de los datos usados (X e y), la lista de features, el
+  estimador (clase + hiperparámetros), la semilla y las versiones de las
+  librerías. Cualquier cambio en ellos produce una clave nueva.
+- Entrada: metrics.json y, si el modelo se publica en models/, model.joblib.
+- Un acierto evita el ajuste; una re-ejecución sin cambios termina en segundos.
+- Expulsión por antigüedad (último uso) y por tamaño total (LRU).
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost
+
+# =========================================================
+# 🧩 Configuración
+# =========================================================
+CACHE_DIR = Path("data/cache/training")
+MAX_BYTES = 2 * 1024 ** 3
+MAX_AGE_SECONDS = 30 * 24 * 3600
+
+LIBRARY_VERSIONS = {
+    "python": platform.python_version(),
+    "numpy": np.__version__,
+    "pandas": pd.__version__,
+    "sklearn": sklearn.__version__,
+    "xgboost": xgboost.__version__,
+}
+
+
+def frame_digest(X, y):
+    """Huella del contenido de X e y (valores, columnas y orden de filas)."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([list(map(str, X.columns)), str(y.name)]).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fit_key(data_digest, estimator, params, **extra):
+    """Clave de un ajuste: datos + estimador + hiperparámetros + versiones."""
+    payload = {
+        "data": data_digest,
+        "estimator": f"{estimator.__module__}.{estimator.__qualname__}",
+        "params": params,
+        "versions": LIBRARY_VERSIONS,
+        **extra,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+# =========================================================
+# 🧠 Caché
+# =========================================================
+class TrainingCache:
+    """Métricas y modelos ajustados indexados por fit_key()."""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES, max_age=MAX_AGE_SECONDS):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    # -----------------------------------------------------
+    #  API pública
+    # -----------------------------------------------------
+    def get(self, key):
+        """(métricas, ruta del modelo o None) si el ajuste está en caché; si no, None."""
+        entry = self.root / key
+        try:
+            metrics = json.loads((entry / "metrics.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        os.utime(entry)  # último uso, para la expulsión LRU
+        model_path = entry / "model.joblib"
+        return metrics, model_path if model_path.exists() else None
+
+    def put(self, key, metrics, model=None):
+        """Guarda un ajuste. Se escribe en un directorio temporal y se renombra (atómico)."""
+        entry = self.root / key
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        tmp.mkdir(parents=True, exist_ok=True)
+        if model is not None:
+            joblib.dump(model, tmp / "model.joblib")
+        # metrics.json al final: su presencia marca la entrada como completa
+        (tmp / "metrics.json").write_text(json.dumps(metrics, default=float), encoding="utf-8")
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        return entry
+
+    def evict(self):
+        """Borra las entradas caducadas y, si se supera max_bytes, las menos usadas."""
+        if not self.root.exists():
+            return []
+        now = time.time()
+        entries = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append((entry.stat().st_mtime, size, entry))
+
+        removed = []
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, entry in sorted(entries, key=lambda e: e[0]):
+            if now - mtime > self.max_age or total > self.max_bytes:
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                removed.append(entry.name)
+        return removed
@@ -0,0 +1,213 @@
+"""
+CityMind - Tree Arrays
+----------------------
+Formato de inferencia ligero para los modelos XGBoost servidos por la API:
+los árboles del booster exportados a arrays NumPy planos (.trees.npz junto
+al .joblib) y un evaluador que no necesita xgboost ni el wrapper de sklearn.
+
+- Exportación (entrenamiento): se leen los árboles del JSON del booster
+  hasta best_iteration (los mismos que usa predict tras la parada temprana).
+- Cada árbol se rellena hasta un árbol binario completo de profundidad D
+  (las hojas poco profundas se replican hacia abajo), así que todos los
+  árboles se recorren a la vez, nivel a nivel, con D operaciones vectoriales.
+- Misma regla que XGBoost: izquierda si x < umbral (en float32) y los NaN
+  siguen la dirección por defecto del nodo.
+- El .npz guarda el SHA-256 del .joblib del que sale: si no coincide, el
+  registro de modelos ignora el .npz y carga el .joblib.
+- Coste: ~4 operaciones NumPy por nivel, independientes del número de filas.
+  Gana a XGBoost en pocas filas (una fila: ~25 µs frente a ~350 µs) y pierde
+  en lotes (~15 µs/fila frente a ~4 µs/fila): por encima de SMALL_BATCH_ROWS
+  la API predice con el booster del .joblib.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+# ======================================================
+#  CONFIGURACIÓN
+# ======================================================
+TREES_SUFFIX = ".trees.npz"
+MAX_DEPTH = 16        # por encima, el árbol completo ocuparía demasiado
+BATCH_ROWS = 256      # filas por bloque en predict (la matriz filas × árboles cabe en caché)
+SMALL_BATCH_ROWS = 16  # hasta aquí TreeEnsemble es más rápido que el booster (cruce en ~32 filas)
+
+
+def trees_path(model_path):
+    """models/xgboost_x_y.joblib → models/xgboost_x_y.trees.npz"""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.stem + TREES_SUFFIX)
+
+
+def _file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ======================================================
+#  EXPORTACIÓN (requiere xgboost, solo en entrenamiento)
+# ======================================================
+def _tree_depth(tree, node=0):
+    left = tree["left_children"][node]
+    if left == -1:
+        return 0
+    return 1 + max(_tree_depth(tree, left), _tree_depth(tree, tree["right_children"][node]))
+
+
+def booster_arrays(model):
+    """Arrays planos (árboles completos de profundidad D) de un XGBRegressor ajustado."""
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    gbtree = learner["gradient_booster"]["model"]
+
+    # Solo los árboles que usa predict (hasta best_iteration con parada temprana)
+    n_rounds = booster.num_boosted_rounds()
+    best = getattr(model, "best_iteration", None)
+    if best is not None:
+        n_rounds = min(n_rounds, best + 1)
+    trees = gbtree["trees"][: int(gbtree["iteration_indptr"][n_rounds])]
+
+    depth = max([_tree_depth(tree) for tree in trees] + [0])
+    if depth > MAX_DEPTH:
+        raise ValueError(f"Profundidad {depth} > {MAX_DEPTH}: no se exporta a arrays")
+
+    # Árbol completo en orden de montículo: hijos de pos en 2·pos+1 y 2·pos+2;
+    # las hojas ocupan el último nivel (value solo tiene sentido ahí)
+    n_nodes = 2 ** (depth + 1) - 1
+    feature = np.zeros((len(trees), n_nodes), dtype=np.int32)
+    threshold = np.full((len(trees), n_nodes), np.inf, dtype=np.float32)
+    default_left = np.ones((len(trees), n_nodes), dtype=bool)
+    value = np.zeros((len(trees), n_nodes), dtype=np.float32)
+
+    def fill(t, tree, node, pos, level):
+        left = tree["left_children"][node]
+        if level == depth:
+            value[t, pos] = tree["split_conditions"][node]  # valor de la hoja
+            return
+        if left == -1:
+            # Hoja a media altura: nodo de paso, la hoja se replica en ambos lados
+            fill(t, tree, node, 2 * pos + 1, level + 1)
+            fill(t, tree, node, 2 * pos + 2, level + 1)
+            return
+        feature[t, pos] = tree["split_indices"][node]
+        threshold[t, pos] = tree["split_conditions"][node]
+        default_left[t, pos] = bool(tree["default_left"][node])
+        fill(t, tree, left, 2 * pos + 1, level + 1)
+        fill(t, tree, tree["right_children"][node], 2 * pos + 2, level + 1)
+
+    for t, tree in enumerate(trees):
+        fill(t, tree, 0, 0, 0)
+
+    # base_score: "1.5E1" (xgboost 2.x) o "[1.5E1]" (xgboost 3.x)
+    base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+    feature_names = getattr(model, "feature_names_in_", None)
+    return {
+        "feature": feature,
+        "threshold": threshold,
+        "default_left": default_left,
+        "value": value,
+        "base_score": np.float64(base_score),
+        "n_features": np.int64(learner["learner_model_param"]["num_feature"]),
+        "feature_names": np.asarray([] if feature_names is None else feature_names, dtype=str),
+    }
+
+
+def export_model(model, model_path):
+    """
+    Escribe el .trees.npz de un modelo servido ya guardado en model_path.
+    Devuelve la ruta, o None si el modelo no es un XGBRegressor exportable.
+    """
+    if not hasattr(model, "get_booster"):
+        return None
+    try:
+        arrays = booster_arrays(model)
+    except ValueError:
+        return None
+
+    out = trees_path(model_path)
+    tmp = out.with_name(out.name + ".tmp.npz")
+    np.savez(tmp, source_sha256=np.asarray(_file_sha256(model_path)), **arrays)
+    tmp.replace(out)
+    return out
+
+
+# ======================================================
+#  INFERENCIA (solo NumPy)
+# ======================================================
+class TreeEnsemble:
+    """Evaluador de los arrays exportados, con el mismo predict(X) que el XGBRegressor."""
+
+    def __init__(self, arrays):
+        self.base_score = float(arrays["base_score"])
+        self.n_features_in_ = int(arrays["n_features"])
+        self.feature_names_in_ = arrays["feature_names"] if len(arrays["feature_names"]) else None
+        self.source_sha256 = str(arrays.get("source_sha256", ""))
+
+        n_trees, n_nodes = arrays["feature"].shape
+        self.n_trees = n_trees
+        self.depth = int(np.log2(n_nodes + 1)) - 1
+        # Índices planos: nodo (t, pos) → t · n_nodes + pos. El hijo de un
+        # nodo plano i es _left[i] = 2·i + 1 - t · n_nodes (+1 si va a la
+        # derecha), precalculado para ahorrar dos operaciones por nivel
+        self._feature = arrays["feature"].ravel().astype(np.intp)
+        self._threshold = arrays["threshold"].ravel()
+        self._default_right = ~arrays["default_left"].ravel()
+        self._value = arrays["value"].ravel()
+        self._root = np.arange(n_trees, dtype=np.intp) * n_nodes
+        flat = np.arange(n_trees * n_nodes, dtype=np.intp)
+        self._left = 2 * flat + 1 - np.repeat(self._root, n_nodes)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Se esperaban {self.n_features_in_} features y se recibieron {X.shape[1]}"
+            )
+        if len(X) == 1:
+            return np.array([self._predict_row(X[0])])
+        return np.concatenate([
+            self._predict_block(X[start:start + BATCH_ROWS])
+            for start in range(0, len(X), BATCH_ROWS)
+        ] or [np.empty(0)])
+
+    # --------------------------------------------------
+    #  Internos
+    # --------------------------------------------------
+    def _predict_row(self, x):
+        """Una fila: todos los árboles a la vez, un paso por nivel."""
+        node = self._root
+        if not np.isnan(x).any():
+            for _ in range(self.depth):
+                node = self._left[node] + (x[self._feature[node]] >= self._threshold[node])
+            return float(self._value[node].sum(dtype=np.float64)) + self.base_score
+
+        for _ in range(self.depth):
+            value = x[self._feature[node]]
+            right = np.where(np.isnan(value), self._default_right[node], value >= self._threshold[node])
+            node = self._left[node] + right
+        return float(self._value[node].sum(dtype=np.float64)) + self.base_score
+
+    def _predict_block(self, X):
+        """Bloque de filas: matriz (filas × árboles) de nodos."""
+        rows = np.arange(len(X))[:, None]
+        has_nan = np.isnan(X).any()
+        node = np.broadcast_to(self._root, (len(X), self.n_trees))
+        for _ in range(self.depth):
+            value = X[rows, self._feature[node]]
+            right = value >= self._threshold[node]
+            if has_nan:
+                right = np.where(np.isnan(value), self._default_right[node], right)
+            node = self._left[node] + right
+        return self._value[node].sum(axis=1, dtype=np.float64) + self.base_score
@@ -0,0 +1,316 @@
+"""
+CityMind - Wrangling Engine
+---------------------------
+Lógica de limpieza e imputación de CDC PLACES como funciones importables
+(usadas por 01_wrangling_final.py y por el benchmark de scripts/benchmarks).
+
+- Medianas estatales de todas las columnas sociales en una sola agregación
+  agrupada y un único fillna alineado por fila (sin lambdas por estado).
+- Medias nacionales aplicadas en un único fillna con todas las columnas.
+- Sin copias intermedias del dataset completo: solo se materializan los
+  datasets que se guardan.
+- Modo streaming para ficheros crudos mayores que la memoria (county, place
+  o tract): lectura por bloques de solo las columnas necesarias con tipos
+  compactos y medianas estatales con un histograma mergeable en dos pasadas.
+"""
+
+import numpy as np
+import pandas as pd
+
+# ======================================================
+#  CONFIGURACIÓN
+# ======================================================
+COLS_META = [
+    "stateabbr", "statedesc", "countyname", "countyfips",
+    "totalpopulation", "totalpop18plus"
+]
+
+COLS_SOCIAL = [
+    "foodinsecu_crudeprev", "foodstamp_crudeprev", "housinsecu_crudeprev",
+    "emotionspt_crudeprev", "isolation_crudeprev",
+    "lacktrpt_crudeprev", "shututility_crudeprev"
+]
+
+# Nulos médicos críticos: las filas sin ellos se descartan
+COLS_MED = ["highchol_crudeprev", "cholscreen_crudeprev", "bphigh_crudeprev", "bpmed_crudeprev"]
+
+STATE_COL = "stateabbr"
+
+
+# ======================================================
+#  PASOS
+# ======================================================
+def normalize_columns(df):
+    """Nombres en minúsculas con "_" y FIPS de condado como texto de 5 dígitos (in situ)."""
+    df.columns = (
+        df.columns.str.strip()
+        .str.lower()
+        .str.replace(" ", "_")
+        .str.replace("-", "_")
+    )
+    if "countyfips" in df.columns:
+        df["countyfips"] = df["countyfips"].astype(str).str.zfill(5)
+    return df
+
+
+def crude_columns(df):
+    """Columnas de prevalencia bruta (crude prevalence)."""
+    return [c for c in df.columns if c.endswith("crudeprev")]
+
+
+def state_median_fill(df, cols, by=STATE_COL):
+    """
+    Valores con los que rellenar `cols`: mediana de cada estado, calculada en una
+    sola agregación agrupada y alineada fila a fila. Las filas sin estado quedan en NaN.
+    """
+    return df.groupby(by, sort=False)[cols].transform("median")
+
+
+def wrangle(df):
+    """
+    Ejecuta la limpieza completa sobre el dataset crudo (columnas ya normalizadas).
+    Devuelve {"no_social_clean", "imputed_clean", "imputed_full"}.
+    """
+    cols_crude = crude_columns(df)
+    clean = df[COLS_META + cols_crude]  # única copia del dataset crudo
+    cols_social = [c for c in COLS_SOCIAL if c in clean.columns]
+
+    # Imputación social (mediana estatal) sobre la propia copia `clean`
+    if cols_social:
+        clean[cols_social] = clean[cols_social].fillna(state_median_fill(clean, cols_social))
+
+    # Sin nulos médicos críticos: un único filtrado de filas
+    imputed_clean = clean[clean[COLS_MED].notna().all(axis=1)]
+
+    # Sin sociales: la imputación solo toca las columnas que aquí se eliminan
+    no_social_clean = imputed_clean.drop(columns=cols_social)
+
+    # Imputación completa (media nacional) en un solo fillna
+    cols_fill = [c for c in cols_crude if c not in COLS_META]
+    imputed_full = imputed_clean.fillna(imputed_clean[cols_fill].mean())
+
+    return {
+        "no_social_clean": no_social_clean,
+        "imputed_clean": imputed_clean,
+        "imputed_full": imputed_full,
+    }
+
+
+def target_first(df, target):
+    """Mismo dataset con el target como primera columna."""
+    return df[[target] + [c for c in df.columns if c != target]]
+
+
+# ======================================================
+#  MODO STREAMING (ficheros crudos mayores que la memoria)
+# ======================================================
+STREAM_CHUNK_SIZE = 200_000
+CATEGORY_COLS = ["stateabbr", "statedesc"]
+POPULATION_COLS = ["totalpopulation", "totalpop18plus"]
+
+
+def normalize_name(name):
+    """Mismo criterio que normalize_columns para un único nombre de columna."""
+    return name.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def raw_schema(path):
+    """
+    Lee solo la cabecera del fichero crudo y devuelve (usecols, dtype, rename):
+    columnas meta + crudeprev con tipos compactos (float32, categorías de estado).
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols, dtype, rename = [], {}, {}
+    for original in header:
+        name = normalize_name(original)
+        if name not in COLS_META and not name.endswith("crudeprev"):
+            continue
+        usecols.append(original)
+        rename[original] = name
+        if name.endswith("crudeprev"):
+            dtype[original] = "float32"
+        elif name in CATEGORY_COLS:
+            dtype[original] = "category"
+        elif name in POPULATION_COLS:
+            dtype[original] = "float64"  # admite separador de miles y nulos en cualquier bloque
+        else:
+            dtype[original] = str
+    return usecols, dtype, rename
+
+
+def read_raw_chunks(path, chunksize=STREAM_CHUNK_SIZE):
+    """Itera el fichero crudo por bloques con columnas ya proyectadas, renombradas y tipadas."""
+    usecols, dtype, rename = raw_schema(path)
+    reader = pd.read_csv(path, usecols=usecols, dtype=dtype, thousands=",", chunksize=chunksize)
+    for chunk in reader:
+        chunk = chunk.rename(columns=rename)
+        if "countyfips" in chunk.columns:
+            chunk["countyfips"] = chunk["countyfips"].str.zfill(5)
+        yield chunk
+
+
+class HistogramSketch:
+    """
+    Histograma de rejilla fija (por grupo y columna) para medianas y cuantiles
+    de prevalencias en %. Es mergeable: los conteos de varios bloques (o
+    procesos) se suman. Exacto para valores con `resolution` decimales
+    (PLACES publica un decimal); en otro caso el error es < resolution / 2.
+    """
+
+    def __init__(self, n_cols, lo=0.0, hi=100.0, resolution=0.1):
+        self.lo = lo
+        self.resolution = resolution
+        self.n_bins = int(round((hi - lo) / resolution)) + 1
+        self.counts = np.zeros((0, n_cols, self.n_bins), dtype=np.int64)
+
+    def update(self, codes, values):
+        """Añade un bloque: codes (n,) con el grupo de cada fila (-1 = sin grupo), values (n, n_cols)."""
+        n_groups = codes.max() + 1 if len(codes) else 0
+        if n_groups > len(self.counts):
+            grow = np.zeros((n_groups - len(self.counts),) + self.counts.shape[1:], dtype=np.int64)
+            self.counts = np.concatenate([self.counts, grow])
+
+        n_groups = len(self.counts)
+        for j in range(values.shape[1]):
+            column = values[:, j]
+            valid = (codes >= 0) & ~np.isnan(column)
+            bins = np.rint((column[valid] - self.lo) / self.resolution).astype(np.int64)
+            bins = np.clip(bins, 0, self.n_bins - 1)
+            flat = codes[valid] * self.n_bins + bins
+            self.counts[:, j, :] += np.bincount(flat, minlength=n_groups * self.n_bins).reshape(n_groups, self.n_bins)
+
+    def merge(self, other):
+        """Suma los conteos de otro sketch con la misma rejilla."""
+        if len(other.counts) > len(self.counts):
+            self.counts, other_counts = other.counts.copy(), self.counts
+        else:
+            other_counts = other.counts
+        self.counts[: len(other_counts)] += other_counts
+        return self
+
+    def quantile(self, q=0.5):
+        """Cuantil por (grupo, columna) con interpolación lineal (como pandas); NaN sin datos."""
+        cumulative = self.counts.cumsum(axis=-1)
+        total = cumulative[..., -1]
+        position = q * (total - 1)
+        low_rank, high_rank = np.floor(position), np.ceil(position)
+
+        def value_at(rank):
+            index = (cumulative > rank[..., None]).argmax(axis=-1)
+            return self.lo + index * self.resolution
+
+        low, high = value_at(low_rank), value_at(high_rank)
+        result = low + (high - low) * (position - low_rank)
+        return np.where(total > 0, result, np.nan)
+
+
+class StateCodes:
+    """Códigos enteros estables por estado entre bloques (orden de aparición)."""
+
+    def __init__(self):
+        self.categories = []
+        self._index = {}
+
+    def encode(self, states):
+        for state in pd.unique(states.dropna()):
+            if state not in self._index:
+                self._index[state] = len(self.categories)
+                self.categories.append(state)
+        return pd.Categorical(states, categories=self.categories).codes.astype(np.int64)
+
+
+def scan_raw(path, chunksize=STREAM_CHUNK_SIZE):
+    """
+    Primera pasada: medianas estatales de las columnas sociales (sketch) y
+    medias nacionales de las filas que sobreviven al filtro médico, sin
+    guardar más que un bloque en memoria. Devuelve un dict con el estado
+    necesario para la segunda pasada.
+    """
+    codes = StateCodes()
+    categories = {col: set() for col in CATEGORY_COLS}
+    sketch = None
+    sums = counts = missing_by_state = None
+    columns = None
+
+    for chunk in read_raw_chunks(path, chunksize):
+        if columns is None:
+            columns = [c for c in COLS_META if c in chunk.columns] + crude_columns(chunk)
+            cols_social = [c for c in COLS_SOCIAL if c in chunk.columns]
+            cols_fill = [c for c in crude_columns(chunk) if c not in COLS_META]
+            sketch = HistogramSketch(len(cols_social))
+            sums = np.zeros(len(cols_fill))
+            counts = np.zeros(len(cols_fill), dtype=np.int64)
+            missing_by_state = np.zeros((0, len(cols_social)), dtype=np.int64)
+
+        for col in CATEGORY_COLS:
+            if col in chunk.columns:
+                categories[col].update(chunk[col].dropna().unique())
+
+        state_codes = codes.encode(chunk[STATE_COL].astype(object))
+        social = chunk[cols_social].to_numpy(dtype=np.float64)
+        sketch.update(state_codes, social)
+
+        # Medias sobre las filas con datos médicos completos (valores sin imputar)
+        keep = chunk[COLS_MED].notna().all(axis=1).to_numpy()
+        values = chunk.loc[keep, cols_fill].to_numpy(dtype=np.float64)
+        sums += np.nansum(values, axis=0)
+        counts += (~np.isnan(values)).sum(axis=0)
+
+        # Huecos sociales por estado en esas filas (se rellenarán con la mediana)
+        kept_codes = state_codes[keep]
+        gaps = np.isnan(social[keep]) & (kept_codes >= 0)[:, None]
+        if len(codes.categories) > len(missing_by_state):
+            grow = np.zeros((len(codes.categories) - len(missing_by_state), len(cols_social)), dtype=np.int64)
+            missing_by_state = np.concatenate([missing_by_state, grow])
+        for j in range(len(cols_social)):
+            missing_by_state[:, j] += np.bincount(kept_codes[gaps[:, j]], minlength=len(missing_by_state))
+
+    if columns is None:
+        raise ValueError(f"El fichero crudo está vacío: {path}")
+
+    # Medias finales: los huecos sociales cuentan con la mediana de su estado
+    medians = sketch.quantile(0.5)
+    social_index = [cols_fill.index(c) for c in cols_social]
+    filled = np.where(np.isnan(medians), 0, missing_by_state)
+    sums[social_index] += (filled * np.nan_to_num(medians)).sum(axis=0)
+    counts[social_index] += filled.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+    return {
+        "columns": columns,
+        "cols_social": cols_social,
+        "codes": codes,
+        "medians": medians,
+        "means": pd.Series(means, index=cols_fill),
+        "dtypes": {col: pd.CategoricalDtype(sorted(values)) for col, values in categories.items() if values},
+    }
+
+
+def wrangle_stream(path, chunksize=STREAM_CHUNK_SIZE):
+    """
+    Versión en streaming de wrangle(): dos pasadas sobre el fichero crudo y
+    un generador de dicts {"no_social_clean", "imputed_clean", "imputed_full"}
+    por bloque (tipos idénticos en todos los bloques, listos para DatasetWriter).
+    """
+    stats = scan_raw(path, chunksize)
+    cols_social = stats["cols_social"]
+    # Fila extra de NaN para las filas sin estado (código -1)
+    medians = np.vstack([stats["medians"], np.full(len(cols_social), np.nan)])
+
+    for chunk in read_raw_chunks(path, chunksize):
+        clean = chunk[stats["columns"]]
+        for col, dtype in stats["dtypes"].items():
+            clean[col] = clean[col].astype(object).astype(dtype)
+
+        if cols_social:
+            state_codes = stats["codes"].encode(clean[STATE_COL].astype(object))
+            fill = pd.DataFrame(medians[state_codes], index=clean.index, columns=cols_social)
+            clean[cols_social] = clean[cols_social].fillna(fill.astype(np.float32))
+
+        imputed_clean = clean[clean[COLS_MED].notna().all(axis=1)]
+        yield {
+            "no_social_clean": imputed_clean.drop(columns=cols_social),
+            "imputed_clean": imputed_clean,
+            "imputed_full": imputed_clean.fillna(stats["means"].astype(np.float32)),
+        }
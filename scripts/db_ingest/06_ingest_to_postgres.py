@@ -8,9 +8,13 @@ Se ejecuta como parte del pipeline Snakemake:
     python scripts/db_ingest/06_ingest_to_postgres.py
 """
 
+import hashlib
+import io
+import json
 import os
 import sys
 import django
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import logging
@@ -25,23 +29,27 @@ sys.path.append(str(BASE_DIR))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "citymind.settings")
 django.setup()
 
-from core.models import PlaceRecord, ModelMetrics, ComparisonSummary, Prediction
+from django.db import connection, transaction
+from django.utils import timezone
+from core.models import PlaceRecord, ModelMetrics, ComparisonSummary, Prediction, IngestionLedger, model_family
+from dashboard.summary import invalidate_home_summary
+from scripts.common.dataset_io import dataset_columns, read_dataset, source_file
 
 
 # ======================================================
 #  CONFIGURACIÓN DE LOGGING
 # ======================================================
 LOG_PATH = "logs/db_ingest.log"
-os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
 
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-)
-logging.info("===== INICIO DE INGESTA A POSTGRESQL =====")
 
-print("🚀 Iniciando ingesta a PostgreSQL mediante Django ORM...")
+def configure_logging():
+    """Log de la ingesta en LOG_PATH (al ejecutarse como script; importarlo no toca logs/)"""
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    logging.basicConfig(
+        filename=LOG_PATH,
+        level=logging.INFO,
+        format="%(asctime)s | %(levelname)s | %(message)s",
+    )
 
 
 # ======================================================
@@ -60,6 +68,24 @@ def clean_number(value):
         return None
 
 
+def clean_number_series(series):
+    """
+    Versión vectorizada de clean_number para una columna completa, con sus
+    mismas reglas: el texto debe ser un entero (admite comas y espacios, no
+    "12.7" ni "1e3") y los números se truncan; None en otro caso.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        numbers = np.trunc(series.astype("float64"))
+    else:
+        is_text = series.map(lambda value: isinstance(value, str))
+        text = series.where(is_text, "").astype(str).str.replace(",", "", regex=False).str.strip()
+        from_text = pd.to_numeric(text.where(text.str.fullmatch(r"[+-]?\d+")), errors="coerce")
+        from_numbers = np.trunc(pd.to_numeric(series.where(~is_text), errors="coerce"))
+        numbers = from_text.where(is_text, from_numbers)
+    numbers = numbers.astype("Int64")
+    return numbers.astype(object).where(numbers.notna(), None)
+
+
 def detect_dataset_type(path: str) -> str:
     """Detecta si el dataset es No Social o Full Social a partir de la ruta"""
     path_lower = path.lower()
@@ -71,62 +97,254 @@ def detect_dataset_type(path: str) -> str:
         return "no_social"  # fallback por defecto
 
 
-def ingest_place_records(path="data/processed/final_places.csv"):
-    """Carga los registros base de condados"""
-    if not os.path.exists(path):
-        logging.warning(f"No se encontró {path}, omitiendo PlaceRecord.")
-        return
-    df = pd.read_csv(path)
-    logging.info(f"Iniciando carga de {len(df)} registros de PlaceRecord.")
+# ======================================================
+#  LEDGER DE INGESTA (HUELLAS DE FICHERO Y DE FILA)
+# ======================================================
 
-    for _, row in df.iterrows():
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash SHA-256 del contenido de un fichero (lectura por bloques)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def row_hashes(df):
+    """
+    Huella de cada fila (hash del contenido, sin índice). Las filas idénticas
+    se distinguen por su número de aparición para no colapsarlas en una.
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).map("{:016x}".format)
+    occurrence = hashes.groupby(hashes).cumcount().astype(str)
+    return (hashes + ":" + occurrence).tolist()
+
+
+def get_ledger(path, model):
+    """Entrada del ledger para (fichero, tabla) o None si nunca se ingirió"""
+    return IngestionLedger.objects.filter(source=path, table=model._meta.db_table).first()
+
+
+def is_unchanged(path, model):
+    """
+    Devuelve (sha256, ledger, sin_cambios). Si el fichero tiene el mismo hash
+    que en la última ingesta no hay nada que hacer.
+    """
+    sha256 = file_sha256(path)
+    ledger = get_ledger(path, model)
+    unchanged = ledger is not None and ledger.file_sha256 == sha256
+    if unchanged:
+        logging.info(f"{path} sin cambios desde la última ingesta en {model._meta.db_table}, omitiendo.")
+    return sha256, ledger, unchanged
+
+
+def record_ledger(path, model, sha256, row_count, hashes=None, rows_digest="", rejected_rows=0):
+    """Guarda la huella del fichero (y el mapa hash de fila → id) tras una ingesta correcta"""
+    IngestionLedger.objects.update_or_create(
+        source=path,
+        table=model._meta.db_table,
+        defaults={"file_sha256": sha256, "row_count": row_count, "row_hashes": hashes or {},
+                  "rows_digest": rows_digest, "rejected_rows": rejected_rows},
+    )
+    # La portada cacheada deja de ser válida en cuanto se confirma la carga
+    transaction.on_commit(invalidate_home_summary)
+
+
+def sync_rows(path, model, df, build, sha256, ledger):
+    """
+    Aplica solo las diferencias entre el fichero y la última ingesta:
+    inserta las filas nuevas, borra las que desaparecieron y deja intactas
+    las que no cambiaron. Debe llamarse dentro de transaction.atomic().
+    """
+    hashes = row_hashes(df)
+    previous = ledger.row_hashes if ledger else {}
+    current = set(hashes)
+
+    # Filas que ya no están en el fichero (modificadas o eliminadas)
+    gone = [pk for h, pk in previous.items() if h not in current]
+    if gone:
+        model.objects.filter(id__in=gone).delete()
+
+    kept = {h: previous[h] for h in hashes if h in previous}
+    new_hashes, objs = [], []
+    for h, row in zip(hashes, df.to_dict(orient="records")):
+        if h in previous:
+            continue
         try:
-            PlaceRecord.objects.update_or_create(
-                fips=row["countyfips"],
-                defaults={
-                    "name": row.get("countyname", ""),
-                    "state": row.get("statedesc", ""),
-                    "population": clean_number(row.get("totalpopulation")),
-                    "latitude": None,
-                    "longitude": None,
-                    "year": datetime.now().year,
-                },
-            )
+            objs.append(build(row))
+            new_hashes.append(h)
         except Exception as e:
-            logging.error(f"Error insertando PlaceRecord {row.get('countyfips')}: {e}")
+            logging.error(f"Error preparando fila de {path} para {model._meta.db_table}: {e}")
+
+    created = model.objects.bulk_create(objs, batch_size=BULK_BATCH_SIZE)
+    kept.update(zip(new_hashes, (obj.pk for obj in created)))
+    record_ledger(path, model, sha256, len(df), kept)
+
+    logging.info(
+        f"{path} → {model._meta.db_table}: {len(created)} nuevas, "
+        f"{len(gone)} eliminadas, {len(kept) - len(created)} sin cambios."
+    )
+
+
+# ======================================================
+#  CARGA MASIVA DE PLACE RECORDS
+# ======================================================
+PLACE_FIELDS = ["fips", "name", "state", "population", "latitude", "longitude", "year"]
+# Columnas del dataset final que necesita PlaceRecord (lectura selectiva)
+PLACE_SOURCE_COLUMNS = ["countyfips", "countyname", "statedesc", "totalpopulation"]
+BULK_BATCH_SIZE = 2000
+
+
+def build_place_frame(df):
+    """Construye de forma vectorizada las columnas de PlaceRecord (un registro por FIPS)"""
+    df = df[df["countyfips"].notna()]
+    n = len(df)
+    places = pd.DataFrame({
+        # Misma clave que al leer el CSV como entero ("1001"), aunque Parquet conserve "01001"
+        "fips": normalize_fips(df["countyfips"].astype(str)),
+        # astype(object): el wrangling en streaming guarda los estados como categoría
+        "name": df["countyname"].astype(object).fillna("").astype(str) if "countyname" in df else [""] * n,
+        "state": df["statedesc"].astype(object).fillna("").astype(str) if "statedesc" in df else [""] * n,
+        "population": clean_number_series(df["totalpopulation"]) if "totalpopulation" in df else [None] * n,
+        "latitude": [None] * n,
+        "longitude": [None] * n,
+        "year": [datetime.now().year] * n,
+    })
+    # Igual que update_or_create fila a fila: si un FIPS se repite, gana la última fila
+    return places.drop_duplicates(subset="fips", keep="last").reset_index(drop=True)
+
+
+def upsert_places_bulk_create(places):
+    """Upsert portable: bulk_create(update_conflicts=True) por lotes"""
+    objs = [PlaceRecord(**record) for record in places.to_dict(orient="records")]
+    PlaceRecord.objects.bulk_create(
+        objs,
+        batch_size=BULK_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["fips"],
+        update_fields=[f for f in PLACE_FIELDS if f != "fips"] + ["updated_at"],
+    )
+
+
+def copy_frame(cursor, table, frame, force_not_null=()):
+    """COPY ... FROM STDIN (formato CSV) de un DataFrame a una tabla de PostgreSQL"""
+    buffer = io.StringIO()
+    frame.to_csv(buffer, header=False, index=False)
+    buffer.seek(0)
+
+    options = "FORMAT csv"
+    if force_not_null:
+        options += f", FORCE_NOT_NULL ({', '.join(force_not_null)})"
+    copy_sql = f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN WITH ({options})"
+
+    raw_cursor = cursor.cursor
+    if hasattr(raw_cursor, "copy_expert"):  # psycopg2
+        raw_cursor.copy_expert(copy_sql, buffer)
+    else:  # psycopg 3
+        with raw_cursor.copy(copy_sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def upsert_places_copy(places):
+    """Upsert en PostgreSQL: COPY a una tabla temporal + INSERT ... ON CONFLICT"""
+    table = PlaceRecord._meta.db_table
+    columns = ", ".join(PLACE_FIELDS)
+    updates = ", ".join(f"{f} = EXCLUDED.{f}" for f in PLACE_FIELDS if f != "fips")
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE {table}_staging ("
+            "fips varchar(10), name varchar(100), state varchar(50), population integer, "
+            "latitude double precision, longitude double precision, year integer"
+            ") ON COMMIT DROP"
+        )
+        copy_frame(cursor, f"{table}_staging", places[PLACE_FIELDS], force_not_null=("fips", "name", "state"))
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}, created_at, updated_at) "
+            f"SELECT {columns}, now(), now() FROM {table}_staging "
+            f"ON CONFLICT (fips) DO UPDATE SET {updates}, updated_at = EXCLUDED.updated_at"
+        )
+        # ON COMMIT DROP no basta si se llama dos veces en la misma transacción
+        cursor.execute(f"DROP TABLE {table}_staging")
+
+
+def upsert_places(places):
+    """Upsert de PlaceRecord por FIPS: COPY en PostgreSQL, bulk_create en otros motores"""
+    if connection.vendor == "postgresql":
+        upsert_places_copy(places)
+    else:
+        upsert_places_bulk_create(places)
+
+
+def ingest_place_records(path="data/processed/final_places.csv"):
+    """Carga (upsert masivo) los registros base de condados"""
+    # final_places es una vista: el ledger se lleva sobre el fichero con los datos
+    source = str(source_file(path))
+    if not os.path.exists(source):
+        logging.warning(f"No se encontró {source}, omitiendo PlaceRecord.")
+        return
+    sha256, _, unchanged = is_unchanged(source, PlaceRecord)
+    if unchanged:
+        return
+    columns = [c for c in PLACE_SOURCE_COLUMNS if c in dataset_columns(path)]
+    df = read_dataset(path, columns=columns)
+    places = build_place_frame(df)
+    logging.info(f"Iniciando carga de {len(places)} registros de PlaceRecord ({connection.vendor}).")
+
+    try:
+        with transaction.atomic():
+            upsert_places(places)
+            record_ledger(source, PlaceRecord, sha256, len(places))
+    except Exception as e:
+        logging.error(f"Error en la carga masiva de PlaceRecord: {e}")
+        raise
 
     logging.info("Carga de PlaceRecord completada ✅")
 
 
-def ingest_model_metrics():
-    """Carga las métricas de modelos entrenados"""
-    paths = [
-        "data/interim/no_social/model_metrics.csv",
-        "data/interim/full_social/model_metrics.csv",
-    ]
+METRICS_PATHS = [
+    "data/interim/no_social/model_metrics.csv",
+    "data/interim/full_social/model_metrics.csv",
+]
+
 
+def ingest_model_metrics(paths=METRICS_PATHS):
+    """Carga las métricas de modelos entrenados"""
     for p in paths:
         if not os.path.exists(p):
             logging.warning(f"No se encontró {p}, omitiendo ModelMetrics.")
             continue
 
+        sha256, ledger, unchanged = is_unchanged(p, ModelMetrics)
+        if unchanged:
+            continue
+
         dataset_type = detect_dataset_type(p)
         df = pd.read_csv(p)
         df.columns = [c.strip().lower() for c in df.columns]
         logging.info(f"Iniciando carga de {len(df)} métricas desde {p} ({dataset_type}).")
 
-        for _, row in df.iterrows():
-            try:
-                ModelMetrics.objects.create(
-                    model_name=row.get("model") or row.get("model_name") or "unknown_model",
-                    target=row.get("target", "unknown"),
-                    dataset_type=dataset_type,  # 👈 nuevo campo
-                    r2_score=row.get("r2") or row.get("r2_score") or 0,
-                    mae=row.get("mae", 0),
-                    rmse=row.get("rmse", 0),
-                )
-            except Exception as e:
-                logging.error(f"Error insertando métrica desde {p}: {e}")
+        def build(row, dataset_type=dataset_type):
+            model_name = row.get("model") or row.get("model_name") or "unknown_model"
+            return ModelMetrics(
+                model_name=model_name,
+                model_family=model_family(model_name),  # bulk_create no llama a save()
+                target=row.get("target", "unknown"),
+                dataset_type=dataset_type,  # 👈 nuevo campo
+                r2_score=row.get("r2") or row.get("r2_score") or 0,
+                mae=row.get("mae", 0),
+                rmse=row.get("rmse", 0),
+                # Columnas de coste (ausentes en métricas anteriores → NULL)
+                fit_seconds=None if pd.isna(row.get("fit_seconds")) else row["fit_seconds"],
+                best_iteration=clean_number(row.get("best_iteration")),
+                predict_us_per_row=None if pd.isna(row.get("predict_us_per_row")) else row["predict_us_per_row"],
+            )
+
+        try:
+            with transaction.atomic():
+                sync_rows(p, ModelMetrics, df, build, sha256, ledger)
+        except Exception as e:
+            logging.error(f"Error insertando métricas desde {p}: {e}")
 
     logging.info("Carga de ModelMetrics completada ✅")
 
@@ -137,62 +355,244 @@ def ingest_comparison_summary(path="data/interim/comparison/comparison_summary.c
         logging.warning(f"No se encontró {path}, omitiendo ComparisonSummary.")
         return
 
+    sha256, ledger, unchanged = is_unchanged(path, ComparisonSummary)
+    if unchanged:
+        return
+
     dataset_type = detect_dataset_type(path)
     df = pd.read_csv(path)
     df.columns = [c.strip().lower() for c in df.columns]
     logging.info(f"Iniciando carga de {len(df)} resúmenes de comparación ({dataset_type}).")
 
-    for _, row in df.iterrows():
-        try:
-            ComparisonSummary.objects.create(
-                target=row.get("target", "unknown"),
-                dataset_type=dataset_type,  # 👈 nuevo campo
-                best_model=row.get("best_model", "unknown"),
-                best_r2=row.get("best_r2") or row.get("r2") or 0,
-                best_mae=row.get("best_mae") or row.get("mae") or 0,
-                best_rmse=row.get("best_rmse") or row.get("rmse") or 0,
-            )
-        except Exception as e:
-            logging.error(f"Error insertando resumen de comparación: {e}")
+    def build(row):
+        return ComparisonSummary(
+            target=row.get("target", "unknown"),
+            dataset_type=dataset_type,  # 👈 nuevo campo
+            best_model=row.get("best_model", "unknown"),
+            best_r2=row.get("best_r2") or row.get("r2") or 0,
+            best_mae=row.get("best_mae") or row.get("mae") or 0,
+            best_rmse=row.get("best_rmse") or row.get("rmse") or 0,
+        )
+
+    try:
+        with transaction.atomic():
+            sync_rows(path, ComparisonSummary, df, build, sha256, ledger)
+    except Exception as e:
+        logging.error(f"Error insertando resúmenes de comparación: {e}")
 
     logging.info("Carga de ComparisonSummary completada ✅")
 
 
-def ingest_predictions(path="data/interim/predictions.csv"):
-    """Carga predicciones generadas por los modelos"""
+# ======================================================
+#  CARGA POR BLOQUES DE PREDICCIONES
+# ======================================================
+PREDICTION_CHUNK_SIZE = 50000
+
+
+def normalize_fips(series):
+    """Normaliza FIPS a texto sin ceros a la izquierda (como quedan al leer el CSV como entero)"""
+    text = series.astype(str).str.strip()
+    numeric = text.str.fullmatch(r"\d+")
+    stripped = text.str.lstrip("0").replace("", "0")
+    return text.where(~numeric, stripped)
+
+
+def load_place_ids():
+    """Diccionario FIPS → id de PlaceRecord con una única consulta"""
+    pairs = list(PlaceRecord.objects.values_list("fips", "id"))
+    if not pairs:
+        return {}
+    fips, ids = zip(*pairs)
+    return dict(zip(normalize_fips(pd.Series(fips)), ids))
+
+
+def insert_predictions(rows):
+    """Inserta un bloque de predicciones: COPY en PostgreSQL, bulk_create en otros motores"""
+    if connection.vendor == "postgresql":
+        now = timezone.now().isoformat()  # texto ya formateado: evita formatear fila a fila
+        frame = rows.assign(
+            # Valor vacío → NaN (como Prediction.objects.create); en CSV vacío sería NULL
+            predicted_value=rows["predicted_value"].map(repr),
+            # Igual que JSONField al guardar el valor recibido (texto del CSV)
+            input_vector=rows["input_vector"].map(json.dumps),
+            prediction_date=now,
+            created_at=now,
+            updated_at=now,
+        )
+        with connection.cursor() as cursor:
+            copy_frame(cursor, Prediction._meta.db_table, frame, force_not_null=("model_used", "target"))
+        return
+
+    Prediction.objects.bulk_create(
+        [
+            Prediction(place_id=pid, model_used=mu, target=tg, predicted_value=pv, input_vector=iv)
+            for pid, mu, tg, pv, iv in rows.itertuples(index=False, name=None)
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+
+
+def parse_predicted_values(chunk):
+    """
+    (valores, no_numéricos): predicted_value como float (NaN si está vacío) y
+    máscara de los valores presentes que no son números, que se rechazan.
+    """
+    if "predicted_value" not in chunk:
+        return pd.Series(np.nan, index=chunk.index), pd.Series(False, index=chunk.index)
+    raw = chunk["predicted_value"]
+    values = pd.to_numeric(raw, errors="coerce")
+    return values, values.isna() & raw.notna() & (raw.str.strip() != "")
+
+
+def trim_rejects(rejects_path, rows):
+    """
+    Deja en el fichero de rechazos solo sus `rows` primeras filas: las de los
+    bloques confirmados. Las de un bloque que no llegó a confirmarse se
+    vuelven a escribir al reanudar.
+    """
+    if not os.path.exists(rejects_path):
+        if rows:
+            logging.warning(f"No se encontró {rejects_path}: faltan {rows} rechazos de la ingesta anterior.")
+        return
+    rejects = pd.read_csv(rejects_path, dtype=str, keep_default_na=False)
+    if len(rejects) > rows:
+        rejects.iloc[:rows].to_csv(rejects_path, index=False)
+
+
+def ingest_predictions(path="data/interim/predictions.csv",
+                       rejects_path="data/interim/predictions_rejected.csv",
+                       chunksize=PREDICTION_CHUNK_SIZE):
+    """
+    Carga predicciones por bloques (memoria acotada) con una inserción masiva por bloque.
+
+    El fichero se trata como un registro de solo-añadir: cada bloque se inserta
+    en la misma transacción que actualiza el ledger (filas confirmadas y huella
+    de esas filas). Una nueva ejecución, tras añadir filas o tras un fallo a
+    mitad de carga, comprueba que las filas ya confirmadas no han cambiado y
+    solo inserta las siguientes. Si el fichero se reescribió (las primeras
+    filas ya no coinciden) se aborta sin insertar nada para no duplicar.
+
+    Las filas con FIPS desconocido o predicted_value no numérico se copian a
+    rejects_path antes de confirmar su bloque; el ledger guarda cuántas
+    corresponden a bloques confirmados y al reanudar se descartan las demás.
+    """
     if not os.path.exists(path):
         logging.warning(f"No se encontró {path}, omitiendo Predicciones.")
         return
 
-    df = pd.read_csv(path)
-    logging.info(f"Iniciando carga de {len(df)} predicciones.")
-    for _, row in df.iterrows():
+    sha256, ledger, unchanged = is_unchanged(path, Prediction)
+    if unchanged:
+        return
+    if ledger is not None and not ledger.rows_digest:
+        raise ValueError(
+            f"{path}: el ledger de {Prediction._meta.db_table} no tiene huella de filas "
+            "(ingesta anterior a la carga incremental); bórralo para recargar el fichero completo."
+        )
+    committed = ledger.row_count if ledger is not None else 0
+    rejected = ledger.rejected_rows if ledger is not None else 0
+
+    place_ids = load_place_ids()
+    logging.info(
+        f"Iniciando carga de predicciones por bloques de {chunksize} "
+        f"({len(place_ids)} FIPS conocidos, {committed} filas ya cargadas)."
+    )
+
+    if committed == 0 and os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    elif committed:
+        trim_rejects(rejects_path, rejected)
+
+    # Todo como texto: la huella de cada fila no depende de cómo se trocea el fichero
+    digest = hashlib.sha256()
+    offset, loaded = 0, 0
+    reader = pd.read_csv(path, chunksize=chunksize, dtype=str)
+    for i, chunk in enumerate(reader):
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+        # Filas ya confirmadas en una ejecución anterior: solo se verifican
+        skip = min(max(committed - offset, 0), len(chunk))
+        if skip:
+            digest.update(hashes[:skip].tobytes())
+            offset += skip
+            if offset == committed and digest.hexdigest() != ledger.rows_digest:
+                raise ValueError(
+                    f"{path}: las primeras {committed} filas ya cargadas han cambiado; "
+                    "el fichero no es una ampliación de la ingesta anterior."
+                )
+            chunk, hashes = chunk.iloc[skip:], hashes[skip:]
+            if chunk.empty:
+                continue
+
+        place_id = normalize_fips(chunk["fips"]).map(place_ids)
+        values, unparsed = parse_predicted_values(chunk)
+        accepted = place_id.notna() & ~unparsed
+        valid = chunk[accepted]
+        rows = pd.DataFrame({
+            "place_id": place_id[accepted].astype("int64"),
+            "model_used": valid["model_used"].fillna("") if "model_used" in valid else "",
+            "target": valid["target"].fillna("") if "target" in valid else "",
+            "predicted_value": values[accepted],
+            "input_vector": valid["input_vector"].fillna("{}") if "input_vector" in valid else "{}",
+        })
+
+        # FIPS desconocido o valor no numérico → fichero de rechazos (se conserva la
+        # fila original) antes de confirmar el bloque: si falla la confirmación,
+        # trim_rejects las descarta al reanudar
+        if not accepted.all():
+            rejects = chunk[~accepted]
+            rejects.to_csv(rejects_path, mode="a", index=False, header=not os.path.exists(rejects_path))
+            rejected += len(rejects)
+            if unparsed.any():
+                logging.error(f"Bloque {i}: {int(unparsed.sum())} filas con predicted_value no numérico.")
+
+        digest.update(hashes.tobytes())
+        offset += len(chunk)
         try:
-            place = PlaceRecord.objects.get(fips=row["fips"])
-            Prediction.objects.create(
-                place=place,
-                model_used=row.get("model_used", ""),
-                target=row.get("target", ""),
-                predicted_value=row.get("predicted_value", None),
-                input_vector=row.get("input_vector", "{}"),
-            )
-        except PlaceRecord.DoesNotExist:
-            logging.error(f"No se encontró PlaceRecord con FIPS {row['fips']}, omitiendo predicción.")
+            with transaction.atomic():
+                insert_predictions(rows)
+                # En curso: sin sha256 del fichero, para no darlo por cargado si se interrumpe
+                record_ledger(path, Prediction, "", offset, rows_digest=digest.hexdigest(),
+                              rejected_rows=rejected)
         except Exception as e:
-            logging.error(f"Error insertando predicción: {e}")
+            logging.error(f"Error insertando el bloque {i} de predicciones: {e}")
+            raise
+
+        loaded += len(rows)
+        logging.info(f"Bloque {i}: {len(rows)} predicciones cargadas, {rejected} rechazadas en total.")
+
+    if offset < committed:
+        raise ValueError(f"{path}: tiene {offset} filas, menos que las {committed} ya cargadas.")
 
-    logging.info("Carga de Predicciones completada ✅")
+    record_ledger(path, Prediction, sha256, offset, rows_digest=digest.hexdigest(), rejected_rows=rejected)
+    if rejected:
+        logging.error(f"{rejected} predicciones rechazadas (FIPS desconocido o valor no numérico) "
+                      f"guardadas en {rejects_path}.")
+    logging.info(f"Carga de Predicciones completada ✅ ({loaded} filas nuevas, {offset} en el fichero)")
+
+
+def refresh_table_stats():
+    """ANALYZE de las tablas que la portada cuenta por estimación (core/counts.py)"""
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {Prediction._meta.db_table}, {PlaceRecord._meta.db_table}")
+    invalidate_home_summary()
+    logging.info("Estadísticas de prediction y place_record actualizadas.")
 
 
 # ======================================================
 #  PIPELINE PRINCIPAL
 # ======================================================
 if __name__ == "__main__":
+    configure_logging()
+    logging.info("===== INICIO DE INGESTA A POSTGRESQL =====")
+    print("🚀 Iniciando ingesta a PostgreSQL mediante Django ORM...")
     try:
         ingest_place_records()
         ingest_model_metrics()
         ingest_comparison_summary()
         ingest_predictions()
+        refresh_table_stats()
         logging.info("===== INGESTA FINALIZADA CON ÉXITO =====")
         print("✅ Ingesta completada correctamente. Ver logs/db_ingest.log para más detalles.")
     except Exception as e:
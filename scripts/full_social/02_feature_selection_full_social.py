@@ -6,9 +6,13 @@
 
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LassoCV
 from pathlib import Path
 import json
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.common.dataset_io import read_dataset, resolve_dataset
+from scripts.common.lasso_path import LassoPathCV
 
 # ======================================================
 # 1️⃣ Configuración general
@@ -19,8 +23,8 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 TARGETS = ["depression_crudeprev", "mhlth_crudeprev"]
 
-print(f"📂 Leyendo dataset limpio desde: {DATA_PATH.resolve()}")
-df = pd.read_csv(DATA_PATH, low_memory=False)
+print(f"📂 Leyendo dataset limpio desde: {resolve_dataset(DATA_PATH).resolve()}")
+df = read_dataset(DATA_PATH)
 
 # 💡 Eliminar posibles columnas duplicadas (por seguridad)
 if df.columns.duplicated().any():
@@ -46,7 +50,7 @@ def select_by_correlation(df, target, threshold=0.3):
     return selected, corr.to_dict()
 
 def select_by_lasso(df, target):
-    """Selecciona variables mediante LassoCV con limpieza de NaN y target 1D asegurado."""
+    """Selecciona variables mediante LassoCV (camino compartido) con limpieza de NaN y target 1D asegurado."""
     # 1️⃣ Eliminar filas con NaN en el target
     df = df.dropna(subset=[target]).copy().reset_index(drop=True)
 
@@ -65,7 +69,7 @@ def select_by_lasso(df, target):
     assert len(X) == len(y), f"Tamaños no coinciden: X={len(X)}, y={len(y)}"
 
     # 5️⃣ Entrenar modelo LassoCV
-    model = LassoCV(cv=5, random_state=42, max_iter=10000)
+    model = LassoPathCV(cv=5, random_state=42, max_iter=10000)
     model.fit(X, y)
 
     coef = pd.Series(model.coef_, index=X.columns)
@@ -3,9 +3,13 @@
 # Genera datasets de modelado a partir de las features seleccionadas por Lasso
 # ======================================================
 
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.common.dataset_io import dataset_columns, resolve_dataset, write_view
+
 # ======================================================
 # 1️⃣ Configuración general
 # ======================================================
@@ -17,12 +21,11 @@ OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 TARGETS = ["depression_crudeprev", "mhlth_crudeprev"]
 
-print(f"📂 Cargando dataset base desde: {DATA_PATH.resolve()}")
-df = pd.read_csv(DATA_PATH, low_memory=False)
-
-# 💡 Eliminar posibles columnas duplicadas
-df = df.loc[:, ~df.columns.duplicated()]
-print(f"✅ Dataset base cargado: {df.shape}")
+# Solo el esquema: los datasets de modelado son vistas del dataset base
+# (places_imputed_full_clean no tiene nulos, no hace falta filtrar el target)
+print(f"📂 Dataset base: {resolve_dataset(DATA_PATH).resolve()}")
+base_columns = list(dict.fromkeys(dataset_columns(DATA_PATH)))
+print(f"✅ Esquema cargado: {len(base_columns)} columnas")
 
 # ======================================================
 # 2️⃣ Generar datasets según features seleccionadas
@@ -40,14 +43,10 @@ for target in TARGETS:
 
     lasso_features = pd.read_csv(lasso_path)["feature"].tolist()
 
-    # Construir dataset final
-    selected_cols = lasso_features + [target]
-    model_df = df[selected_cols].dropna(subset=[target]).reset_index(drop=True)
-    print(f"✅ Dataset para {target}: {model_df.shape[0]} filas, {model_df.shape[1]} columnas")
-
-    # Guardar dataset directamente en full_social/
-    output_path = OUT_DIR / f"model_data_{target}.csv"
-    model_df.to_csv(output_path, index=False)
+    # Vista del dataset base directamente en full_social/
+    selected_cols = [c for c in lasso_features if c in base_columns] + [target]
+    output_path = write_view(OUT_DIR / f"model_data_{target}.csv", DATA_PATH, columns=selected_cols)
+    print(f"✅ Dataset para {target}: {len(selected_cols)} columnas")
     print(f"💾 Guardado: {output_path.name}")
 
 # ======================================================
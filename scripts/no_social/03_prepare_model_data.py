@@ -4,9 +4,13 @@
 # para crear los datasets de modelado finales.
 # ======================================================
 
+import sys
 import pandas as pd
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scripts.common.dataset_io import dataset_columns, read_dataset, resolve_dataset, write_view
+
 # ======================================================
 # 1️⃣ Configuración general
 # ======================================================
@@ -22,17 +26,16 @@ TARGETS = {
 
 BASE_DATA = PROCESSED_DIR / "places_no_social_clean.csv"
 
-print(f"📂 Cargando dataset base: {BASE_DATA.resolve()}")
-df_base = pd.read_csv(BASE_DATA, low_memory=False)
-print("✅ Dataset cargado:", df_base.shape)
-
-# 💡 Eliminar posibles columnas duplicadas
-df_base = df_base.loc[:, ~df_base.columns.duplicated()]
+# Solo el esquema: los datasets de modelado son vistas del dataset base
+print(f"📂 Dataset base: {resolve_dataset(BASE_DATA).resolve()}")
+base_columns = list(dict.fromkeys(dataset_columns(BASE_DATA)))
+n_rows = len(read_dataset(BASE_DATA, columns=base_columns[:1]))
+print("✅ Esquema cargado:", (n_rows, len(base_columns)))
 
 # ======================================================
 # 2️⃣ Función auxiliar
 # ======================================================
-def prepare_dataset(df, target_col, features_file):
+def prepare_dataset(columns, target_col, features_file):
     print(f"\n==============================")
     print(f"🎯 Preparando dataset para: {target_col}")
     print("==============================")
@@ -50,27 +53,24 @@ def prepare_dataset(df, target_col, features_file):
     print(f"📊 Total features seleccionadas: {len(features)}")
 
     # Verificar que existan en el dataset base
-    features_valid = [f for f in features if f in df.columns]
+    features_valid = [f for f in features if f in columns]
     if len(features_valid) == 0:
         raise ValueError(f"❌ Ninguna feature de {features_file} está en el dataset base.")
     print(f"✅ Features válidas en el dataset: {len(features_valid)}")
 
-    # Construir dataset final
-    df_model = df[features_valid + [target_col]]
-
-    # Guardar dataset final
-    out_path = OUT_DIR / f"model_data_{target_col}.csv"
-    df_model.to_csv(out_path, index=False)
-    print(f"💾 Guardado: {out_path.name} ({df_model.shape})")
+    # Vista del dataset base (features + target), sin copiar los datos
+    model_columns = features_valid + [target_col]
+    out_path = write_view(OUT_DIR / f"model_data_{target_col}.csv", BASE_DATA, columns=model_columns)
+    print(f"💾 Guardado: {out_path.name} ({n_rows}, {len(model_columns)})")
 
-    return {"target": target_col, "rows": df_model.shape[0], "cols": df_model.shape[1]}
+    return {"target": target_col, "rows": n_rows, "cols": len(model_columns)}
 
 # ======================================================
 # 3️⃣ Ejecutar para cada target
 # ======================================================
 summary = []
 for target, feat_file in TARGETS.items():
-    info = prepare_dataset(df_base, target, feat_file)
+    info = prepare_dataset(base_columns, target, feat_file)
     summary.append(info)
 
 # ======================================================
@@ -5,13 +5,19 @@ Define fixtures reutilizables para todos los tests:
   - Rutas base del proyecto
   - Carga de datasets limpios (No Social / Full Social)
   - Directorios de trabajo (data, reports)
+  - Raíz del proyecto en sys.path (para importar sus módulos)
 """
 
 import os
+import sys
 import pytest
-import pandas as pd
 from pathlib import Path
 
+# Permite importar los módulos del proyecto (api, scripts.common, ...) desde los tests
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.common.dataset_io import read_dataset, resolve_dataset
+
 # =====================================================
 # 🔧 FIXTURES GLOBALES
 # =====================================================
@@ -28,12 +34,13 @@ def base_dir():
 @pytest.fixture(scope="session")
 def data_paths(base_dir):
     """
-    Devuelve las rutas principales de los datasets procesados.
+    Devuelve las rutas principales de los datasets procesados
+    (Parquet si existe, si no CSV; ver scripts/common/dataset_io.py).
     """
     data_dir = base_dir / "data" / "processed"
     return {
-        "no_social": data_dir / "no_social" / "places_no_social_clean.csv",
-        "full_social": data_dir / "full_social" / "places_imputed_full_clean.csv"
+        "no_social": resolve_dataset(data_dir / "no_social" / "places_no_social_clean"),
+        "full_social": resolve_dataset(data_dir / "full_social" / "places_imputed_full_clean")
     }
 
 
@@ -44,7 +51,7 @@ def no_social_df(data_paths):
     """
     path = data_paths["no_social"]
     assert path.exists(), f"❌ No existe el dataset: {path}"
-    df = pd.read_csv(path)
+    df = read_dataset(path)
     return df
 
 
@@ -55,7 +62,7 @@ def full_social_df(data_paths):
     """
     path = data_paths["full_social"]
     assert path.exists(), f"❌ No existe el dataset: {path}"
-    df = pd.read_csv(path)
+    df = read_dataset(path)
     return df
 
 
@@ -0,0 +1,134 @@
+"""
+tests/test_dataset_io.py - Validaciones de la capa de I/O de datasets CityMind
+------------------------------------------------------------------------------
+Comprueba que los datasets se guardan en Parquet conservando los tipos, que la
+lectura por columnas funciona, que los datasets CSV antiguos se siguen leyendo
+y que las vistas (.view.json) se resuelven contra su dataset origen.
+"""
+
+import pandas as pd
+import pytest
+
+from scripts.common import dataset_io
+from scripts.common.dataset_io import (
+    DatasetWriter,
+    dataset_columns,
+    read_dataset,
+    resolve_dataset,
+    source_file,
+    write_dataset,
+    write_view,
+)
+
+requires_parquet = pytest.mark.skipif(not dataset_io.PARQUET_AVAILABLE, reason="pyarrow no instalado")
+
+
+@pytest.fixture
+def places():
+    return pd.DataFrame({
+        "countyfips": ["01001", "01003"],
+        "countyname": ["Autauga", "Baldwin"],
+        "totalpopulation": [58805, 231767],
+        "mhlth_crudeprev": [15.2, 14.1],
+    })
+
+
+# ---------------------------------------------------------------
+# 1️⃣ Test: Parquet conserva tipos y ceros a la izquierda
+# ---------------------------------------------------------------
+@requires_parquet
+def test_parquet_roundtrip_keeps_dtypes(tmp_path, places):
+    """El FIPS sigue siendo texto y los números no pasan por cadenas"""
+    written = write_dataset(places, tmp_path / "final_places.csv")
+    assert written.suffix == ".parquet"
+    assert not written.with_suffix(".csv").exists()
+
+    df = read_dataset(tmp_path / "final_places.csv")
+    pd.testing.assert_frame_equal(df, places)
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: lectura selectiva de columnas
+# ---------------------------------------------------------------
+def test_column_projection(tmp_path, places):
+    """Solo se devuelven las columnas pedidas (Parquet o CSV)"""
+    write_dataset(places, tmp_path / "final_places")
+    assert dataset_columns(tmp_path / "final_places") == list(places.columns)
+
+    df = read_dataset(tmp_path / "final_places", columns=["countyfips", "mhlth_crudeprev"])
+    assert list(df.columns) == ["countyfips", "mhlth_crudeprev"]
+    assert len(df) == 2
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: compatibilidad con datasets CSV existentes
+# ---------------------------------------------------------------
+def test_csv_fallback_parses_thousands(tmp_path):
+    """Un CSV antiguo se resuelve y "4,902" se lee como número"""
+    path = tmp_path / "model_data.csv"
+    path.write_text('countyfips,totalpopulation\n1001,"4,902"\n')
+
+    assert resolve_dataset(tmp_path / "model_data.parquet") == path
+    df = read_dataset(path)
+    assert df["totalpopulation"].tolist() == [4902]
+
+
+@requires_parquet
+def test_parquet_preferred_over_csv(tmp_path, places):
+    """Si existen ambas versiones se lee la Parquet; csv_export deja la copia en texto"""
+    written = write_dataset(places, tmp_path / "final_places", csv_export=True)
+    assert written.with_suffix(".csv").exists()
+    assert resolve_dataset(tmp_path / "final_places.csv") == written
+
+
+def test_missing_dataset_raises(tmp_path):
+    """Un dataset inexistente lanza FileNotFoundError"""
+    with pytest.raises(FileNotFoundError):
+        read_dataset(tmp_path / "no_existe.csv")
+
+
+# ---------------------------------------------------------------
+# 4️⃣ Test: escritura por bloques
+# ---------------------------------------------------------------
+def test_dataset_writer_appends_chunks(tmp_path, places):
+    """Cada write() añade filas y el resultado equivale a escribir todo de una vez"""
+    with DatasetWriter(tmp_path / "final_places.csv") as writer:
+        writer.write(places.iloc[:1])
+        writer.write(places.iloc[1:])
+    assert writer.rows == 2
+
+    df = read_dataset(tmp_path / "final_places")
+    assert df["countyname"].tolist() == ["Autauga", "Baldwin"]
+    assert df["totalpopulation"].tolist() == [58805, 231767]
+
+
+# ---------------------------------------------------------------
+# 5️⃣ Test: vistas de un dataset canónico
+# ---------------------------------------------------------------
+def test_view_resolves_columns_and_target(tmp_path, places):
+    """La vista lee solo sus columnas del origen, con el target primero"""
+    base = write_dataset(places, tmp_path / "full_social" / "places_imputed_full_clean.csv")
+    stale = write_dataset(places, tmp_path / "full_social" / "model_data_mhlth_crudeprev.csv")
+
+    view = write_view(stale, base, columns=["countyfips", "totalpopulation"], target="mhlth_crudeprev")
+    assert view.name == "model_data_mhlth_crudeprev.view.json"
+    assert not stale.exists()
+    assert resolve_dataset(stale) == view
+    assert source_file(stale) == base
+
+    expected = ["mhlth_crudeprev", "countyfips", "totalpopulation"]
+    assert dataset_columns(stale) == expected
+    df = read_dataset(stale)
+    assert list(df.columns) == expected
+    pd.testing.assert_series_equal(df["countyfips"], places["countyfips"])
+
+
+def test_view_replaced_by_materialized_dataset(tmp_path, places):
+    """Escribir el dataset materializado elimina la vista anterior"""
+    base = write_dataset(places, tmp_path / "base")
+    view = write_view(tmp_path / "final_places.csv", base)
+    assert read_dataset(tmp_path / "final_places").shape == places.shape
+
+    write_dataset(places.iloc[:1], tmp_path / "final_places.csv")
+    assert not view.exists()
+    assert len(read_dataset(tmp_path / "final_places")) == 1
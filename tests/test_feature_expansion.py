@@ -0,0 +1,79 @@
+"""
+tests/test_feature_expansion.py - Validaciones del expansor de features CityMind
+--------------------------------------------------------------------------------
+Comprueba que los planes compilados producen las columnas esperadas por cada
+modelo y que los caminos fila a fila, por lotes y pd.Series coinciden.
+"""
+
+import numpy as np
+import pytest
+
+from scripts.common.feature_expansion import (
+    FEATURE_NAMES_FULL,
+    PROXY_FIELDS,
+    expand_features,
+    expand_features_array,
+    expand_features_batch,
+    get_expansion_plan,
+    proxies_to_matrix,
+)
+
+COMBOS = [
+    ("mhlth_crudeprev", True),
+    ("mhlth_crudeprev", False),
+    ("depression_crudeprev", True),
+    ("depression_crudeprev", False),
+]
+
+
+# ---------------------------------------------------------------
+# 1️⃣ Test: el target nunca aparece entre las features
+# ---------------------------------------------------------------
+@pytest.mark.parametrize("target,use_social", COMBOS)
+def test_target_not_in_features(target, use_social):
+    """El plan elimina el target de la lista de columnas"""
+    plan = get_expansion_plan(target, use_social)
+    assert target not in plan.feature_names
+    if use_social:
+        assert len(plan.feature_names) == len(FEATURE_NAMES_FULL) - 1
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: valores de referencia de la expansión
+# ---------------------------------------------------------------
+def test_expected_values():
+    """Las asignaciones proporcionales siguen las reglas documentadas"""
+    row = expand_features({
+        "target": "depression_crudeprev",
+        "use_social": True,
+        "health_index": 0.5,
+        "economy_index": 0.25,
+        "population": 1000,
+    })
+    assert row["totalpopulation"] == 1000
+    assert row["totalpop18plus"] == pytest.approx(800)
+    assert row["mhlth_crudeprev"] == pytest.approx(15)
+    assert row["foodinsecu_crudeprev"] == pytest.approx(15)
+    assert row["checkup_crudeprev"] == pytest.approx(50 + 0.4 * 30)  # valor por defecto
+    assert row["arthritis_crudeprev"] == 0.0
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: fila, lote y pd.Series coinciden
+# ---------------------------------------------------------------
+@pytest.mark.parametrize("target,use_social", COMBOS)
+def test_batch_matches_single_rows(target, use_social):
+    """expand_features_batch produce las mismas filas que el camino individual"""
+    rng = np.random.default_rng(42)
+    proxies = [
+        {"target": target, "use_social": use_social,
+         **{name: float(v) for name, v in zip(PROXY_FIELDS, rng.random(len(PROXY_FIELDS)))}}
+        for _ in range(50)
+    ]
+    batch = expand_features_batch(proxies_to_matrix(proxies), target, use_social)
+    singles = np.vstack([expand_features_array(p) for p in proxies])
+    series = np.vstack([expand_features(p).to_numpy() for p in proxies])
+
+    assert batch.shape == (50, len(get_expansion_plan(target, use_social).feature_names))
+    np.testing.assert_array_equal(batch, singles)
+    np.testing.assert_array_equal(batch, series)
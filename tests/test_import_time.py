@@ -0,0 +1,86 @@
+"""
+tests/test_import_time.py - Presupuesto de arranque de los workers web
+----------------------------------------------------------------------
+Importa citymind.wsgi y resuelve todas las URLs (lo que hace un worker de
+gunicorn antes de su primera respuesta) en un proceso nuevo con
+`python -X importtime` y comprueba que la pila científica pesada no se
+carga y que el tiempo total de imports está dentro del presupuesto.
+
+El presupuesto es relativo: múltiplo del arranque de `python -c pass`
+medido en el mismo test y en la misma máquina (mejor de REPEATS ejecuciones
+de cada uno), así que no depende de la velocidad del runner de CI.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Módulos que solo deben cargarse en las vistas que los usan
+HEAVY_MODULES = ["pandas", "plotly", "xgboost", "sklearn", "joblib", "matplotlib", "analytics.data_insights"]
+
+# Presupuesto: imports del worker ≤ IMPORT_BUDGET_RATIO × imports de `python -c pass`
+# (hoy ≈ 60×; con pandas o plotly en el arranque se supera). Ajustable en CI.
+IMPORT_BUDGET_RATIO = float(os.getenv("CITYMIND_IMPORT_BUDGET_RATIO", "100"))
+REPEATS = 3  # mejor de N: descarta el ruido de un runner compartido
+
+WORKER_STARTUP = (
+    "import citymind.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+# ---------------------------------------------------------------
+# 1️⃣ FIXTURES LOCALES (perfiles de imports en procesos nuevos)
+# ---------------------------------------------------------------
+def run_importtime(base_dir, code):
+    """{módulo: (µs acumulados, es_de_primer_nivel)} de `python -X importtime -c code`."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "citymind.settings", "PYTHONPATH": str(base_dir)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=base_dir, env=env, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Solo los imports de primer nivel (sin sangría) para no contar dos veces
+        profile[name.strip()] = (int(cumulative), not name[1:].startswith(" "))
+    return profile
+
+
+def total_ms(profile):
+    """Suma (ms) de los imports de primer nivel de un perfil."""
+    return sum(us for us, top_level in profile.values() if top_level) / 1000
+
+
+@pytest.fixture(scope="module")
+def import_profile(base_dir):
+    """Perfil de imports al arrancar un worker."""
+    return run_importtime(base_dir, WORKER_STARTUP)
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: sin pila científica al arrancar
+# ---------------------------------------------------------------
+def test_worker_startup_skips_heavy_modules(import_profile):
+    """pandas, plotly, xgboost, sklearn y joblib se difieren a las vistas que los usan"""
+    heavy = [m for m in HEAVY_MODULES if m in import_profile]
+    assert not heavy, f"❌ Importados al arrancar el worker: {heavy}"
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: presupuesto de tiempo de import (relativo al intérprete)
+# ---------------------------------------------------------------
+def test_worker_startup_within_budget(base_dir):
+    """Imports del worker ≤ IMPORT_BUDGET_RATIO × imports de `python -c pass` (mejor de REPEATS)"""
+    baseline_ms = min(total_ms(run_importtime(base_dir, "pass")) for _ in range(REPEATS))
+    worker_ms = min(total_ms(run_importtime(base_dir, WORKER_STARTUP)) for _ in range(REPEATS))
+    ratio = worker_ms / baseline_ms
+    assert ratio < IMPORT_BUDGET_RATIO, (
+        f"❌ Imports del worker: {worker_ms:.0f} ms = {ratio:.0f}× `python -c pass` "
+        f"({baseline_ms:.1f} ms) > {IMPORT_BUDGET_RATIO:.0f}×"
+    )
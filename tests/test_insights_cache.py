@@ -0,0 +1,76 @@
+"""
+tests/test_insights_cache.py - Validaciones de la caché de insights del dashboard
+---------------------------------------------------------------------------------
+Comprueba que los insights se calculan una sola vez por versión del dataset,
+que se comparten a través del fichero en disco y que un cambio en el dataset
+sirve la versión anterior mientras se regenera en segundo plano.
+"""
+
+import os
+import time
+import pytest
+
+from analytics import data_insights
+from analytics.insights_cache import InsightsCache
+
+
+# ---------------------------------------------------------------
+# 1️⃣ FIXTURES LOCALES (dataset temporal + generador contado)
+# ---------------------------------------------------------------
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "final_places.csv"
+    path.write_text("countyfips,mhlth_crudeprev\n01001,15.2\n")
+    return path
+
+
+@pytest.fixture
+def calls(monkeypatch, dataset):
+    """Sustituye generate_all_insights por una versión que lee y cuenta llamadas"""
+    calls = []
+
+    def fake_generate_all_insights():
+        calls.append(dataset.read_text())
+        return {"summary": {"version": len(calls)}}
+
+    monkeypatch.setattr(data_insights, "generate_all_insights", fake_generate_all_insights)
+    return calls
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: una sola generación por versión del dataset
+# ---------------------------------------------------------------
+def test_generates_once(dataset, calls, tmp_path):
+    cache = InsightsCache(dataset, tmp_path / "cache.json", check_interval=0)
+    assert cache.get() == {"summary": {"version": 1}}
+    assert cache.get() == {"summary": {"version": 1}}
+    assert len(calls) == 1
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: otro proceso reutiliza la caché en disco (precalentada)
+# ---------------------------------------------------------------
+def test_warm_cache_shared_through_disk(dataset, calls, tmp_path):
+    InsightsCache(dataset, tmp_path / "cache.json").warm()
+    other_worker = InsightsCache(dataset, tmp_path / "cache.json", check_interval=0)
+    assert other_worker.get() == {"summary": {"version": 1}}
+    assert len(calls) == 1
+
+
+# ---------------------------------------------------------------
+# 4️⃣ Test: dataset modificado → versión anterior + regeneración
+# ---------------------------------------------------------------
+def test_stale_while_regenerating(dataset, calls, tmp_path):
+    cache = InsightsCache(dataset, tmp_path / "cache.json", check_interval=0)
+    cache.get()
+
+    dataset.write_text("countyfips,mhlth_crudeprev\n01001,16.0\n01003,14.1\n")
+    stat = dataset.stat()
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.get() == {"summary": {"version": 1}}
+
+    deadline = time.monotonic() + 5
+    while cache.get() != {"summary": {"version": 2}} and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get() == {"summary": {"version": 2}}
+    assert len(calls) == 2
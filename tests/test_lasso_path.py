@@ -0,0 +1,61 @@
+"""
+tests/test_lasso_path.py - Validaciones del camino Lasso compartido CityMind
+---------------------------------------------------------------------------
+Comprueba que LassoPathCV (Gram por bloques de fold, warm start) elige el
+mismo alpha y las mismas variables que LassoCV, con los mismos folds.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LassoCV
+from sklearn.model_selection import KFold
+
+from scripts.common.lasso_path import LassoPathCV, fold_indices
+
+
+# ---------------------------------------------------------------
+# 1️⃣ FIXTURE LOCAL (features correlacionadas, escala sin normalizar)
+# ---------------------------------------------------------------
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    latent = rng.normal(size=(1003, 4))
+    X = latent @ rng.normal(size=(4, 15)) * 10 + 30 + rng.normal(0, 1, (1003, 15))
+    y = 15 + latent @ rng.normal(size=4) + rng.normal(0, 0.5, 1003)
+    return pd.DataFrame(X, columns=[f"m{i}_crudeprev" for i in range(15)]), pd.Series(y)
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: mismos folds que LassoCV
+# ---------------------------------------------------------------
+def test_folds_match_kfold():
+    """Los bloques coinciden con KFold(5) sin barajar (tamaños desiguales incluidos)"""
+    expected = [test for _, test in KFold(5).split(np.zeros(1003))]
+    for ours, theirs in zip(fold_indices(1003, 5), expected):
+        np.testing.assert_array_equal(ours, theirs)
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: equivalencia con LassoCV
+# ---------------------------------------------------------------
+def test_matches_lasso_cv(data):
+    """Mismo alpha, mismas variables seleccionadas y predicciones equivalentes"""
+    X, y = data
+    expected = LassoCV(cv=5, random_state=42, max_iter=10000).fit(X, y)
+    result = LassoPathCV(cv=5, random_state=42, max_iter=10000).fit(X, y)
+
+    np.testing.assert_allclose(result.alphas_, expected.alphas_, rtol=1e-12)
+    np.testing.assert_allclose(result.mse_path_, expected.mse_path_, rtol=1e-6)
+    assert result.alpha_ == pytest.approx(expected.alpha_, rel=1e-12)
+    np.testing.assert_array_equal(result.coef_ != 0, expected.coef_ != 0)
+    np.testing.assert_allclose(result.predict(X), expected.predict(X), atol=1e-2)
+    assert list(result.feature_names_in_) == list(X.columns)
+
+
+def test_unsupported_options_fall_back(data):
+    """cv no entero o pesos por muestra: se usa LassoCV tal cual"""
+    X, y = data
+    result = LassoPathCV(cv=KFold(3), max_iter=10000).fit(X, y)
+    expected = LassoCV(cv=KFold(3), max_iter=10000).fit(X, y)
+    np.testing.assert_array_equal(result.coef_, expected.coef_)
@@ -0,0 +1,152 @@
+"""
+tests/test_model_registry.py - Validaciones del registro de modelos de la API
+-----------------------------------------------------------------------------
+Comprueba que los modelos se cargan una sola vez por proceso, que los aciertos
+se contabilizan (también con varios hilos) y que un cambio real en el fichero
+provoca la recarga.
+"""
+
+import os
+import sys
+import threading
+
+import joblib
+import pytest
+
+from api.model_registry import VALID_TARGETS, ModelRegistry, model_filename
+
+
+# ---------------------------------------------------------------
+# 1️⃣ FIXTURE LOCAL (directorio de modelos temporal)
+# ---------------------------------------------------------------
+@pytest.fixture
+def models_dir(tmp_path):
+    """Crea un artefacto falso para (mhlth_crudeprev, full_social)."""
+    joblib.dump({"version": 1}, tmp_path / model_filename("mhlth_crudeprev", True))
+    return tmp_path
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: nombres de artefactos
+# ---------------------------------------------------------------
+def test_model_filename():
+    """Los nombres siguen el patrón xgboost_{escenario}_{target}.joblib"""
+    assert model_filename("mhlth_crudeprev", True) == "xgboost_full_social_mhlth.joblib"
+    assert model_filename("depression_crudeprev", False) == "xgboost_no_social_depression.joblib"
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: una sola carga por proceso
+# ---------------------------------------------------------------
+def test_loads_once_and_counts_hits(models_dir):
+    """Peticiones repetidas reutilizan el modelo ya cargado"""
+    registry = ModelRegistry(models_dir, check_interval=0)
+    first = registry.get("mhlth_crudeprev", True)
+    for _ in range(5):
+        assert registry.get("mhlth_crudeprev", True) is first
+
+    stats = registry.stats()
+    assert stats["loads"] == 1
+    assert stats["hits"] == 5
+    assert stats["reloads"] == 0
+
+
+# ---------------------------------------------------------------
+# 4️⃣ Test: recarga en caliente solo si cambia el contenido
+# ---------------------------------------------------------------
+def test_hot_reload_on_content_change(models_dir):
+    """Un 'touch' no recarga; un contenido distinto sí"""
+    registry = ModelRegistry(models_dir, check_interval=0)
+    path = models_dir / model_filename("mhlth_crudeprev", True)
+    assert registry.get("mhlth_crudeprev", True) == {"version": 1}
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    registry.get("mhlth_crudeprev", True)
+    assert registry.stats()["reloads"] == 0
+
+    joblib.dump({"version": 2}, path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert registry.get("mhlth_crudeprev", True) == {"version": 2}
+    assert registry.stats()["reloads"] == 1
+
+
+# ---------------------------------------------------------------
+# 5️⃣ Test: modelo inexistente
+# ---------------------------------------------------------------
+def test_missing_model_raises(models_dir):
+    """Si no existe el artefacto se propaga FileNotFoundError"""
+    registry = ModelRegistry(models_dir)
+    with pytest.raises(FileNotFoundError):
+        registry.get("depression_crudeprev", False)
+
+
+# ---------------------------------------------------------------
+# 6️⃣ Test: varios hilos (workers con threads)
+# ---------------------------------------------------------------
+@pytest.fixture
+def all_models_dir(tmp_path):
+    """Un artefacto falso por cada (target, use_social)."""
+    for target in VALID_TARGETS:
+        for use_social in (True, False):
+            joblib.dump({"key": target}, tmp_path / model_filename(target, use_social))
+    return tmp_path
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    """Cambios de hilo muy frecuentes para que las carreras aparezcan también con el GIL"""
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(previous)
+
+
+def run_threads(*targets):
+    threads = [threading.Thread(target=target) for target in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_hits_are_counted(all_models_dir, frequent_thread_switches):
+    """Con varios hilos no se pierde ningún acierto (global ni por modelo)"""
+    registry = ModelRegistry(all_models_dir, check_interval=60)
+    keys = [(target, use_social) for target in VALID_TARGETS for use_social in (True, False)]
+    n_threads, n_calls = 8, 500
+
+    def serve():
+        for i in range(n_calls):
+            registry.get(*keys[i % len(keys)])
+
+    run_threads(*[serve] * n_threads)
+    stats = registry.stats()
+    assert stats["loads"] == len(keys)
+    assert stats["hits"] == n_threads * n_calls - len(keys)
+    assert sum(model["hits"] for model in stats["models"].values()) == stats["hits"]
+
+
+def test_stats_while_models_load(all_models_dir, frequent_thread_switches):
+    """stats() no falla ("dictionary changed size during iteration") mientras se cargan modelos"""
+    registry = ModelRegistry(all_models_dir, check_interval=60)
+    done, errors = threading.Event(), []
+
+    def reload_all():
+        for _ in range(200):
+            registry.clear()
+            for target in VALID_TARGETS:
+                for use_social in (True, False):
+                    registry.get(target, use_social)
+        done.set()
+
+    def read_stats():
+        try:
+            while not done.is_set():
+                registry.stats()
+        except RuntimeError as e:
+            errors.append(e)
+            done.set()
+
+    run_threads(reload_all, read_stats, read_stats)
+    assert errors == []
@@ -0,0 +1,117 @@
+"""
+tests/test_training_cache.py - Validaciones de la caché de entrenamiento CityMind
+--------------------------------------------------------------------------------
+Comprueba que la clave cambia con los datos y los hiperparámetros, que las
+entradas se recuperan intactas, que la expulsión respeta antigüedad y tamaño y
+que una rejilla sin cambios no vuelve a entrenar.
+"""
+
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LassoCV
+
+from scripts.common import training
+from scripts.common.dataset_io import write_dataset
+from scripts.common.training_cache import TrainingCache, fit_key, frame_digest
+
+
+# ---------------------------------------------------------------
+# 1️⃣ FIXTURE LOCAL (datos sintéticos)
+# ---------------------------------------------------------------
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(50, 3)), columns=["a", "b", "c"])
+    return X, pd.Series(rng.normal(size=50), name="mhlth_crudeprev")
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: clave direccionada por contenido
+# ---------------------------------------------------------------
+def test_key_changes_with_data_and_params(frame):
+    """Mismos datos y parámetros → misma clave; cualquier cambio → otra"""
+    X, y = frame
+    digest = frame_digest(X, y)
+    key = fit_key(digest, LassoCV, {"cv": 5})
+    assert key == fit_key(frame_digest(X.copy(), y.copy()), LassoCV, {"cv": 5})
+
+    changed = X.copy()
+    changed.iloc[0, 0] += 1e-9
+    assert fit_key(frame_digest(changed, y), LassoCV, {"cv": 5}) != key
+    assert fit_key(frame_digest(X[["a", "b"]], y), LassoCV, {"cv": 5}) != key
+    assert fit_key(digest, LassoCV, {"cv": 10}) != key
+    assert fit_key(digest, LassoCV, {"cv": 5}, random_state=1) != key
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: guardar y recuperar
+# ---------------------------------------------------------------
+def test_put_and_get(tmp_path):
+    """Las métricas y el modelo se recuperan tal cual"""
+    cache = TrainingCache(tmp_path)
+    assert cache.get("abc") is None
+
+    cache.put("abc", {"model": "XGBoost", "r2": 0.8}, model={"trees": 3})
+    metrics, model_path = cache.get("abc")
+    assert metrics == {"model": "XGBoost", "r2": 0.8}
+    assert joblib.load(model_path) == {"trees": 3}
+
+    cache.put("def", {"model": "LassoCV"})
+    assert cache.get("def")[1] is None
+
+
+# ---------------------------------------------------------------
+# 4️⃣ Test: expulsión por antigüedad y tamaño
+# ---------------------------------------------------------------
+def test_evict_by_age_and_size(tmp_path):
+    """Se borran las caducadas y después las menos usadas hasta caber en max_bytes"""
+    cache = TrainingCache(tmp_path, max_age=3600)
+    now = time.time()
+    for i, key in enumerate(["old", "lru", "recent"]):
+        cache.put(key, {"payload": "x" * 1000})
+        os.utime(tmp_path / key, (now - [7200, 60, 0][i],) * 2)
+
+    assert cache.evict() == ["old"]
+    cache.max_bytes = 1500
+    assert cache.evict() == ["lru"]
+    assert cache.get("recent") is not None
+
+
+# ---------------------------------------------------------------
+# 5️⃣ Test: re-ejecución sin cambios
+# ---------------------------------------------------------------
+def test_unchanged_grid_skips_training(tmp_path, monkeypatch, frame):
+    """Con todas las claves en caché no se lanza el pool y se publican los modelos"""
+    X, y = frame
+    scenarios = {
+        name: {**cfg, "data_dir": tmp_path / name, "out_dir": tmp_path / "interim" / name}
+        for name, cfg in training.SCENARIOS.items()
+    }
+    monkeypatch.setattr(training, "SCENARIOS", scenarios)
+    monkeypatch.setattr(training, "MODELS_DIR", tmp_path / "models")
+    write_dataset(pd.concat([y, X], axis=1), training.model_data_path("no_social", y.name))
+
+    cache = TrainingCache(tmp_path / "cache")
+    digest = frame_digest(*training.load_frame("no_social", y.name))
+    for task in training.build_grid(["no_social"]):
+        metrics = {"target": y.name, "model": task[2], "r2": 0.5, "rmse": 1.0, "mae": 1.0, "pca_components": 3}
+        model = {"model": task[2]} if training.MODEL_SPECS[task[2]].get("save") else None
+        cache.put(training.task_key(task, digest), metrics, model)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("no debería entrenarse nada")
+
+    def no_components(*args, **kwargs):
+        raise AssertionError("sin --pca no se calculan componentes")
+
+    monkeypatch.setattr(training, "ProcessPoolExecutor", no_pool)
+    monkeypatch.setattr(training, "component_count", no_components)
+    result = training.train_grid(["no_social"], cache=cache)
+    assert result["no_social"]["model"].tolist() == ["LassoCV", "RandomForest", "XGBoost"]
+    assert result["no_social"]["pca_components"].isna().all()
+    assert joblib.load(training.model_artifact_path("no_social", y.name)) == {"model": "XGBoost"}
@@ -0,0 +1,128 @@
+"""
+tests/test_training_engine.py - Validaciones del driver de entrenamiento CityMind
+--------------------------------------------------------------------------------
+Comprueba el reparto de núcleos entre procesos e hilos, la construcción de la
+rejilla escenario × target × modelo, que cada ajuste produce las métricas y
+artefactos con el formato de siempre (más tiempos y parada temprana de
+XGBoost) y que PCA solo se ajusta en sus variantes.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.decomposition import PCA
+from sklearn.pipeline import Pipeline
+
+from api.model_registry import model_filename
+from scripts.common import training
+from scripts.common.dataset_io import write_dataset
+
+
+# ---------------------------------------------------------------
+# 1️⃣ FIXTURE LOCAL (escenarios sobre un directorio temporal)
+# ---------------------------------------------------------------
+@pytest.fixture
+def scenarios(tmp_path, monkeypatch):
+    """Dataset de modelado sintético solo para (no_social, mhlth_crudeprev)."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    df = pd.DataFrame(X, columns=[f"f{i}_crudeprev" for i in range(4)])
+    df.insert(0, "mhlth_crudeprev", 10 + 2 * X[:, 0] - X[:, 1] + rng.normal(0, 0.1, 200))
+    df["countyfips"] = [f"{i:05d}" for i in range(200)]
+
+    patched = {
+        name: {**cfg, "data_dir": tmp_path / name, "out_dir": tmp_path / "interim" / name}
+        for name, cfg in training.SCENARIOS.items()
+    }
+    monkeypatch.setattr(training, "SCENARIOS", patched)
+    write_dataset(df, training.model_data_path("no_social", "mhlth_crudeprev"))
+    return patched
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: presupuesto de núcleos
+# ---------------------------------------------------------------
+@pytest.mark.parametrize("n_tasks, cores, expected", [
+    (12, 8, (8, 1)),
+    (12, 32, (12, 2)),
+    (12, 1, (1, 1)),
+    (3, 16, (3, 5)),
+])
+def test_plan_budget_never_oversubscribes(n_tasks, cores, expected):
+    """workers × hilos por ajuste nunca supera los núcleos disponibles"""
+    workers, threads = training.plan_budget(n_tasks, cores)
+    assert (workers, threads) == expected
+    assert workers * threads <= max(cores, 1)
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: rejilla
+# ---------------------------------------------------------------
+def test_build_grid_skips_missing_and_orders_by_cost(scenarios):
+    """Solo entran los datasets existentes y los modelos caros van primero"""
+    grid = training.build_grid(list(scenarios))
+    assert {(s, t) for s, t, _ in grid} == {("no_social", "mhlth_crudeprev")}
+    assert [m for _, _, m in grid] == ["RandomForest", "XGBoost", "LassoCV"]
+
+
+def test_artifact_names_match_api_registry():
+    """Los modelos guardados son los que busca la API"""
+    assert training.model_artifact_path("full_social", "mhlth_crudeprev").name == model_filename("mhlth_crudeprev", True)
+    assert training.model_artifact_path("no_social", "depression_crudeprev").name == model_filename("depression_crudeprev", False)
+
+
+# ---------------------------------------------------------------
+# 4️⃣ Test: ajuste y métricas
+# ---------------------------------------------------------------
+def test_fit_task_and_metrics_order(scenarios):
+    """Un ajuste devuelve métricas completas y model_metrics.csv sale ordenado"""
+    scenario, metrics, model = training.fit_task("no_social", "mhlth_crudeprev", "LassoCV")
+    assert scenario == "no_social" and model is None
+    assert metrics["r2"] > 0.9
+    assert "pca_components" not in metrics
+
+    assert metrics["fit_seconds"] >= 0 and metrics["predict_us_per_row"] > 0
+    assert metrics["best_iteration"] is None
+
+    metrics["pca_components"] = 3
+    rows = [dict(metrics, model="XGBoost"), metrics, dict(metrics, model="RandomForest")]
+    df = training.save_metrics("no_social", rows)
+    assert list(df.columns) == training.METRIC_COLUMNS
+    assert df["model"].tolist() == ["LassoCV", "RandomForest", "XGBoost"]
+    assert df["best_iteration"].isna().all()
+    assert (scenarios["no_social"]["out_dir"] / "model_metrics.csv").exists()
+
+
+def test_xgboost_early_stopping(scenarios):
+    """XGBoost usa hist, se detiene antes del techo de árboles y lo registra"""
+    _, metrics, model = training.fit_task("no_social", "mhlth_crudeprev", "XGBoost")
+    assert model.get_params()["tree_method"] == "hist"
+    assert 0 <= metrics["best_iteration"] < training.XGB_PARAMS["n_estimators"] - 1
+    assert model.best_iteration == metrics["best_iteration"]
+
+    df = training.save_metrics("no_social", [dict(metrics, pca_components=3)])
+    assert df["best_iteration"].dtype == "Int64"
+
+
+# ---------------------------------------------------------------
+# 5️⃣ Test: PCA opt-in
+# ---------------------------------------------------------------
+def test_explained_components_matches_sklearn_pca():
+    """El recuento desde el espectro coincide con PCA(n_components=0.95)"""
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        X = rng.normal(size=(300, 3)) @ rng.normal(size=(3, 12)) + rng.normal(0, 0.5, (300, 12))
+        X = (X - X.mean(axis=0)) / X.std(axis=0)
+        assert training.explained_components(X) == PCA(n_components=0.95).fit(X).n_components_
+
+
+def test_pca_variant_is_opt_in(scenarios):
+    """Sin --pca no hay variantes; con ellas el modelo guardado es el pipeline completo"""
+    assert not set(training.PCA_MODELS) & {m for _, _, m in training.build_grid(["no_social"])}
+
+    _, metrics, model = training.fit_task("no_social", "mhlth_crudeprev", "PCA+XGBoost")
+    assert metrics["model"] == "PCA+XGBoost"
+    assert isinstance(model, Pipeline) and "pca" in model.named_steps
+    assert metrics["best_iteration"] is not None
+    assert training.model_artifact_path("no_social", "mhlth_crudeprev", "PCA+XGBoost").name == \
+        "xgboost_pca_no_social_mhlth.joblib"
@@ -0,0 +1,116 @@
+"""
+tests/test_tree_arrays.py - Validaciones del formato de inferencia de árboles
+-----------------------------------------------------------------------------
+Comprueba que los arrays exportados predicen lo mismo que el XGBRegressor
+(fila a fila, por lotes y con NaN), que solo se usan los árboles hasta
+best_iteration y que el registro de la API sirve el .trees.npz solo cuando
+corresponde al .joblib actual, con las columnas (nombre y orden) que
+genera la expansión de features de la API y solo para pocas filas (los
+lotes usan el booster del .joblib).
+"""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from xgboost import XGBRegressor
+
+from api.model_registry import FeatureMismatchError, ModelRegistry, model_filename
+from scripts.common.feature_expansion import get_expansion_plan
+from scripts.common.tree_arrays import TreeEnsemble, export_model, trees_path
+
+# Columnas que la API genera para (mhlth_crudeprev, full_social)
+FEATURES = list(get_expansion_plan("mhlth_crudeprev", True).feature_names)
+
+
+# ---------------------------------------------------------------
+# 1️⃣ FIXTURE LOCAL (XGBoost con parada temprana)
+# ---------------------------------------------------------------
+@pytest.fixture(scope="module")
+def xgb_data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, len(FEATURES)))
+    y = 10 + 3 * X[:, 0] - 2 * X[:, 1] * X[:, 2] + rng.normal(0, 0.3, 600)
+    X[::9, 2] = np.nan  # XGBoost aprende dirección por defecto para los NaN
+    frame = pd.DataFrame(X, columns=FEATURES)  # como en el entrenamiento: guarda los nombres
+    model = XGBRegressor(n_estimators=300, max_depth=4, learning_rate=0.1,
+                         tree_method="hist", early_stopping_rounds=10)
+    model.fit(frame[:500], y[:500], eval_set=[(frame[500:], y[500:])], verbose=False)
+    return model, X
+
+
+@pytest.fixture
+def exported(xgb_data, tmp_path):
+    model, _ = xgb_data
+    path = tmp_path / model_filename("mhlth_crudeprev", True)
+    joblib.dump(model, path)
+    export_model(model, path)
+    return path
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: mismas predicciones que XGBoost
+# ---------------------------------------------------------------
+def test_predictions_match_xgboost(xgb_data, exported):
+    """Lote y fila a fila, con NaN, iguales al predict de XGBoost (precisión float32)"""
+    model, X = xgb_data
+    ensemble = TreeEnsemble.load(trees_path(exported))
+    assert ensemble.n_trees == model.best_iteration + 1 < 300
+
+    np.testing.assert_allclose(ensemble.predict(X), model.predict(X), rtol=1e-5)
+    for row in X[:20]:
+        np.testing.assert_allclose(ensemble.predict(row.reshape(1, -1)), model.predict(row.reshape(1, -1)), rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        ensemble.predict(X[:, :3])
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: el registro sirve el .npz solo si corresponde al .joblib
+# ---------------------------------------------------------------
+def test_registry_prefers_matching_tree_arrays(xgb_data, exported):
+    """Con .npz del mismo .joblib → TreeEnsemble; si el .joblib cambia → joblib"""
+    registry = ModelRegistry(exported.parent, check_interval=0)
+    assert isinstance(registry.get("mhlth_crudeprev", True), TreeEnsemble)
+    assert registry.stats()["models"]["mhlth_crudeprev|full_social"]["backend"] == "tree_arrays"
+
+    joblib.dump({"version": 2}, exported)  # .npz ya no corresponde
+    assert registry.get("mhlth_crudeprev", True) == {"version": 2}
+    assert registry.stats()["reloads"] == 1
+
+
+def test_registry_serves_booster_for_batches(xgb_data, exported):
+    """batch=True → XGBRegressor del .joblib (cargado una vez); sin batch → TreeEnsemble"""
+    model, X = xgb_data
+    registry = ModelRegistry(exported.parent, check_interval=60)
+    assert isinstance(registry.get("mhlth_crudeprev", True), TreeEnsemble)
+    assert registry.stats()["models"]["mhlth_crudeprev|full_social"]["batch_backend"] is None
+
+    booster = registry.get("mhlth_crudeprev", True, batch=True)
+    assert isinstance(booster, XGBRegressor)
+    assert registry.get("mhlth_crudeprev", True, batch=True) is booster
+    np.testing.assert_allclose(booster.predict(X), model.predict(X))
+    stats = registry.stats()
+    assert stats["loads"] == 1
+    assert stats["models"]["mhlth_crudeprev|full_social"]["batch_backend"] == "joblib"
+
+
+# ---------------------------------------------------------------
+# 4️⃣ Test: columnas del modelo distintas de las de la API
+# ---------------------------------------------------------------
+@pytest.mark.parametrize("backend", ["joblib", "tree_arrays"])
+def test_registry_rejects_reordered_features(xgb_data, tmp_path, backend):
+    """Mismo número de columnas en otro orden → FeatureMismatchError (no predicción cruzada)"""
+    _, X = xgb_data
+    swapped = FEATURES[1::-1] + FEATURES[2:]  # las dos primeras intercambiadas
+    model = XGBRegressor(n_estimators=5, max_depth=2)
+    model.fit(pd.DataFrame(X, columns=swapped), X[:, 0])
+
+    path = tmp_path / model_filename("mhlth_crudeprev", True)
+    joblib.dump(model, path)
+    if backend == "tree_arrays":
+        export_model(model, path)
+
+    registry = ModelRegistry(tmp_path, check_interval=0)
+    with pytest.raises(FeatureMismatchError, match="posición 0"):
+        registry.get("mhlth_crudeprev", True)
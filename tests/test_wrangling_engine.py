@@ -0,0 +1,127 @@
+"""
+tests/test_wrangling_engine.py - Validaciones del motor de wrangling CityMind
+----------------------------------------------------------------------------
+Comprueba que scripts/common/wrangling.py produce exactamente los mismos
+datasets que la implementación original (groupby + lambda), que las
+imputaciones siguen las reglas del pipeline y que el modo streaming (dos
+pasadas con histograma mergeable) coincide con el modo en memoria.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.benchmarks.bench_wrangling import legacy_wrangle, make_places
+from scripts.common.wrangling import (
+    COLS_MED,
+    COLS_SOCIAL,
+    HistogramSketch,
+    normalize_columns,
+    target_first,
+    wrangle,
+    wrangle_stream,
+)
+
+
+@pytest.fixture(scope="module")
+def places():
+    return make_places(scale=1)
+
+
+# ---------------------------------------------------------------
+# 1️⃣ Test: mismos resultados que la implementación original
+# ---------------------------------------------------------------
+def test_matches_legacy(places):
+    """Los tres datasets coinciden bit a bit con la versión groupby + lambda"""
+    expected = legacy_wrangle(places)
+    result = wrangle(places)
+    for name in expected:
+        pd.testing.assert_frame_equal(result[name], expected[name], check_exact=True)
+
+
+# ---------------------------------------------------------------
+# 2️⃣ Test: reglas de imputación
+# ---------------------------------------------------------------
+def test_imputation_rules(places):
+    """Sin nulos médicos, sociales con la mediana estatal y sin nulos tras la media nacional"""
+    result = wrangle(places)
+    assert result["imputed_clean"][COLS_MED].notna().all().all()
+    assert not set(COLS_SOCIAL) & set(result["no_social_clean"].columns)
+    assert result["imputed_full"].isna().sum().sum() == 0
+
+    col = COLS_SOCIAL[0]
+    clean = places[places[COLS_MED].notna().all(axis=1)]
+    missing = clean[col].isna() & places.groupby("stateabbr")[col].transform("count").loc[clean.index].gt(0)
+    row = missing.idxmax()
+    state = places.loc[row, "stateabbr"]
+    assert result["imputed_clean"].loc[row, col] == places.loc[places["stateabbr"] == state, col].median()
+
+
+def test_no_input_mutation(places):
+    """El dataset de entrada no se modifica"""
+    before = places.copy()
+    wrangle(places)
+    pd.testing.assert_frame_equal(places, before)
+
+
+# ---------------------------------------------------------------
+# 3️⃣ Test: utilidades
+# ---------------------------------------------------------------
+def test_normalize_columns_and_target_first():
+    """Nombres normalizados, FIPS de 5 dígitos y target como primera columna"""
+    df = pd.DataFrame({" StateAbbr": ["AL"], "CountyFIPS": [1001], "MHLTH-CrudePrev": [15.2]})
+    normalize_columns(df)
+    assert list(df.columns) == ["stateabbr", "countyfips", "mhlth_crudeprev"]
+    assert df["countyfips"].iloc[0] == "01001"
+    assert list(target_first(df, "mhlth_crudeprev").columns)[0] == "mhlth_crudeprev"
+    assert np.isclose(df["mhlth_crudeprev"].iloc[0], 15.2)
+
+
+# ---------------------------------------------------------------
+# 4️⃣ Test: sketch de medianas
+# ---------------------------------------------------------------
+def test_histogram_sketch_median_and_merge():
+    """Mediana exacta con datos de un decimal y mismo resultado al combinar bloques"""
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 3, 1000)
+    values = rng.uniform(0, 100, (1000, 2)).round(1)
+    values[rng.random((1000, 2)) < 0.1] = np.nan
+
+    whole = HistogramSketch(2)
+    whole.update(codes, values)
+    merged = HistogramSketch(2)
+    for part in np.array_split(np.arange(1000), 4):
+        block = HistogramSketch(2)
+        block.update(codes[part], values[part])
+        merged.merge(block)
+
+    expected = pd.DataFrame(values).groupby(codes).median().to_numpy()
+    np.testing.assert_allclose(whole.quantile(0.5), expected, atol=1e-9)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+
+
+# ---------------------------------------------------------------
+# 5️⃣ Test: streaming frente a memoria
+# ---------------------------------------------------------------
+def test_stream_matches_in_memory(tmp_path, places):
+    """Mismos datasets (a precisión float32) procesando el CSV crudo por bloques"""
+    raw = places.copy()
+    raw["totalpopulation"] = raw["totalpopulation"].map("{:,}".format)
+    raw.columns = [c.upper() for c in raw.columns]
+    path = tmp_path / "places_raw.csv"
+    raw.to_csv(path, index=False)
+
+    expected = wrangle(normalize_columns(pd.read_csv(path, thousands=",")))
+    chunks = list(wrangle_stream(path, chunksize=500))
+    assert len(chunks) == 7
+
+    for name in expected:
+        result = pd.concat([c[name] for c in chunks])
+        assert list(result.columns) == list(expected[name].columns)
+        assert len(result) == len(expected[name])
+        assert result["stateabbr"].dtype == "category"
+        numeric = [c for c in result.columns if c.endswith("crudeprev")]
+        assert (result[numeric].dtypes == np.float32).all()
+        np.testing.assert_allclose(
+            result[numeric].to_numpy(np.float64), expected[name][numeric].to_numpy(np.float64), rtol=1e-6
+        )